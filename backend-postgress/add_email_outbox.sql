@@ -0,0 +1,30 @@
+-- Migration script to add the email outbox
+-- Invite emails are queued here and delivered by the backend's background sender
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    invite_id UUID REFERENCES test_invites(id) ON DELETE CASCADE,
+    admin_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    to_email VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    text_body TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMPTZ
+);
+
+-- Plain-text alternative for multipart emails (for tables created before it existed)
+ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS text_body TEXT;
+
+-- Add indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_email_outbox_invite_id ON email_outbox(invite_id);
+CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox(status);
+
+-- Verify table was created
+SELECT 'email_outbox table created successfully' as status;
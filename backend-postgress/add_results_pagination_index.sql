@@ -0,0 +1,10 @@
+-- Migration script to support keyset pagination of GET /api/results
+-- Pages seek on (submitted_at, id) newest first instead of skipping rows with OFFSET
+
+CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at_id ON test_submissions(submitted_at DESC, id DESC);
+
+-- Same order within one test, for the results page filtered by test
+CREATE INDEX IF NOT EXISTS idx_submissions_test_submitted_at_id ON test_submissions(test_id, submitted_at DESC, id DESC);
+
+-- Verify indexes were created
+SELECT 'results pagination indexes created' as status;
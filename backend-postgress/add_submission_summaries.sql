@@ -0,0 +1,241 @@
+-- Migration script to add the submission_summaries read model
+-- One row per submission carrying the invite and test display fields, the scores and the
+-- review counts, so the results list, an applicant's submissions and the manual scoring
+-- queue read a single table instead of joining test_submissions, test_invites, tests and
+-- test_answers on every call. Rows written behind the API are picked up by calling
+-- refresh_submission_summaries() for them.
+-- Safe to run more than once; the rows are rebuilt from the source tables each time.
+
+CREATE TABLE IF NOT EXISTS submission_summaries (
+    submission_id UUID PRIMARY KEY REFERENCES test_submissions(id) ON DELETE CASCADE,
+    invite_id UUID NOT NULL,
+    test_id UUID NOT NULL,
+    applicant_email VARCHAR(255) NOT NULL,
+    applicant_name VARCHAR(255) NOT NULL,
+    invite_token UUID,
+    invite_status VARCHAR(50),
+    test_title VARCHAR(255) NOT NULL,
+    test_description TEXT,
+    duration_minutes INTEGER,
+    started_at TIMESTAMPTZ,
+    submitted_at TIMESTAMPTZ,
+    final_score FLOAT,
+    auto_score FLOAT,
+    manual_score FLOAT,
+    scoring_status VARCHAR(20),
+    review_completed_at TIMESTAMPTZ,
+    is_monitored BOOLEAN,
+    total_answers INTEGER NOT NULL DEFAULT 0,
+    manual_questions INTEGER NOT NULL DEFAULT 0,
+    pending_reviews INTEGER NOT NULL DEFAULT 0
+);
+
+-- GET /api/results: newest first, optionally within one test, paged by (submitted_at, id)
+CREATE INDEX IF NOT EXISTS idx_summaries_submitted_at_id ON submission_summaries(submitted_at DESC, submission_id DESC);
+CREATE INDEX IF NOT EXISTS idx_summaries_test_submitted_at_id ON submission_summaries(test_id, submitted_at DESC, submission_id DESC);
+-- GET /api/my-submissions
+CREATE INDEX IF NOT EXISTS idx_summaries_applicant_submitted_at ON submission_summaries(applicant_email, submitted_at DESC);
+-- manual_scoring_queue: oldest first among submissions still under review
+CREATE INDEX IF NOT EXISTS idx_summaries_review_queue ON submission_summaries(submitted_at)
+    WHERE scoring_status IN ('needs_review', 'partially_reviewed');
+-- Invite changes reach their submission's row
+CREATE INDEX IF NOT EXISTS idx_summaries_invite_id ON submission_summaries(invite_id);
+
+-- Rebuild the rows of the given submissions from the source tables (backfill and repairs)
+CREATE OR REPLACE FUNCTION refresh_submission_summaries(submission_ids UUID[])
+RETURNS void AS $$
+BEGIN
+    -- Wait for writers of these submissions, so the rows below are read after they commit
+    PERFORM 1 FROM test_submissions WHERE id = ANY(submission_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    INSERT INTO submission_summaries (
+        submission_id, invite_id, test_id, applicant_email, applicant_name, invite_token, invite_status,
+        test_title, test_description, duration_minutes, started_at, submitted_at, final_score, auto_score,
+        manual_score, scoring_status, review_completed_at, is_monitored,
+        total_answers, manual_questions, pending_reviews
+    )
+    SELECT ts.id, ts.invite_id, ts.test_id, ts.applicant_email, ti.applicant_name, ti.invite_token, ti.status,
+           t.title, t.description, t.duration_minutes, ts.started_at, ts.submitted_at, ts.final_score, ts.auto_score,
+           ts.manual_score, ts.scoring_status, ts.review_completed_at, ts.is_monitored,
+           counts.total_answers, counts.manual_questions, counts.pending_reviews
+    FROM test_submissions ts
+    JOIN test_invites ti ON ti.id = ts.invite_id
+    JOIN tests t ON t.id = ts.test_id
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*)::int as total_answers,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding'))::int as manual_questions,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding') AND ta.manual_score_status = 'pending')::int
+                   as pending_reviews
+        FROM test_answers ta
+        JOIN questions q ON q.id = ta.question_id
+        WHERE ta.submission_id = ts.id
+    ) counts
+    WHERE ts.id = ANY(submission_ids)
+    ON CONFLICT (submission_id) DO UPDATE SET
+        invite_id = EXCLUDED.invite_id,
+        test_id = EXCLUDED.test_id,
+        applicant_email = EXCLUDED.applicant_email,
+        applicant_name = EXCLUDED.applicant_name,
+        invite_token = EXCLUDED.invite_token,
+        invite_status = EXCLUDED.invite_status,
+        test_title = EXCLUDED.test_title,
+        test_description = EXCLUDED.test_description,
+        duration_minutes = EXCLUDED.duration_minutes,
+        started_at = EXCLUDED.started_at,
+        submitted_at = EXCLUDED.submitted_at,
+        final_score = EXCLUDED.final_score,
+        auto_score = EXCLUDED.auto_score,
+        manual_score = EXCLUDED.manual_score,
+        scoring_status = EXCLUDED.scoring_status,
+        review_completed_at = EXCLUDED.review_completed_at,
+        is_monitored = EXCLUDED.is_monitored,
+        total_answers = EXCLUDED.total_answers,
+        manual_questions = EXCLUDED.manual_questions,
+        pending_reviews = EXCLUDED.pending_reviews;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount only the answer columns of the given submissions' rows, for writes to test_answers
+CREATE OR REPLACE FUNCTION refresh_submission_summary_counts(submission_ids UUID[])
+RETURNS void AS $$
+BEGIN
+    -- Recounts of one submission take turns, so the later one sees the earlier one's answers
+    PERFORM 1 FROM test_submissions WHERE id = ANY(submission_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    UPDATE submission_summaries s
+    SET total_answers = counts.total_answers,
+        manual_questions = counts.manual_questions,
+        pending_reviews = counts.pending_reviews
+    FROM unnest(submission_ids) AS i(submission_id)
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*)::int as total_answers,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding'))::int as manual_questions,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding') AND ta.manual_score_status = 'pending')::int
+                   as pending_reviews
+        FROM test_answers ta
+        JOIN questions q ON q.id = ta.question_id
+        WHERE ta.submission_id = i.submission_id
+    ) counts
+    WHERE s.submission_id = i.submission_id
+    AND (s.total_answers, s.manual_questions, s.pending_reviews)
+        IS DISTINCT FROM (counts.total_answers, counts.manual_questions, counts.pending_reviews);
+END;
+$$ LANGUAGE plpgsql;
+
+-- submit_test writes the row together with the submission. Submissions, answers, invites and
+-- tests change from reviews, monitoring, scheduling and test edits in many places, so triggers
+-- follow those updates. They are statement-level, so a bulk write costs one call rather than one per row.
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_submissions()
+RETURNS trigger AS $$
+BEGIN
+    -- The updated rows stay locked until commit, so their new values are the latest
+    UPDATE submission_summaries s
+    SET test_id = n.test_id, applicant_email = n.applicant_email, started_at = n.started_at,
+        submitted_at = n.submitted_at, final_score = n.final_score, auto_score = n.auto_score,
+        manual_score = n.manual_score, scoring_status = n.scoring_status,
+        review_completed_at = n.review_completed_at, is_monitored = n.is_monitored
+    FROM new_rows n
+    WHERE s.submission_id = n.id
+    AND (s.test_id, s.applicant_email, s.started_at, s.submitted_at, s.final_score, s.auto_score,
+         s.manual_score, s.scoring_status, s.review_completed_at, s.is_monitored)
+        IS DISTINCT FROM
+        (n.test_id, n.applicant_email, n.started_at, n.submitted_at, n.final_score, n.auto_score,
+         n.manual_score, n.scoring_status, n.review_completed_at, n.is_monitored);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_answers()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_submission_summary_counts(ARRAY(SELECT DISTINCT submission_id FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_tests()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE submission_summaries s
+    SET test_title = n.title, test_description = n.description, duration_minutes = n.duration_minutes
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE s.test_id = n.id
+    AND (n.title, n.description, n.duration_minutes) IS DISTINCT FROM (o.title, o.description, o.duration_minutes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_invites()
+RETURNS trigger AS $$
+BEGIN
+    -- Rescheduling or renaming an invite also changes its submission's row
+    UPDATE submission_summaries s
+    SET applicant_name = n.applicant_name, invite_token = n.invite_token, invite_status = n.status
+    FROM new_rows n
+    WHERE s.invite_id = n.id
+    AND (s.applicant_name, s.invite_token, s.invite_status)
+        IS DISTINCT FROM (n.applicant_name, n.invite_token, n.status);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rows go with their submission through the submission_id foreign key, and deleting an
+-- invite or test deletes its submissions (ON DELETE CASCADE), so no delete trigger is needed.
+-- invite_id and test_id themselves are not foreign keys
+DROP TRIGGER IF EXISTS submission_summaries_update ON test_submissions;
+CREATE TRIGGER submission_summaries_update AFTER UPDATE ON test_submissions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_submissions();
+
+DROP TRIGGER IF EXISTS submission_summaries_answers_update ON test_answers;
+CREATE TRIGGER submission_summaries_answers_update AFTER UPDATE ON test_answers
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_answers();
+
+-- Answers also go when a test's questions are replaced
+DROP TRIGGER IF EXISTS submission_summaries_answers_delete ON test_answers;
+CREATE TRIGGER submission_summaries_answers_delete AFTER DELETE ON test_answers
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_answers();
+
+DROP TRIGGER IF EXISTS submission_summaries_tests_update ON tests;
+CREATE TRIGGER submission_summaries_tests_update AFTER UPDATE ON tests
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_tests();
+
+-- Transition tables rule out a column list (UPDATE OF status, ...), so this fires on every
+-- invite update; rows without a submission find nothing through idx_summaries_invite_id
+DROP TRIGGER IF EXISTS submission_summaries_invites_update ON test_invites;
+CREATE TRIGGER submission_summaries_invites_update AFTER UPDATE ON test_invites
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_invites();
+
+-- The scoring queue reads the summaries instead of aggregating test_answers
+DROP VIEW IF EXISTS manual_scoring_queue;
+CREATE VIEW manual_scoring_queue AS
+SELECT
+    submission_id,
+    applicant_email,
+    submitted_at,
+    scoring_status,
+    test_title,
+    test_id,
+    total_answers,
+    manual_questions,
+    pending_reviews
+FROM submission_summaries
+-- Submissions without answers have nothing to review
+WHERE scoring_status IN ('needs_review', 'partially_reviewed') AND total_answers > 0
+ORDER BY submitted_at ASC;
+
+-- The results list pages over the summaries now; these test_submissions indexes
+-- (add_results_pagination_index.sql) only cost writes
+DROP INDEX IF EXISTS idx_submissions_submitted_at_id;
+DROP INDEX IF EXISTS idx_submissions_test_submitted_at_id;
+
+-- Backfill
+SELECT refresh_submission_summaries(ARRAY(SELECT id FROM test_submissions));
+
+-- Verify table was populated
+SELECT 'submission_summaries created for ' || COUNT(*) || ' submissions' as status FROM submission_summaries;
@@ -0,0 +1,9 @@
+-- Migration script to version test definitions
+-- Every edit to a test or its questions bumps definition_version, so each worker's
+-- cached definition can be checked against the database before it is served
+
+ALTER TABLE tests
+ADD COLUMN IF NOT EXISTS definition_version INTEGER NOT NULL DEFAULT 1;
+
+-- Verify column was added
+SELECT 'tests.definition_version added' as status;
@@ -0,0 +1,47 @@
+-- Migration script to add the per-test statistics read model
+-- submit_test and the review endpoints keep one row per test current with running sums and a
+-- histogram of final_score, so GET /api/tests/{test_id}/stats never scans test_submissions.
+-- Safe to run more than once; the rows are rebuilt from test_submissions each time.
+
+CREATE TABLE IF NOT EXISTS test_statistics (
+    test_id UUID PRIMARY KEY REFERENCES tests(id) ON DELETE CASCADE,
+    submission_count INTEGER NOT NULL DEFAULT 0,
+    score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_sum_squares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    -- score_histogram[n] counts final scores in [n - 1, n); the last of the 101 buckets holds exactly 100
+    score_histogram INTEGER[] NOT NULL DEFAULT array_fill(0, ARRAY[101]),
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Rebuild every row from test_submissions (also repairs drift after manual edits)
+CREATE OR REPLACE FUNCTION refresh_test_statistics()
+RETURNS void AS $$
+BEGIN
+    -- Waits for in-flight submits and reviews, and holds new ones until the rebuild commits
+    LOCK TABLE test_statistics IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM test_statistics;
+
+    INSERT INTO test_statistics (test_id, submission_count, score_sum, score_sum_squares, score_histogram)
+    WITH scores AS (
+        SELECT ts.test_id, COALESCE(ts.final_score, 0) as score
+        FROM test_submissions ts
+        JOIN tests t ON t.id = ts.test_id
+    ), buckets AS (
+        SELECT test_id, LEAST(100, GREATEST(0, floor(score)))::int + 1 as bucket, COUNT(*)::int as bucket_count
+        FROM scores
+        GROUP BY 1, 2
+    )
+    SELECT s.test_id, COUNT(*), SUM(s.score), SUM(s.score * s.score),
+           (SELECT array_agg(COALESCE(b.bucket_count, 0) ORDER BY n)
+            FROM generate_series(1, 101) n
+            LEFT JOIN buckets b ON b.test_id = s.test_id AND b.bucket = n)
+    FROM scores s
+    GROUP BY s.test_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_test_statistics();
+
+-- Verify table was populated
+SELECT 'test_statistics created for ' || COUNT(*) || ' tests' as status FROM test_statistics;
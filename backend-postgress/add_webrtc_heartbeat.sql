@@ -0,0 +1,15 @@
+-- Migration script to add heartbeats to WebRTC monitoring sessions
+-- Clients report liveness; the backend ends sessions whose last heartbeat is too old
+
+ALTER TABLE active_webrtc_sessions ADD COLUMN IF NOT EXISTS last_heartbeat_at TIMESTAMPTZ;
+
+-- Sessions started before heartbeats existed count from their creation time
+UPDATE active_webrtc_sessions SET last_heartbeat_at = created_at
+WHERE last_heartbeat_at IS NULL AND status <> 'ended';
+
+-- The reaper only looks at live sessions
+CREATE INDEX IF NOT EXISTS idx_active_sessions_heartbeat ON active_webrtc_sessions(last_heartbeat_at)
+WHERE status <> 'ended';
+
+-- Verify column was added
+SELECT 'last_heartbeat_at column added to active_webrtc_sessions' as status;
@@ -0,0 +1,48 @@
+-- Migration script to number webrtc_signals for the REST signal cursor
+-- GET /api/webrtc/signals pages by seq instead of (created_at, id): created_at comes from
+-- each worker's clock, and concurrent requests store their signals out of clock order.
+-- An invite's numbers come from its row in webrtc_signal_counters, which the storing
+-- transaction keeps locked until it commits, so the signals of an invite commit in seq
+-- order and a reader never sees a number before all smaller ones.
+-- Safe to run more than once. Writers are blocked while existing signals are numbered.
+
+LOCK TABLE webrtc_signals IN SHARE ROW EXCLUSIVE MODE;
+
+ALTER TABLE webrtc_signals ADD COLUMN IF NOT EXISTS seq BIGINT;
+
+-- Number the signals already stored in their old cursor order
+UPDATE webrtc_signals s
+SET seq = numbered.seq
+FROM (
+    SELECT id, created_at,
+           (SELECT COALESCE(MAX(seq), 0) FROM webrtc_signals)
+               + ROW_NUMBER() OVER (ORDER BY created_at, id) AS seq
+    FROM webrtc_signals
+    WHERE seq IS NULL
+) numbered
+WHERE s.id = numbered.id AND s.created_at = numbered.created_at;
+
+ALTER TABLE webrtc_signals ALTER COLUMN seq SET NOT NULL;
+
+-- Last seq handed out per invite. Not a foreign key: ICE candidates are stored for
+-- any invite id, like the rest of webrtc_signals
+CREATE TABLE IF NOT EXISTS webrtc_signal_counters (
+    invite_id UUID PRIMARY KEY,
+    last_seq BIGINT NOT NULL
+);
+
+INSERT INTO webrtc_signal_counters (invite_id, last_seq)
+SELECT invite_id, MAX(seq) FROM webrtc_signals WHERE invite_id IS NOT NULL GROUP BY invite_id
+ON CONFLICT (invite_id) DO UPDATE
+SET last_seq = GREATEST(webrtc_signal_counters.last_seq, EXCLUDED.last_seq);
+
+-- An earlier version of this migration numbered signals from a shared sequence
+ALTER TABLE webrtc_signals ALTER COLUMN seq DROP DEFAULT;
+DROP SEQUENCE IF EXISTS webrtc_signals_seq;
+
+-- Replaces the (invite_id, created_at) index the cursor used before
+CREATE INDEX IF NOT EXISTS idx_webrtc_invite_seq ON webrtc_signals(invite_id, seq);
+DROP INDEX IF EXISTS idx_webrtc_invite_id;
+
+-- Verify column was added
+SELECT 'webrtc_signals.seq added' as status;
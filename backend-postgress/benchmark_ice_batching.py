@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Connection-setup benchmark for ICE candidate ingestion: one POST per
+candidate to /api/webrtc/ice-candidate (trickle ICE over REST) versus one
+coalesced POST to /api/webrtc/ice-candidates.
+
+Seeds SESSIONS in-progress invites directly in Postgres. Every session then
+sets up at the same time against the running backend: it posts its offer
+followed by CANDIDATES ICE candidates. Reports p50/p99 setup latency and
+the request count for each mode. Seeded rows are removed afterwards.
+
+Usage: python benchmark_ice_batching.py [sessions] [candidates]
+"""
+
+import asyncio
+import asyncpg
+import httpx
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_URL = os.environ.get('BENCHMARK_API_URL', 'http://localhost:8000/api')
+BROWSER_CONNECTIONS = 6
+
+def make_candidate(i):
+    return {
+        "candidate": f"candidate:{842163049 + i} 1 udp 1677729535 203.0.113.{i % 250} {40000 + i} "
+                     f"typ srflx raddr 10.0.0.5 rport {40000 + i} generation 0 ufrag bnch network-cost 999",
+        "sdpMid": "0",
+        "sdpMLineIndex": 0
+    }
+
+async def seed(conn, sessions):
+    admin_id = await conn.fetchval("SELECT id FROM users WHERE role = 'admin' LIMIT 1")
+    test_id = uuid.uuid4()
+    await conn.execute("""
+        INSERT INTO tests (id, title, description, duration_minutes, created_by)
+        VALUES ($1, $2, $3, $4, $5)
+    """, test_id, "ICE benchmark", "Seeded by benchmark_ice_batching.py", 60, admin_id)
+
+    invite_ids = [uuid.uuid4() for _ in range(sessions)]
+    await conn.executemany("""
+        INSERT INTO test_invites (id, test_id, applicant_email, applicant_name, invited_by,
+                                  invite_token, status, started_at)
+        VALUES ($1, $2, $3, $4, $5, $6, 'in_progress', $7)
+    """, [(invite_id, test_id, f"ice{i}@example.com", f"Ice {i}", admin_id, uuid.uuid4(), datetime.now(timezone.utc))
+          for i, invite_id in enumerate(invite_ids)])
+
+    return test_id, [str(invite_id) for invite_id in invite_ids]
+
+async def cleanup(conn, test_id, invite_ids):
+    async with conn.transaction():
+        await conn.execute("DELETE FROM webrtc_signals WHERE invite_id = ANY($1::uuid[])", invite_ids)
+        await conn.execute("DELETE FROM active_webrtc_sessions WHERE invite_id = ANY($1::uuid[])", invite_ids)
+        await conn.execute("DELETE FROM test_invites WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM tests WHERE id = $1", test_id)
+
+async def setup_per_candidate(client, invite_id, candidates):
+    await client.post(f"{API_URL}/webrtc/offer", json={
+        "type": "offer", "sdp": "v=0 benchmark", "invite_id": invite_id, "from": "applicant"})
+    responses = await asyncio.gather(*[
+        client.post(f"{API_URL}/webrtc/ice-candidate", json={
+            "candidate": candidate, "invite_id": invite_id, "from": "applicant"})
+        for candidate in candidates
+    ])
+    return 1 + len(responses), all(response.status_code == 200 for response in responses)
+
+async def setup_batched(client, invite_id, candidates):
+    await client.post(f"{API_URL}/webrtc/offer", json={
+        "type": "offer", "sdp": "v=0 benchmark", "invite_id": invite_id, "from": "applicant"})
+    response = await client.post(f"{API_URL}/webrtc/ice-candidates", json={
+        "candidates": candidates, "invite_id": invite_id, "from": "applicant"})
+    return 2, response.status_code == 200
+
+async def timed(setup, invite_id, candidates):
+    # One client per session, limited like a browser to 6 connections per origin
+    limits = httpx.Limits(max_connections=BROWSER_CONNECTIONS)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        requests, ok = await setup(client, invite_id, candidates)
+        return time.perf_counter() - start, requests, ok
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def measure(label, setup, invite_ids, candidates):
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(*[timed(setup, invite_id, candidates) for invite_id in invite_ids])
+    wall = time.perf_counter() - wall_start
+
+    latencies = [latency * 1000 for latency, _, ok in results if ok]
+    errors = sum(1 for _, _, ok in results if not ok)
+    requests = sum(count for _, count, _ in results)
+    print(f"{label:<14} {statistics.median(latencies):>9.1f} {percentile(latencies, 99):>9.1f} "
+          f"{max(latencies):>9.1f} {requests:>9} {wall * 1000:>9.1f} {errors:>7}")
+    return statistics.median(latencies)
+
+async def run_benchmark(sessions, candidate_count):
+    conn = await asyncpg.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 5432)),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', 'password'),
+        database=os.environ.get('DB_NAME', 'interview_platform')
+    )
+    candidates = [make_candidate(i) for i in range(candidate_count)]
+    test_id, invite_ids = await seed(conn, sessions)
+    try:
+        print(f"Sessions: {sessions}, ICE candidates per session: {candidate_count}")
+        print(f"{'mode':<14} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'requests':>9} {'wall (ms)':>9} {'errors':>7}")
+        before = await measure("per-candidate", setup_per_candidate, invite_ids, candidates)
+        after = await measure("batched", setup_batched, invite_ids, candidates)
+        print(f"p50 setup speedup: {before / after:.1f}x")
+    finally:
+        await cleanup(conn, test_id, [uuid.UUID(invite_id) for invite_id in invite_ids])
+        await conn.close()
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    candidate_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(run_benchmark(sessions, candidate_count))
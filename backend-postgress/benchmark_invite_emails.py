@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Invite email rendering benchmark: the previous f-string template plus MIME
+assembly versus the precompiled EmailTemplate engine (render_invite_email)
+with its multipart/alternative message.
+
+Everything runs in-process; nothing is sent.
+
+Usage: python benchmark_invite_emails.py [renders]
+"""
+
+import sys
+import time
+from datetime import datetime, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Optional
+
+from fastapi_postgres_backend import build_email_message, email_branding_from_settings, render_invite_email
+
+SETTINGS = {
+    "from_name": "Acme Hiring",
+    "from_email": "noreply@example.com",
+    "brand_color": "#0f766e",
+    "brand_hover_color": "#115e59"
+}
+
+def legacy_invite_email(applicant_name: str, test_title: str, invite_url: str, company_name: str = "Interview Team", scheduled_date: Optional[datetime] = None, admin_scheduled: bool = False, no_schedule: bool = False) -> str:
+    """The previous renderer: the whole document rebuilt by one f-string per call"""
+    return f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Test Invitation</title>
+        <style>
+            body {{
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+                background-color: #f4f4f4;
+            }}
+            .container {{
+                background-color: #ffffff;
+                padding: 30px;
+                border-radius: 10px;
+                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            }}
+            .header {{
+                text-align: center;
+                margin-bottom: 30px;
+                padding-bottom: 20px;
+                border-bottom: 2px solid #e0e0e0;
+            }}
+            .logo {{
+                font-size: 24px;
+                font-weight: bold;
+                color: #2563eb;
+                margin-bottom: 10px;
+            }}
+            .title {{
+                font-size: 28px;
+                color: #1f2937;
+                margin-bottom: 20px;
+            }}
+            .content {{
+                margin-bottom: 30px;
+            }}
+            .test-info {{
+                background-color: #f8fafc;
+                padding: 20px;
+                border-radius: 8px;
+                border-left: 4px solid #2563eb;
+                margin: 20px 0;
+            }}
+            .test-title {{
+                font-size: 20px;
+                font-weight: bold;
+                color: #1f2937;
+                margin-bottom: 10px;
+            }}
+            .cta-button {{
+                display: inline-block;
+                background-color: #2563eb;
+                color: white;
+                padding: 15px 30px;
+                text-decoration: none;
+                border-radius: 8px;
+                font-weight: bold;
+                font-size: 16px;
+                margin: 20px 0;
+                transition: background-color 0.3s;
+            }}
+            .cta-button:hover {{
+                background-color: #1d4ed8;
+            }}
+            .instructions {{
+                background-color: #fef3c7;
+                padding: 15px;
+                border-radius: 8px;
+                border-left: 4px solid #f59e0b;
+                margin: 20px 0;
+            }}
+            .footer {{
+                text-align: center;
+                margin-top: 30px;
+                padding-top: 20px;
+                border-top: 1px solid #e0e0e0;
+                color: #6b7280;
+                font-size: 14px;
+            }}
+            .security-note {{
+                background-color: #f3f4f6;
+                padding: 15px;
+                border-radius: 8px;
+                margin: 20px 0;
+                font-size: 14px;
+                color: #6b7280;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <div class="logo">🎯 Interview Platform</div>
+                <h1 class="title">Test Invitation</h1>
+            </div>
+            
+            <div class="content">
+                <p>Hi <strong>{applicant_name}</strong>,</p>
+                
+                <p>You have been invited to take a pre-interview assessment. This is an important step in our evaluation process.</p>
+                
+                <div class="test-info">
+                    <div class="test-title">📝 {test_title}</div>
+                    <p>Please complete this assessment at your earliest convenience to proceed with your application.</p>
+                </div>
+                
+                <div class="instructions">
+                    <h3>📋 Instructions:</h3>
+                    <ul>
+                        <li>Click the button below to access the platform</li>
+                        <li>Sign up or log in to your account</li>
+                        {"<li>Your test has been scheduled for: <strong>" + scheduled_date.strftime('%B %d, %Y at %I:%M %p') + "</strong></li>" if admin_scheduled and scheduled_date else "<li>You can take the test anytime at your convenience</li>" if no_schedule else "<li>Choose a convenient date and time for your assessment</li>"}
+                        <li>Ensure you have a stable internet connection</li>
+                        <li>Find a quiet environment for the test</li>
+                        <li>Have a valid ID ready for verification</li>
+                    </ul>
+                </div>
+                
+                <div style="text-align: center;">
+                    <a href="{invite_url}" class="cta-button">🚀 {"Access Platform" if admin_scheduled and scheduled_date else "Take Test Anytime" if no_schedule else "Sign Up & Take Test"}</a>
+                </div>
+                
+                <div class="security-note">
+                    <strong>🔒 Security Note:</strong> This link is unique to you and should not be shared with others. The assessment will be monitored for integrity purposes.
+                </div>
+                
+                <p>If you have any questions or technical issues, please contact our support team immediately.</p>
+                
+                <p>Good luck with your assessment!</p>
+            </div>
+            
+            <div class="footer">
+                <p>Best regards,<br><strong>{company_name}</strong></p>
+                <p style="font-size: 12px; color: #9ca3af;">
+                    This is an automated message. Please do not reply to this email.
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+def legacy_message(to_email, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = f"{SETTINGS['from_name']} <{SETTINGS['from_email']}>"
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg.as_string()
+
+def recipients(count):
+    scheduled = datetime(2026, 3, 2, 14, 30, tzinfo=timezone.utc)
+    for i in range(count):
+        # Cycle through the three schedule variants
+        yield (f"Candidate {i}", f"candidate{i}@example.com",
+               scheduled if i % 3 == 0 else None, i % 3 == 0, i % 3 == 1)
+
+def run_legacy(count):
+    render = mime = 0.0
+    for name, email, scheduled_date, admin_scheduled, no_schedule in recipients(count):
+        start = time.perf_counter()
+        body = legacy_invite_email(name, "Backend Engineering", "https://interviews.example.com",
+                                   "Interview Team", scheduled_date, admin_scheduled, no_schedule)
+        middle = time.perf_counter()
+        legacy_message(email, "Test Invitation: Backend Engineering", body)
+        render += middle - start
+        mime += time.perf_counter() - middle
+    return render, mime
+
+def run_engine(count):
+    branding = email_branding_from_settings(SETTINGS)
+    render = mime = 0.0
+    for name, email, scheduled_date, admin_scheduled, no_schedule in recipients(count):
+        start = time.perf_counter()
+        body, text_body = render_invite_email(name, "Backend Engineering", "https://interviews.example.com",
+                                              branding, scheduled_date, admin_scheduled, no_schedule)
+        middle = time.perf_counter()
+        build_email_message(SETTINGS, email, "Test Invitation: Backend Engineering", body, text_body)
+        render += middle - start
+        mime += time.perf_counter() - middle
+    return render, mime
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    # Warm up so the template compilation is not counted against the engine
+    run_legacy(100)
+    run_engine(100)
+
+    legacy_render, legacy_mime = run_legacy(count)
+    engine_render, engine_mime = run_engine(count)
+
+    print(f"{count} renders")
+    print(f"{'':<28} {'render (ms)':>12} {'MIME (ms)':>10} {'total (ms)':>11} {'us/email':>9}")
+    for label, render, mime in (("f-string, HTML only", legacy_render, legacy_mime),
+                                ("precompiled, HTML + text", engine_render, engine_mime)):
+        total = render + mime
+        print(f"{label:<28} {render * 1000:>12.1f} {mime * 1000:>10.1f} {total * 1000:>11.1f} {total / count * 1e6:>9.1f}")
+    print(f"Speedup per email: {(legacy_render + legacy_mime) / (engine_render + engine_mime):.1f}x")
+
+if __name__ == "__main__":
+    main()
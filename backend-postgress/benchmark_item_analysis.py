@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for GET /api/tests/{test_id}/item-analysis.
+
+Seeds a test with QUESTIONS four-option multiple choice questions and
+SUBMISSIONS completed submissions directly in Postgres (SUBMISSIONS x
+QUESTIONS answer rows, drawn from a simple ability/difficulty model), then
+times the endpoint against the running backend: cold reads, which reload and
+recompute the analysis, and warm reads served from the worker's cache.
+Seeded rows are removed afterwards.
+
+Usage: python benchmark_item_analysis.py [submissions] [questions] [runs]
+"""
+
+import asyncio
+import asyncpg
+import httpx
+import json
+import jwt
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_URL = os.environ.get('BENCHMARK_API_URL', 'http://localhost:8000/api')
+OPTIONS = ["A", "B", "C", "D"]
+
+def admin_token(email):
+    # Signed with the backend's SECRET_KEY, like a token from /api/auth/login
+    return jwt.encode(
+        {"sub": email, "exp": datetime.now(timezone.utc) + timedelta(minutes=30)},
+        os.environ.get('SECRET_KEY', 'your-secret-key-here'), algorithm="HS256"
+    )
+
+async def seed(conn, submissions, question_count):
+    admin = await conn.fetchrow("SELECT id, email FROM users WHERE role = 'admin' LIMIT 1")
+    test_id = uuid.uuid4()
+    await conn.execute("""
+        INSERT INTO tests (id, title, description, duration_minutes, created_by)
+        VALUES ($1, $2, $3, $4, $5)
+    """, test_id, "Item analysis benchmark", "Seeded by benchmark_item_analysis.py", 60, admin['id'])
+
+    question_ids = [uuid.uuid4() for _ in range(question_count)]
+    difficulties = [random.gauss(0, 1) for _ in range(question_count)]
+    await conn.executemany("""
+        INSERT INTO questions (id, test_id, type, question, options, correct_answer, points, question_order)
+        VALUES ($1, $2, 'multiple_choice', $3, $4, 'A', 1, $5)
+    """, [(qid, test_id, f"Question {i}", json.dumps(OPTIONS), i) for i, qid in enumerate(question_ids)])
+
+    invite_ids = [uuid.uuid4() for _ in range(submissions)]
+    submission_ids = [uuid.uuid4() for _ in range(submissions)]
+    answer_submissions, answer_questions, answer_texts, scores = [], [], [], []
+    for submission_id in submission_ids:
+        ability = random.gauss(0, 1)
+        correct = 0
+        for question_id, difficulty in zip(question_ids, difficulties):
+            if random.random() < 0.02:
+                answer = ""
+            elif random.random() < 1 / (1 + math.exp(difficulty - ability)):
+                answer = "A"
+                correct += 1
+            else:
+                answer = random.choice(OPTIONS[1:])
+            answer_submissions.append(submission_id)
+            answer_questions.append(question_id)
+            answer_texts.append(answer)
+        scores.append(correct / question_count * 100)
+
+    async with conn.transaction():
+        await conn.execute("""
+            INSERT INTO test_invites (id, test_id, applicant_email, applicant_name, invited_by, status)
+            SELECT i.id, $2, 'item' || i.n || '@example.com', 'Item ' || i.n, $3, 'completed'
+            FROM unnest($1::uuid[]) WITH ORDINALITY AS i(id, n)
+        """, invite_ids, test_id, admin['id'])
+        await conn.execute("""
+            INSERT INTO test_submissions (id, invite_id, test_id, applicant_email, auto_score, final_score)
+            SELECT s.id, s.invite_id, $3, 'item' || s.n || '@example.com', s.score, s.score
+            FROM unnest($1::uuid[], $2::uuid[], $4::float8[]) WITH ORDINALITY AS s(id, invite_id, score, n)
+        """, submission_ids, invite_ids, test_id, scores)
+        await conn.execute("""
+            INSERT INTO test_answers (submission_id, question_id, answer)
+            SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::text[])
+        """, answer_submissions, answer_questions, answer_texts)
+        # Rows written behind the API: give the test its statistics row directly
+        await conn.execute("""
+            INSERT INTO test_statistics (test_id, submission_count, score_sum, score_sum_squares)
+            VALUES ($1, $2, $3, $4)
+        """, test_id, submissions, sum(scores), sum(score * score for score in scores))
+
+    return test_id, admin['email'], len(answer_texts)
+
+async def cleanup(conn, test_id):
+    async with conn.transaction():
+        await conn.execute("""
+            DELETE FROM test_answers WHERE submission_id IN (
+                SELECT id FROM test_submissions WHERE test_id = $1
+            )
+        """, test_id)
+        await conn.execute("DELETE FROM test_submissions WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM test_invites WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM questions WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM tests WHERE id = $1", test_id)
+
+async def timed_get(client, url, headers):
+    start = time.perf_counter()
+    response = await client.get(url, headers=headers)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000, response.json()
+
+async def run_benchmark(submissions, question_count, runs):
+    conn = await asyncpg.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 5432)),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', 'password'),
+        database=os.environ.get('DB_NAME', 'interview_platform')
+    )
+    test_id, admin_email, answer_count = await seed(conn, submissions, question_count)
+    try:
+        url = f"{API_URL}/tests/{test_id}/item-analysis"
+        headers = {"Authorization": f"Bearer {admin_token(admin_email)}"}
+        cold, warm = [], []
+        async with httpx.AsyncClient(timeout=120) as client:
+            for _ in range(runs):
+                # Moving the statistics timestamp is what a new submission does to the cache
+                await conn.execute("UPDATE test_statistics SET updated_at = clock_timestamp() WHERE test_id = $1", test_id)
+                latency, analysis = await timed_get(client, url, headers)
+                cold.append(latency)
+                latency, _ = await timed_get(client, url, headers)
+                warm.append(latency)
+
+        flagged = sum(1 for item in analysis['items'] if item['flags'])
+        print(f"Submissions: {submissions}, questions: {question_count}, answer rows: {answer_count}")
+        print(f"Answers analyzed: {analysis['answers_analyzed']}, questions flagged: {flagged}")
+        print(f"cold (recompute) p50: {statistics.median(cold):.1f} ms, max: {max(cold):.1f} ms")
+        print(f"warm (cached)    p50: {statistics.median(warm):.1f} ms, max: {max(warm):.1f} ms")
+    finally:
+        await cleanup(conn, test_id)
+        await conn.close()
+
+if __name__ == "__main__":
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    question_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    asyncio.run(run_benchmark(submissions, question_count, runs))
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Proctoring load simulator: PAIRS candidate/admin pairs run the full
+monitoring flow against the running backend at the same time.
+
+Per pair the candidate calls start-session, posts its offer and a batch of
+ICE candidates, then long-polls /webrtc/signals until the answer arrives.
+The admin long-polls until the offer arrives, posts the answer and its own
+candidates. Both send a heartbeat and the candidate ends the session, as
+the REST fallback of the frontend does.
+
+Reports setup latency percentiles (start-session until the candidate sees
+the answer), requests per second, per-endpoint latency, error rates and
+database queries per session. The queries come from pg_stat_statements
+when it is loaded, otherwise from committed transactions in
+pg_stat_database (every autocommit statement is one); both include the
+backend's background workers. The report is written as JSON to
+test_reports/. Seeded rows are removed afterwards.
+
+Usage: python benchmark_proctoring_load.py [pairs] [candidates] [ramp_seconds]
+"""
+
+import asyncio
+import asyncpg
+import httpx
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_URL = os.environ.get('BENCHMARK_API_URL', 'http://localhost:8000/api')
+REPORT_DIR = Path(__file__).resolve().parent.parent / 'test_reports'
+BROWSER_CONNECTIONS = 6
+LONG_POLL_WAIT = 20
+SETUP_TIMEOUT = 120
+# Idle backends publish their pg_stat_database counters within 10 s
+STATS_FLUSH_SECONDS = 11
+
+def make_candidate(side, i):
+    return {
+        "candidate": f"candidate:{842163049 + i} 1 udp 1677729535 198.51.100.{i % 250} {50000 + i} "
+                     f"typ srflx raddr 10.0.0.5 rport {50000 + i} generation 0 ufrag {side[:4]} network-cost 999",
+        "sdpMid": "0",
+        "sdpMLineIndex": 0
+    }
+
+def make_sdp(kind):
+    # Roughly the size of a browser's audio+video SDP
+    return f"v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\ns=- {kind}\r\n" + "a=benchmark-line\r\n" * 150
+
+class SessionFailed(Exception):
+    pass
+
+class Recorder:
+    """Per-endpoint latencies and errors across every simulated browser"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    @property
+    def requests(self):
+        return sum(len(latencies) for latencies in self.latencies.values()) + self.failed_requests
+
+    @property
+    def failed_requests(self):
+        return sum(self.errors.values())
+
+    async def call(self, client, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, f"{API_URL}{path}", **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[f"{endpoint}: {type(e).__name__}"] += 1
+            raise SessionFailed(f"{endpoint}: {type(e).__name__}")
+        if response.status_code >= 400:
+            self.errors[f"{endpoint}: HTTP {response.status_code}"] += 1
+            raise SessionFailed(f"{endpoint}: HTTP {response.status_code}")
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        return response.json()
+
+async def seed(conn, pairs):
+    admin_id = await conn.fetchval("SELECT id FROM users WHERE role = 'admin' LIMIT 1")
+    test_id = uuid.uuid4()
+    await conn.execute("""
+        INSERT INTO tests (id, title, description, duration_minutes, created_by)
+        VALUES ($1, $2, $3, $4, $5)
+    """, test_id, "Proctoring load", "Seeded by benchmark_proctoring_load.py", 60, admin_id)
+
+    invite_ids = [uuid.uuid4() for _ in range(pairs)]
+    await conn.executemany("""
+        INSERT INTO test_invites (id, test_id, applicant_email, applicant_name, invited_by,
+                                  invite_token, status, started_at)
+        VALUES ($1, $2, $3, $4, $5, $6, 'in_progress', $7)
+    """, [(invite_id, test_id, f"proctor{i}@example.com", f"Proctor {i}", admin_id, uuid.uuid4(), datetime.now(timezone.utc))
+          for i, invite_id in enumerate(invite_ids)])
+
+    return test_id, [str(invite_id) for invite_id in invite_ids]
+
+async def cleanup(conn, test_id, invite_ids):
+    async with conn.transaction():
+        await conn.execute("DELETE FROM webrtc_signals WHERE invite_id = ANY($1::uuid[])", invite_ids)
+        await conn.execute("DELETE FROM active_webrtc_sessions WHERE invite_id = ANY($1::uuid[])", invite_ids)
+        await conn.execute("DELETE FROM test_invites WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM tests WHERE id = $1", test_id)
+
+async def db_query_count(conn):
+    """Statements run in this database so far, and how they were counted"""
+    try:
+        calls = await conn.fetchval("""
+            SELECT sum(calls) FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+        """)
+        return "pg_stat_statements", int(calls or 0)
+    except asyncpg.PostgresError:
+        await conn.execute("SELECT pg_stat_clear_snapshot()")
+        transactions = await conn.fetchval("""
+            SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()
+        """)
+        return "pg_stat_database transactions", int(transactions)
+
+async def poll_for(recorder, client, invite_id, signal_type, deadline):
+    """Long-poll the invite's signals until one of signal_type shows up"""
+    params = {}
+    while time.perf_counter() < deadline:
+        data = await recorder.call(client, "signals", "GET", f"/webrtc/signals/{invite_id}", params=params)
+        if any(signal["type"] == signal_type for signal in data["signals"]):
+            return
+        params = {"since": data["cursor"], "wait": LONG_POLL_WAIT} if data["cursor"] else {"wait": LONG_POLL_WAIT}
+    raise SessionFailed(f"no {signal_type} within {SETUP_TIMEOUT} s")
+
+async def admin_side(recorder, client, invite_id, candidates, deadline):
+    await poll_for(recorder, client, invite_id, "offer", deadline)
+    await recorder.call(client, "answer", "POST", "/webrtc/answer", json={
+        "type": "answer", "sdp": make_sdp("answer"), "invite_id": invite_id, "from": "admin"})
+    await recorder.call(client, "ice-candidates", "POST", "/webrtc/ice-candidates", json={
+        "invite_id": invite_id, "from": "admin", "candidates": candidates})
+    await recorder.call(client, "heartbeat", "POST", f"/webrtc/heartbeat/{invite_id}")
+
+async def run_pair(recorder, invite_id, candidates, delay):
+    await asyncio.sleep(delay)
+    # Each browser is limited to 6 connections per origin
+    limits = httpx.Limits(max_connections=BROWSER_CONNECTIONS)
+    timeout = LONG_POLL_WAIT + 30
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as applicant, \
+               httpx.AsyncClient(timeout=timeout, limits=limits) as admin:
+        start = time.perf_counter()
+        deadline = start + SETUP_TIMEOUT
+        admin_task = None
+        try:
+            await recorder.call(applicant, "start-session", "POST", f"/webrtc/start-session/{invite_id}")
+            admin_task = asyncio.create_task(admin_side(recorder, admin, invite_id, candidates["admin"], deadline))
+            await recorder.call(applicant, "offer", "POST", "/webrtc/offer", json={
+                "type": "offer", "sdp": make_sdp("offer"), "invite_id": invite_id, "from": "applicant"})
+            await recorder.call(applicant, "ice-candidates", "POST", "/webrtc/ice-candidates", json={
+                "invite_id": invite_id, "from": "applicant", "candidates": candidates["applicant"]})
+            await poll_for(recorder, applicant, invite_id, "answer", deadline)
+            setup = time.perf_counter() - start
+
+            await admin_task
+            await recorder.call(applicant, "heartbeat", "POST", f"/webrtc/heartbeat/{invite_id}")
+            await recorder.call(applicant, "end-session", "POST", f"/webrtc/end-session/{invite_id}")
+            return setup, None
+        except SessionFailed as e:
+            if admin_task:
+                admin_task.cancel()
+                await asyncio.gather(admin_task, return_exceptions=True)
+            return None, str(e)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def latency_summary(seconds):
+    if not seconds:
+        return None
+    millis = [value * 1000 for value in seconds]
+    return {
+        "p50_ms": round(percentile(millis, 50), 1),
+        "p90_ms": round(percentile(millis, 90), 1),
+        "p99_ms": round(percentile(millis, 99), 1),
+        "max_ms": round(max(millis), 1),
+        "mean_ms": round(statistics.mean(millis), 1)
+    }
+
+async def run_benchmark(pairs, candidate_count, ramp_seconds):
+    conn = await asyncpg.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 5432)),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', 'password'),
+        database=os.environ.get('DB_NAME', 'interview_platform')
+    )
+    candidates = {side: [make_candidate(side, i) for i in range(candidate_count)] for side in ("applicant", "admin")}
+    test_id, invite_ids = await seed(conn, pairs)
+    recorder = Recorder()
+    try:
+        print(f"Pairs: {pairs}, ICE candidates per side: {candidate_count}, ramp: {ramp_seconds} s")
+        method, queries_before = await db_query_count(conn)
+        wall_start = time.perf_counter()
+        results = await asyncio.gather(*[
+            run_pair(recorder, invite_id, candidates, ramp_seconds * i / pairs)
+            for i, invite_id in enumerate(invite_ids)
+        ])
+        wall = time.perf_counter() - wall_start
+        if method != "pg_stat_statements":
+            await asyncio.sleep(STATS_FLUSH_SECONDS)
+        _, queries_after = await db_query_count(conn)
+    finally:
+        await cleanup(conn, test_id, [uuid.UUID(invite_id) for invite_id in invite_ids])
+        await conn.close()
+
+    setups = [setup for setup, error in results if error is None]
+    failures = defaultdict(int)
+    for _, error in results:
+        if error:
+            failures[error] += 1
+    queries = queries_after - queries_before
+
+    report = {
+        "benchmark": "proctoring_load",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "api_url": API_URL,
+        "config": {
+            "pairs": pairs,
+            "ice_candidates_per_side": candidate_count,
+            "ramp_seconds": ramp_seconds,
+            "long_poll_wait_seconds": LONG_POLL_WAIT,
+            "browser_connections": BROWSER_CONNECTIONS
+        },
+        "wall_seconds": round(wall, 3),
+        "sessions": {
+            "total": pairs,
+            "completed": len(setups),
+            "failed": pairs - len(setups),
+            "error_rate": round((pairs - len(setups)) / pairs, 4),
+            "failures": dict(failures)
+        },
+        "setup_latency": latency_summary(setups),
+        "requests": {
+            "total": recorder.requests,
+            "per_second": round(recorder.requests / wall, 1),
+            "failed": recorder.failed_requests,
+            "error_rate": round(recorder.failed_requests / recorder.requests, 4) if recorder.requests else 0,
+            "errors": dict(recorder.errors)
+        },
+        "endpoints": {
+            endpoint: {"count": len(latencies), **latency_summary(latencies)}
+            for endpoint, latencies in sorted(recorder.latencies.items())
+        },
+        "database": {
+            "counted_from": method,
+            "queries": queries,
+            "queries_per_session": round(queries / pairs, 1)
+        }
+    }
+
+    REPORT_DIR.mkdir(exist_ok=True)
+    report_path = REPORT_DIR / f"proctoring_load_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
+    report_path.write_text(json.dumps(report, indent=2) + "\n")
+
+    setup = report["setup_latency"] or {}
+    print(f"Sessions completed: {len(setups)}/{pairs} (error rate {report['sessions']['error_rate']:.2%})")
+    print(f"Setup latency p50/p90/p99: {setup.get('p50_ms')} / {setup.get('p90_ms')} / {setup.get('p99_ms')} ms")
+    print(f"Requests: {recorder.requests} in {wall:.1f} s ({report['requests']['per_second']} req/s, "
+          f"{recorder.failed_requests} failed)")
+    print(f"DB queries per session: {report['database']['queries_per_session']} ({method})")
+    print(f"{'endpoint':<16} {'count':>7} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for endpoint, summary in report["endpoints"].items():
+        print(f"{endpoint:<16} {summary['count']:>7} {summary['p50_ms']:>9.1f} {summary['p99_ms']:>9.1f}")
+    print(f"Report written to {report_path}")
+
+if __name__ == "__main__":
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    candidate_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    ramp_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    asyncio.run(run_benchmark(pairs, candidate_count, ramp_seconds))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark for question writes: one INSERT per question (old path) versus the
+bulk executemany path used by create_test / update_test / auto_generate_test.
+
+Every run happens inside a transaction that is rolled back, so no data is kept.
+Usage: python benchmark_question_writes.py [runs]
+"""
+
+import asyncio
+import asyncpg
+import json
+import os
+import sys
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUESTION_COUNTS = [10, 100, 1000]
+
+INSERT_QUESTION_SQL = """
+    INSERT INTO questions (id, test_id, type, question, options, correct_answer,
+                         expected_language, points, question_order)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+"""
+
+def make_records(test_id, count):
+    options = json.dumps(["Option A", "Option B", "Option C", "Option D"])
+    return [
+        (uuid.uuid4(), test_id, "multiple_choice", f"Benchmark question {i}",
+         options, "Option A", None, 1, i)
+        for i in range(count)
+    ]
+
+async def create_test_row(conn, admin_id):
+    test_id = uuid.uuid4()
+    await conn.execute("""
+        INSERT INTO tests (id, title, description, duration_minutes, created_by)
+        VALUES ($1, $2, $3, $4, $5)
+    """, test_id, "Benchmark test", "Rolled back after each run", 30, admin_id)
+    return test_id
+
+async def per_row_insert(conn, admin_id, count):
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        start = time.perf_counter()
+        test_id = await create_test_row(conn, admin_id)
+        for record in make_records(test_id, count):
+            await conn.execute(INSERT_QUESTION_SQL, *record)
+        return time.perf_counter() - start
+    finally:
+        await tr.rollback()
+
+async def bulk_insert(conn, admin_id, count):
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        start = time.perf_counter()
+        test_id = await create_test_row(conn, admin_id)
+        await conn.executemany(INSERT_QUESTION_SQL, make_records(test_id, count))
+        return time.perf_counter() - start
+    finally:
+        await tr.rollback()
+
+async def run_benchmark(runs):
+    conn = await asyncpg.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 5432)),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', 'password'),
+        database=os.environ.get('DB_NAME', 'interview_platform')
+    )
+    try:
+        admin_id = await conn.fetchval("SELECT id FROM users WHERE role = 'admin' LIMIT 1")
+
+        print(f"{'questions':>10} {'per-row (ms)':>14} {'bulk (ms)':>12} {'speedup':>9}")
+        for count in QUESTION_COUNTS:
+            per_row = min([await per_row_insert(conn, admin_id, count) for _ in range(runs)])
+            bulk = min([await bulk_insert(conn, admin_id, count) for _ in range(runs)])
+            print(f"{count:>10} {per_row * 1000:>14.1f} {bulk * 1000:>12.1f} {per_row / bulk:>8.1f}x")
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    asyncio.run(run_benchmark(runs))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+SMTP throughput benchmark: a fresh connect/login/quit per message (old
+send_email) versus the backend's pooled SMTP sessions.
+
+Starts a local SMTP stand-in that adds a fixed delay to the greeting and to
+AUTH to mimic the TLS handshake and login round trips of a real provider.
+No email leaves the machine.
+
+Usage: python benchmark_smtp_sessions.py [messages] [handshake_ms]
+"""
+
+import os
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# The stand-in speaks plain SMTP, so the pooled path must skip STARTTLS
+os.environ['SMTP_REQUIRE_TLS'] = 'false'
+
+from fastapi_postgres_backend import deliver_smtp_message, smtp_pool, SMTP_POOL_SIZE
+
+HANDSHAKE_DELAY = 0.05
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    """Accepts everything and discards message data"""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        time.sleep(HANDSHAKE_DELAY)
+        self.reply("220 stand-in ESMTP ready")
+        in_data = False
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    self.reply("250 OK: queued")
+                continue
+
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-stand-in")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command == "HELO":
+                self.reply("250 stand-in")
+            elif command == "AUTH":
+                time.sleep(HANDSHAKE_DELAY)
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                in_data = True
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+class StandInSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def fresh_session_send(settings, to_email, subject, body):
+    """What send_email did before pooling: one full session per message"""
+    msg = MIMEMultipart()
+    msg['From'] = f"{settings['from_name']} <{settings['from_email']}>"
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+
+    server = smtplib.SMTP(settings['smtp_host'], settings['smtp_port'])
+    server.login(settings['smtp_user'], settings['smtp_password'])
+    server.sendmail(settings['from_email'], to_email, msg.as_string())
+    server.quit()
+
+def measure(send, settings, messages):
+    body = "<html><body><p>Benchmark invite</p></body></html>"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SMTP_POOL_SIZE) as executor:
+        list(executor.map(
+            lambda i: send(settings, f"candidate{i}@example.com", "Test Invitation: Benchmark", body),
+            range(messages)
+        ))
+    return messages / (time.perf_counter() - start)
+
+def main():
+    global HANDSHAKE_DELAY
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    HANDSHAKE_DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    server = StandInSMTPServer(("127.0.0.1", 0), StandInSMTPHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = {
+        "smtp_host": "127.0.0.1",
+        "smtp_port": server.server_address[1],
+        "smtp_user": "bench",
+        "smtp_password": "bench",
+        "from_email": "noreply@example.com",
+        "from_name": "Benchmark"
+    }
+
+    try:
+        print(f"{messages} messages, {SMTP_POOL_SIZE} concurrent senders, "
+              f"{HANDSHAKE_DELAY * 1000:.0f} ms simulated handshake/login")
+        before = measure(fresh_session_send, settings, messages)
+        print(f"Fresh session per message: {before:8.1f} msg/s")
+        after = measure(deliver_smtp_message, settings, messages)
+        print(f"Pooled sessions:           {after:8.1f} msg/s ({after / before:.1f}x)")
+        print(f"Pool stats: {smtp_pool.stats}")
+    finally:
+        smtp_pool.close_all()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
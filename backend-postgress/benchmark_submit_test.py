@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Concurrent submit benchmark for POST /api/submit-test/{token}.
+
+Seeds a test with QUESTIONS questions plus CANDIDATES in-progress invites
+directly in Postgres, fires every submit at the running backend at once and
+reports p50/p99 latency. Run it once against the old build and once against
+the new build to compare. Seeded rows are removed afterwards.
+
+Usage: python benchmark_submit_test.py [candidates] [questions]
+"""
+
+import asyncio
+import asyncpg
+import httpx
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_URL = os.environ.get('BENCHMARK_API_URL', 'http://localhost:8000/api')
+
+async def seed(conn, candidates, question_count):
+    admin_id = await conn.fetchval("SELECT id FROM users WHERE role = 'admin' LIMIT 1")
+    test_id = uuid.uuid4()
+    await conn.execute("""
+        INSERT INTO tests (id, title, description, duration_minutes, created_by)
+        VALUES ($1, $2, $3, $4, $5)
+    """, test_id, "Submit benchmark", "Seeded by benchmark_submit_test.py", 60, admin_id)
+
+    options = json.dumps(["A", "B", "C", "D"])
+    question_ids = [uuid.uuid4() for _ in range(question_count)]
+    await conn.executemany("""
+        INSERT INTO questions (id, test_id, type, question, options, correct_answer, points, question_order)
+        VALUES ($1, $2, 'multiple_choice', $3, $4, 'A', 1, $5)
+    """, [(qid, test_id, f"Question {i}", options, i) for i, qid in enumerate(question_ids)])
+
+    tokens = [uuid.uuid4() for _ in range(candidates)]
+    await conn.executemany("""
+        INSERT INTO test_invites (test_id, applicant_email, applicant_name, invited_by,
+                                  invite_token, status, started_at)
+        VALUES ($1, $2, $3, $4, $5, 'in_progress', $6)
+    """, [(test_id, f"bench{i}@example.com", f"Bench {i}", admin_id, token, datetime.now(timezone.utc))
+          for i, token in enumerate(tokens)])
+
+    return test_id, [str(qid) for qid in question_ids], [str(token) for token in tokens]
+
+async def cleanup(conn, test_id):
+    async with conn.transaction():
+        await conn.execute("""
+            DELETE FROM test_answers WHERE submission_id IN (
+                SELECT id FROM test_submissions WHERE test_id = $1
+            )
+        """, test_id)
+        await conn.execute("DELETE FROM test_submissions WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM test_invites WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM questions WHERE test_id = $1", test_id)
+        await conn.execute("DELETE FROM tests WHERE id = $1", test_id)
+
+async def submit(client, token, question_ids):
+    payload = {"answers": [{"question_id": qid, "answer": "A"} for qid in question_ids]}
+    start = time.perf_counter()
+    response = await client.post(f"{API_URL}/submit-test/{token}", json=payload)
+    return time.perf_counter() - start, response.status_code
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_benchmark(candidates, question_count):
+    conn = await asyncpg.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        port=int(os.environ.get('DB_PORT', 5432)),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', 'password'),
+        database=os.environ.get('DB_NAME', 'interview_platform')
+    )
+    test_id, question_ids, tokens = await seed(conn, candidates, question_count)
+    try:
+        limits = httpx.Limits(max_connections=candidates)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+            wall_start = time.perf_counter()
+            results = await asyncio.gather(*[submit(client, token, question_ids) for token in tokens])
+            wall = time.perf_counter() - wall_start
+
+        latencies = [latency * 1000 for latency, status in results if status == 200]
+        errors = sum(1 for _, status in results if status != 200)
+
+        print(f"Candidates: {candidates}, questions per test: {question_count}")
+        print(f"Errors: {errors}")
+        if latencies:
+            print(f"p50: {statistics.median(latencies):.1f} ms")
+            print(f"p99: {percentile(latencies, 99):.1f} ms")
+            print(f"max: {max(latencies):.1f} ms")
+        print(f"Throughput: {len(latencies) / wall:.1f} submits/s")
+    finally:
+        await cleanup(conn, test_id)
+        await conn.close()
+
+if __name__ == "__main__":
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    question_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(run_benchmark(candidates, question_count))
@@ -33,7 +33,8 @@ CREATE TABLE tests (
     duration_minutes INTEGER NOT NULL,
     created_by UUID REFERENCES users(id) ON DELETE SET NULL,
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    definition_version INTEGER NOT NULL DEFAULT 1
 );
 
 -- Questions table
@@ -83,22 +84,40 @@ CREATE TABLE test_answers (
     answer TEXT NOT NULL
 );
 
--- WebRTC signals table (for video monitoring)
+-- WebRTC signals table (for video monitoring), daily partitions on created_at
+-- (from partition_webrtc_signals.sql; seq from add_webrtc_signal_seq.sql)
 CREATE TABLE webrtc_signals (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    invite_id UUID,
     type VARCHAR(50) NOT NULL,
     data JSONB NOT NULL,
-    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- Order of the REST signal cursor, numbered per invite from webrtc_signal_counters
+    seq BIGINT NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows whose day has no partition yet
+CREATE TABLE webrtc_signals_default PARTITION OF webrtc_signals DEFAULT;
+
+-- Last seq handed out per invite; the storing transaction keeps the row locked until it
+-- commits, so an invite's signals commit in seq order. Not a foreign key: ICE candidates
+-- are stored for any invite id, like the rest of webrtc_signals
+CREATE TABLE webrtc_signal_counters (
+    invite_id UUID PRIMARY KEY,
+    last_seq BIGINT NOT NULL
 );
 
 -- Active WebRTC sessions table (for managing video monitoring sessions)
+-- Signal ids are not foreign keys: a key into a partitioned table must include created_at
 CREATE TABLE active_webrtc_sessions (
     invite_id UUID PRIMARY KEY REFERENCES test_invites(id) ON DELETE CASCADE,
-    admin_offer_id UUID REFERENCES webrtc_signals(id),
-    applicant_answer_id UUID REFERENCES webrtc_signals(id),
+    admin_offer_id UUID,
+    applicant_answer_id UUID,
     status VARCHAR(50) NOT NULL DEFAULT 'initializing' CHECK (status IN ('initializing', 'offer_sent', 'connected', 'ended')),
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-    ended_at TIMESTAMPTZ
+    ended_at TIMESTAMPTZ,
+    last_heartbeat_at TIMESTAMPTZ
 );
 
 -- Admin notifications table (from add_notifications_table.sql)
@@ -142,6 +161,60 @@ CREATE TABLE admin_theme_settings (
     UNIQUE(admin_id)
 );
 
+-- Email outbox table (from add_email_outbox.sql)
+CREATE TABLE email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    invite_id UUID REFERENCES test_invites(id) ON DELETE CASCADE,
+    admin_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    to_email VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    text_body TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMPTZ
+);
+
+-- Per-test statistics read model (from add_test_statistics.sql)
+-- score_histogram[n] counts final scores in [n - 1, n); the last of the 101 buckets holds exactly 100
+CREATE TABLE test_statistics (
+    test_id UUID PRIMARY KEY REFERENCES tests(id) ON DELETE CASCADE,
+    submission_count INTEGER NOT NULL DEFAULT 0,
+    score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_sum_squares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_histogram INTEGER[] NOT NULL DEFAULT array_fill(0, ARRAY[101]),
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Submission list read model (from add_submission_summaries.sql)
+CREATE TABLE submission_summaries (
+    submission_id UUID PRIMARY KEY REFERENCES test_submissions(id) ON DELETE CASCADE,
+    invite_id UUID NOT NULL,
+    test_id UUID NOT NULL,
+    applicant_email VARCHAR(255) NOT NULL,
+    applicant_name VARCHAR(255) NOT NULL,
+    invite_token UUID,
+    invite_status VARCHAR(50),
+    test_title VARCHAR(255) NOT NULL,
+    test_description TEXT,
+    duration_minutes INTEGER,
+    started_at TIMESTAMPTZ,
+    submitted_at TIMESTAMPTZ,
+    final_score FLOAT,
+    auto_score FLOAT,
+    manual_score FLOAT,
+    scoring_status VARCHAR(20),
+    review_completed_at TIMESTAMPTZ,
+    is_monitored BOOLEAN,
+    total_answers INTEGER NOT NULL DEFAULT 0,
+    manual_questions INTEGER NOT NULL DEFAULT 0,
+    pending_reviews INTEGER NOT NULL DEFAULT 0
+);
+
 -- =====================================================
 -- TABLE MODIFICATIONS (MIGRATIONS)
 -- =====================================================
@@ -242,11 +315,10 @@ CREATE INDEX IF NOT EXISTS idx_submissions_test_id ON test_submissions(test_id);
 CREATE INDEX IF NOT EXISTS idx_submissions_applicant_email ON test_submissions(applicant_email);
 CREATE INDEX IF NOT EXISTS idx_answers_submission_id ON test_answers(submission_id);
 CREATE INDEX IF NOT EXISTS idx_answers_question_id ON test_answers(question_id);
-CREATE INDEX IF NOT EXISTS idx_webrtc_type ON webrtc_signals(type);
-CREATE INDEX IF NOT EXISTS idx_webrtc_created_at ON webrtc_signals(created_at);
-CREATE INDEX IF NOT EXISTS idx_webrtc_invite_id ON webrtc_signals((data->>'invite_id'));
+CREATE INDEX IF NOT EXISTS idx_webrtc_invite_seq ON webrtc_signals(invite_id, seq);
 CREATE INDEX IF NOT EXISTS idx_active_sessions_status ON active_webrtc_sessions(status);
 CREATE INDEX IF NOT EXISTS idx_active_sessions_created_at ON active_webrtc_sessions(created_at);
+CREATE INDEX IF NOT EXISTS idx_active_sessions_heartbeat ON active_webrtc_sessions(last_heartbeat_at) WHERE status <> 'ended';
 
 -- Admin settings indexes
 CREATE INDEX IF NOT EXISTS idx_admin_email_settings_admin_id ON admin_email_settings(admin_id);
@@ -257,12 +329,29 @@ CREATE INDEX IF NOT EXISTS idx_notifications_admin_id ON admin_notifications(adm
 CREATE INDEX IF NOT EXISTS idx_notifications_created_at ON admin_notifications(created_at);
 CREATE INDEX IF NOT EXISTS idx_notifications_is_read ON admin_notifications(is_read);
 
+-- Email outbox indexes
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_email_outbox_invite_id ON email_outbox(invite_id);
+CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox(status);
+
 -- Manual scoring indexes
 CREATE INDEX IF NOT EXISTS idx_answers_manual_score_status ON test_answers(manual_score_status);
 CREATE INDEX IF NOT EXISTS idx_answers_reviewer_id ON test_answers(reviewer_id);
 CREATE INDEX IF NOT EXISTS idx_submissions_scoring_status ON test_submissions(scoring_status);
 CREATE INDEX IF NOT EXISTS idx_submissions_reviewed_by ON test_submissions(reviewed_by);
 
+-- Submission summaries indexes
+-- GET /api/results: newest first, optionally within one test, paged by (submitted_at, id)
+CREATE INDEX IF NOT EXISTS idx_summaries_submitted_at_id ON submission_summaries(submitted_at DESC, submission_id DESC);
+CREATE INDEX IF NOT EXISTS idx_summaries_test_submitted_at_id ON submission_summaries(test_id, submitted_at DESC, submission_id DESC);
+-- GET /api/my-submissions
+CREATE INDEX IF NOT EXISTS idx_summaries_applicant_submitted_at ON submission_summaries(applicant_email, submitted_at DESC);
+-- manual_scoring_queue: oldest first among submissions still under review
+CREATE INDEX IF NOT EXISTS idx_summaries_review_queue ON submission_summaries(submitted_at)
+    WHERE scoring_status IN ('needs_review', 'partially_reviewed');
+-- Invite changes reach their submission's row
+CREATE INDEX IF NOT EXISTS idx_summaries_invite_id ON submission_summaries(invite_id);
+
 -- =====================================================
 -- VIEWS FOR COMMONLY ACCESSED DATA
 -- =====================================================
@@ -302,39 +391,108 @@ FROM test_submissions ts
 JOIN test_invites ti ON ts.invite_id = ti.id
 JOIN tests t ON ts.test_id = t.id;
 
--- Manual scoring queue view
+-- Manual scoring queue view (reads submission_summaries, from add_submission_summaries.sql)
 CREATE OR REPLACE VIEW manual_scoring_queue AS
-SELECT 
-    ts.id as submission_id,
-    ts.applicant_email,
-    ts.submitted_at,
-    ts.scoring_status,
-    t.title as test_title,
-    t.id as test_id,
-    COUNT(ta.id) as total_answers,
-    COUNT(CASE WHEN q.type IN ('essay', 'coding') THEN 1 END) as manual_questions,
-    COUNT(CASE WHEN ta.manual_score_status = 'pending' AND q.type IN ('essay', 'coding') THEN 1 END) as pending_reviews
-FROM test_submissions ts
-JOIN tests t ON ts.test_id = t.id
-JOIN test_answers ta ON ts.id = ta.submission_id
-JOIN questions q ON ta.question_id = q.id
-WHERE ts.scoring_status IN ('needs_review', 'partially_reviewed')
-GROUP BY ts.id, ts.applicant_email, ts.submitted_at, ts.scoring_status, t.title, t.id
-ORDER BY ts.submitted_at ASC;
+SELECT
+    submission_id,
+    applicant_email,
+    submitted_at,
+    scoring_status,
+    test_title,
+    test_id,
+    total_answers,
+    manual_questions,
+    pending_reviews
+FROM submission_summaries
+-- Submissions without answers have nothing to review
+WHERE scoring_status IN ('needs_review', 'partially_reviewed') AND total_answers > 0
+ORDER BY submitted_at ASC;
 
 -- =====================================================
 -- FUNCTIONS
 -- =====================================================
 
--- Function to cleanup old WebRTC signals (older than 1 hour)
+-- Create the daily partitions (UTC days) from from_day (default today) through days_ahead days out.
+-- With unlogged = true they skip the WAL (contents are lost on a crash); a non-null setting
+-- also switches the current and upcoming days over when it changes.
+DROP FUNCTION IF EXISTS create_webrtc_signal_partitions(INTEGER, DATE);
+CREATE OR REPLACE FUNCTION create_webrtc_signal_partitions(days_ahead INTEGER DEFAULT 3, from_day DATE DEFAULT NULL,
+                                                           unlogged BOOLEAN DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_day DATE := COALESCE(from_day, (NOW() AT TIME ZONE 'UTC')::date);
+    last_day DATE := (NOW() AT TIME ZONE 'UTC')::date + days_ahead;
+    partition_name TEXT;
+    lower_bound TIMESTAMPTZ;
+    upper_bound TIMESTAMPTZ;
+    created INTEGER := 0;
+BEGIN
+    -- Every backend worker runs this; only one at a time
+    PERFORM pg_advisory_xact_lock(hashtext('webrtc_signals_partitions'));
+
+    WHILE partition_day <= last_day LOOP
+        partition_name := 'webrtc_signals_p' || to_char(partition_day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            lower_bound := partition_day::timestamp AT TIME ZONE 'UTC';
+            upper_bound := (partition_day + 1)::timestamp AT TIME ZONE 'UTC';
+            EXECUTE format('CREATE %s TABLE %I (LIKE webrtc_signals INCLUDING DEFAULTS)',
+                           CASE WHEN unlogged IS TRUE THEN 'UNLOGGED' ELSE '' END, partition_name);
+            -- Rows that fell into the default partition before this day existed move over
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM webrtc_signals_default WHERE created_at >= $1 AND created_at < $2 RETURNING *)
+                 INSERT INTO %I SELECT * FROM moved', partition_name)
+                USING lower_bound, upper_bound;
+            EXECUTE format('ALTER TABLE webrtc_signals ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, lower_bound, upper_bound);
+            created := created + 1;
+        ELSIF unlogged IS NOT NULL
+              AND (SELECT relpersistence = 'u' FROM pg_class WHERE oid = to_regclass(partition_name)) <> unlogged THEN
+            EXECUTE format('ALTER TABLE %I SET %s', partition_name, CASE WHEN unlogged THEN 'UNLOGGED' ELSE 'LOGGED' END);
+        END IF;
+        partition_day := partition_day + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the daily partitions that ended more than `retention` ago
+CREATE OR REPLACE FUNCTION drop_old_webrtc_signal_partitions(retention INTERVAL DEFAULT INTERVAL '1 day')
+RETURNS INTEGER AS $$
+DECLARE
+    partition_name TEXT;
+    dropped INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('webrtc_signals_partitions'));
+
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'webrtc_signals'::regclass
+        AND child.relname ~ '^webrtc_signals_p[0-9]{8}$'
+        AND (to_date(right(child.relname, 8), 'YYYYMMDD') + 1)::timestamp AT TIME ZONE 'UTC' <= NOW() - retention
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+
+    DELETE FROM webrtc_signals_default WHERE created_at < NOW() - retention;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention entry point (kept under its old name)
 CREATE OR REPLACE FUNCTION cleanup_old_webrtc_signals()
 RETURNS void AS $$
 BEGIN
-    DELETE FROM webrtc_signals
-    WHERE created_at < NOW() - INTERVAL '1 hour';
+    PERFORM create_webrtc_signal_partitions();
+    PERFORM drop_old_webrtc_signal_partitions();
 END;
 $$ LANGUAGE plpgsql;
 
+-- Partitions for today and the next few days (the backend keeps this rolling)
+SELECT create_webrtc_signal_partitions();
+
 -- Function to automatically expire old invites
 CREATE OR REPLACE FUNCTION expire_old_invites()
 RETURNS void AS $$
@@ -346,6 +504,204 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Rebuild every row from test_submissions (also repairs drift after manual edits)
+CREATE OR REPLACE FUNCTION refresh_test_statistics()
+RETURNS void AS $$
+BEGIN
+    -- Waits for in-flight submits and reviews, and holds new ones until the rebuild commits
+    LOCK TABLE test_statistics IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM test_statistics;
+
+    INSERT INTO test_statistics (test_id, submission_count, score_sum, score_sum_squares, score_histogram)
+    WITH scores AS (
+        SELECT ts.test_id, COALESCE(ts.final_score, 0) as score
+        FROM test_submissions ts
+        JOIN tests t ON t.id = ts.test_id
+    ), buckets AS (
+        SELECT test_id, LEAST(100, GREATEST(0, floor(score)))::int + 1 as bucket, COUNT(*)::int as bucket_count
+        FROM scores
+        GROUP BY 1, 2
+    )
+    SELECT s.test_id, COUNT(*), SUM(s.score), SUM(s.score * s.score),
+           (SELECT array_agg(COALESCE(b.bucket_count, 0) ORDER BY n)
+            FROM generate_series(1, 101) n
+            LEFT JOIN buckets b ON b.test_id = s.test_id AND b.bucket = n)
+    FROM scores s
+    GROUP BY s.test_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild the rows of the given submissions from the source tables (backfill and repairs)
+CREATE OR REPLACE FUNCTION refresh_submission_summaries(submission_ids UUID[])
+RETURNS void AS $$
+BEGIN
+    -- Wait for writers of these submissions, so the rows below are read after they commit
+    PERFORM 1 FROM test_submissions WHERE id = ANY(submission_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    INSERT INTO submission_summaries (
+        submission_id, invite_id, test_id, applicant_email, applicant_name, invite_token, invite_status,
+        test_title, test_description, duration_minutes, started_at, submitted_at, final_score, auto_score,
+        manual_score, scoring_status, review_completed_at, is_monitored,
+        total_answers, manual_questions, pending_reviews
+    )
+    SELECT ts.id, ts.invite_id, ts.test_id, ts.applicant_email, ti.applicant_name, ti.invite_token, ti.status,
+           t.title, t.description, t.duration_minutes, ts.started_at, ts.submitted_at, ts.final_score, ts.auto_score,
+           ts.manual_score, ts.scoring_status, ts.review_completed_at, ts.is_monitored,
+           counts.total_answers, counts.manual_questions, counts.pending_reviews
+    FROM test_submissions ts
+    JOIN test_invites ti ON ti.id = ts.invite_id
+    JOIN tests t ON t.id = ts.test_id
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*)::int as total_answers,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding'))::int as manual_questions,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding') AND ta.manual_score_status = 'pending')::int
+                   as pending_reviews
+        FROM test_answers ta
+        JOIN questions q ON q.id = ta.question_id
+        WHERE ta.submission_id = ts.id
+    ) counts
+    WHERE ts.id = ANY(submission_ids)
+    ON CONFLICT (submission_id) DO UPDATE SET
+        invite_id = EXCLUDED.invite_id,
+        test_id = EXCLUDED.test_id,
+        applicant_email = EXCLUDED.applicant_email,
+        applicant_name = EXCLUDED.applicant_name,
+        invite_token = EXCLUDED.invite_token,
+        invite_status = EXCLUDED.invite_status,
+        test_title = EXCLUDED.test_title,
+        test_description = EXCLUDED.test_description,
+        duration_minutes = EXCLUDED.duration_minutes,
+        started_at = EXCLUDED.started_at,
+        submitted_at = EXCLUDED.submitted_at,
+        final_score = EXCLUDED.final_score,
+        auto_score = EXCLUDED.auto_score,
+        manual_score = EXCLUDED.manual_score,
+        scoring_status = EXCLUDED.scoring_status,
+        review_completed_at = EXCLUDED.review_completed_at,
+        is_monitored = EXCLUDED.is_monitored,
+        total_answers = EXCLUDED.total_answers,
+        manual_questions = EXCLUDED.manual_questions,
+        pending_reviews = EXCLUDED.pending_reviews;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recount only the answer columns of the given submissions' rows, for writes to test_answers
+CREATE OR REPLACE FUNCTION refresh_submission_summary_counts(submission_ids UUID[])
+RETURNS void AS $$
+BEGIN
+    -- Recounts of one submission take turns, so the later one sees the earlier one's answers
+    PERFORM 1 FROM test_submissions WHERE id = ANY(submission_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    UPDATE submission_summaries s
+    SET total_answers = counts.total_answers,
+        manual_questions = counts.manual_questions,
+        pending_reviews = counts.pending_reviews
+    FROM unnest(submission_ids) AS i(submission_id)
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*)::int as total_answers,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding'))::int as manual_questions,
+               COUNT(*) FILTER (WHERE q.type IN ('essay', 'coding') AND ta.manual_score_status = 'pending')::int
+                   as pending_reviews
+        FROM test_answers ta
+        JOIN questions q ON q.id = ta.question_id
+        WHERE ta.submission_id = i.submission_id
+    ) counts
+    WHERE s.submission_id = i.submission_id
+    AND (s.total_answers, s.manual_questions, s.pending_reviews)
+        IS DISTINCT FROM (counts.total_answers, counts.manual_questions, counts.pending_reviews);
+END;
+$$ LANGUAGE plpgsql;
+
+-- submit_test writes the row together with the submission. Submissions, answers, invites and
+-- tests change from reviews, monitoring, scheduling and test edits in many places, so triggers
+-- follow those updates. They are statement-level, so a bulk write costs one call rather than one per row.
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_submissions()
+RETURNS trigger AS $$
+BEGIN
+    -- The updated rows stay locked until commit, so their new values are the latest
+    UPDATE submission_summaries s
+    SET test_id = n.test_id, applicant_email = n.applicant_email, started_at = n.started_at,
+        submitted_at = n.submitted_at, final_score = n.final_score, auto_score = n.auto_score,
+        manual_score = n.manual_score, scoring_status = n.scoring_status,
+        review_completed_at = n.review_completed_at, is_monitored = n.is_monitored
+    FROM new_rows n
+    WHERE s.submission_id = n.id
+    AND (s.test_id, s.applicant_email, s.started_at, s.submitted_at, s.final_score, s.auto_score,
+         s.manual_score, s.scoring_status, s.review_completed_at, s.is_monitored)
+        IS DISTINCT FROM
+        (n.test_id, n.applicant_email, n.started_at, n.submitted_at, n.final_score, n.auto_score,
+         n.manual_score, n.scoring_status, n.review_completed_at, n.is_monitored);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_answers()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_submission_summary_counts(ARRAY(SELECT DISTINCT submission_id FROM changed_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_tests()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE submission_summaries s
+    SET test_title = n.title, test_description = n.description, duration_minutes = n.duration_minutes
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE s.test_id = n.id
+    AND (n.title, n.description, n.duration_minutes) IS DISTINCT FROM (o.title, o.description, o.duration_minutes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_submission_summaries_from_invites()
+RETURNS trigger AS $$
+BEGIN
+    -- Rescheduling or renaming an invite also changes its submission's row
+    UPDATE submission_summaries s
+    SET applicant_name = n.applicant_name, invite_token = n.invite_token, invite_status = n.status
+    FROM new_rows n
+    WHERE s.invite_id = n.id
+    AND (s.applicant_name, s.invite_token, s.invite_status)
+        IS DISTINCT FROM (n.applicant_name, n.invite_token, n.status);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rows go with their submission through the submission_id foreign key, and deleting an
+-- invite or test deletes its submissions (ON DELETE CASCADE), so no delete trigger is needed.
+-- invite_id and test_id themselves are not foreign keys
+DROP TRIGGER IF EXISTS submission_summaries_update ON test_submissions;
+CREATE TRIGGER submission_summaries_update AFTER UPDATE ON test_submissions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_submissions();
+
+DROP TRIGGER IF EXISTS submission_summaries_answers_update ON test_answers;
+CREATE TRIGGER submission_summaries_answers_update AFTER UPDATE ON test_answers
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_answers();
+
+-- Answers also go when a test's questions are replaced
+DROP TRIGGER IF EXISTS submission_summaries_answers_delete ON test_answers;
+CREATE TRIGGER submission_summaries_answers_delete AFTER DELETE ON test_answers
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_answers();
+
+DROP TRIGGER IF EXISTS submission_summaries_tests_update ON tests;
+CREATE TRIGGER submission_summaries_tests_update AFTER UPDATE ON tests
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_tests();
+
+-- Transition tables rule out a column list (UPDATE OF status, ...), so this fires on every
+-- invite update; rows without a submission find nothing through idx_summaries_invite_id
+DROP TRIGGER IF EXISTS submission_summaries_invites_update ON test_invites;
+CREATE TRIGGER submission_summaries_invites_update AFTER UPDATE ON test_invites
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_submission_summaries_from_invites();
+
 -- =====================================================
 -- COMPLETION MESSAGE
 -- =====================================================
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -6,18 +7,29 @@ import asyncpg
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, ValidationError
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
 import bcrypt
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.header import Header
+import base64
 import json
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 import re
+import math
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import csv
+import io
+import html
+from functools import lru_cache
+from abc import ABC, abstractmethod
 
 # Try to import Gemini AI, but make it optional
 try:
@@ -28,6 +40,14 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("WARNING: google-generativeai not installed. Auto-generate feature will not be available.")
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    print("WARNING: numpy not installed. Item analysis will not be available.")
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -41,6 +61,73 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 240  # 4 hours
 FRONTEND_DOMAIN = os.environ.get('FRONTEND_DOMAIN', 'http://localhost:3000')
 
+# Compiled test-definition cache
+TEST_CACHE_SIZE = int(os.environ.get('TEST_CACHE_SIZE', 256))
+TEST_CACHE_TTL_SECONDS = float(os.environ.get('TEST_CACHE_TTL_SECONDS', 300))
+
+# Authenticated-principal cache
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 30))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000))
+RESULTS_COUNT_CACHE_TTL_SECONDS = float(os.environ.get('RESULTS_COUNT_CACHE_TTL_SECONDS', 30))
+RESULTS_EXACT_COUNT_LIMIT = int(os.environ.get('RESULTS_EXACT_COUNT_LIMIT', 100000))
+RESULTS_EXPORT_BATCH_SIZE = int(os.environ.get('RESULTS_EXPORT_BATCH_SIZE', 500))
+RESULTS_BATCH_MAX = int(os.environ.get('RESULTS_BATCH_MAX', 100))
+RESULTS_PAGE_MAX_LIMIT = int(os.environ.get('RESULTS_PAGE_MAX_LIMIT', 100))
+# Per-test statistics read model: default pass mark (percent) and one histogram bucket per whole percent
+TEST_PASS_SCORE = int(os.environ.get('TEST_PASS_SCORE', 70))
+SCORE_HISTOGRAM_BUCKETS = 101
+# Item analyses kept per worker; each is reused until the test's submissions or scores change
+ITEM_ANALYSIS_CACHE_SIZE = int(os.environ.get('ITEM_ANALYSIS_CACHE_SIZE', 64))
+# Trust id/role claims carried in the token instead of looking the user up. Claims are only
+# trusted while this worker hears user changes over the bus, and only while the token is young
+TRUST_TOKEN_CLAIMS = os.environ.get('TRUST_TOKEN_CLAIMS', 'false').lower() == 'true'
+TOKEN_CLAIMS_MAX_AGE_SECONDS = float(os.environ.get('TOKEN_CLAIMS_MAX_AGE_SECONDS', 900))
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+# bcrypt calls allowed to wait for a hashing thread; beyond this requests get a 503
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 64))
+
+# Email outbox
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 20))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', 2))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+EMAIL_SETTINGS_CACHE_TTL_SECONDS = float(os.environ.get('EMAIL_SETTINGS_CACHE_TTL_SECONDS', 60))
+
+# Pooled SMTP sessions
+SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 4))
+SMTP_SESSION_MAX_IDLE_SECONDS = float(os.environ.get('SMTP_SESSION_MAX_IDLE_SECONDS', 60))
+SMTP_SESSION_MAX_MESSAGES = int(os.environ.get('SMTP_SESSION_MAX_MESSAGES', 100))
+SMTP_REQUIRE_TLS = os.environ.get('SMTP_REQUIRE_TLS', 'true').lower() == 'true'
+SMTP_DEBUG = os.environ.get('SMTP_DEBUG', 'false').lower() == 'true'
+BULK_INVITE_MAX_ROWS = int(os.environ.get('BULK_INVITE_MAX_ROWS', 5000))
+WEBRTC_SIGNAL_BUFFER = int(os.environ.get('WEBRTC_SIGNAL_BUFFER', 200))
+WEBRTC_ROOM_TTL_SECONDS = float(os.environ.get('WEBRTC_ROOM_TTL_SECONDS', 3600))
+WEBRTC_NOTIFY = os.environ.get('WEBRTC_NOTIFY', 'true').lower() == 'true'
+WEBRTC_NOTIFY_RECONNECT_MAX_SECONDS = float(os.environ.get('WEBRTC_NOTIFY_RECONNECT_MAX_SECONDS', 30))
+WEBRTC_LONG_POLL_MAX_SECONDS = float(os.environ.get('WEBRTC_LONG_POLL_MAX_SECONDS', 25))
+WEBRTC_ICE_BATCH_MAX = int(os.environ.get('WEBRTC_ICE_BATCH_MAX', 100))
+WEBRTC_SIGNAL_RETENTION_DAYS = float(os.environ.get('WEBRTC_SIGNAL_RETENTION_DAYS', 1))
+WEBRTC_MAINTENANCE_INTERVAL_SECONDS = float(os.environ.get('WEBRTC_MAINTENANCE_INTERVAL_SECONDS', 3600))
+WEBRTC_HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get('WEBRTC_HEARTBEAT_TIMEOUT_SECONDS', 60))
+WEBRTC_HEARTBEAT_FLUSH_SECONDS = float(os.environ.get('WEBRTC_HEARTBEAT_FLUSH_SECONDS', 5))
+WEBRTC_HEARTBEAT_MAX_PENDING = int(os.environ.get('WEBRTC_HEARTBEAT_MAX_PENDING', 10000))
+WEBRTC_REAPER_INTERVAL_SECONDS = float(os.environ.get('WEBRTC_REAPER_INTERVAL_SECONDS', 30))
+
+# Signaling store: "memory" (per worker) or "postgres" (webrtc_signals, shared by all workers)
+WEBRTC_STORE = os.environ.get('WEBRTC_STORE', 'memory').lower()
+WEBRTC_STORE_TTL_SECONDS = float(os.environ.get('WEBRTC_STORE_TTL_SECONDS', 3600))
+WEBRTC_STORE_MAX_SIGNALS = int(os.environ.get('WEBRTC_STORE_MAX_SIGNALS', 500))
+WEBRTC_STORE_MAX_BYTES = int(os.environ.get('WEBRTC_STORE_MAX_BYTES', 1024 * 1024))
+WEBRTC_STORE_MAX_INVITES = int(os.environ.get('WEBRTC_STORE_MAX_INVITES', 10000))
+WEBRTC_STORE_UNLOGGED = os.environ.get('WEBRTC_STORE_UNLOGGED', 'false').lower() == 'true'
+
+# Monitoring console stream
+MONITORING_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('MONITORING_STREAM_HEARTBEAT_SECONDS', 15))
+MONITORING_STREAM_QUEUE_SIZE = int(os.environ.get('MONITORING_STREAM_QUEUE_SIZE', 256))
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -79,6 +166,7 @@ class Test(BaseModel):
     title: str
     description: str
     questions: List[Question]
+    question_count: Optional[int] = None
     duration_minutes: int
     created_by: str  # admin user id
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -104,6 +192,7 @@ class TestInvite(BaseModel):
     email_sent: bool = False
     email_sent_at: Optional[datetime] = None
     email_error: Optional[str] = None
+    email_queued: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class TestInviteCreate(BaseModel):
@@ -114,6 +203,33 @@ class TestInviteCreate(BaseModel):
     admin_scheduled: bool = False
     no_schedule: bool = False
 
+class BulkInviteApplicant(BaseModel):
+    applicant_email: EmailStr
+    applicant_name: str
+
+class BulkInviteCreate(BaseModel):
+    test_id: str
+    applicants: List[Dict[str, Any]]
+    scheduled_date: Optional[datetime] = None
+    admin_scheduled: bool = False
+    no_schedule: bool = False
+
+class BulkInviteRowResult(BaseModel):
+    row: int
+    applicant_email: Optional[str] = None
+    applicant_name: Optional[str] = None
+    status: str  # "invited", "duplicate", "invalid"
+    invite_id: Optional[str] = None
+    detail: Optional[str] = None
+
+class BulkInviteReport(BaseModel):
+    test_id: str
+    total: int
+    invited: int
+    duplicates: int
+    invalid: int
+    results: List[BulkInviteRowResult]
+
 class ScheduleTest(BaseModel):
     scheduled_date: datetime
 
@@ -127,6 +243,9 @@ class AutoGenerateTest(BaseModel):
 class AutoReviewRequest(BaseModel):
     geminiApiKey: str
 
+class ResultBatchRequest(BaseModel):
+    submission_ids: List[str]
+
 class TestAnswer(BaseModel):
     question_id: str
     answer: str  # JSON string for complex answers
@@ -167,15 +286,460 @@ async def create_admin_notification(conn, notification_data):
     except Exception as e:
         print(f"Failed to create admin notification: {str(e)}")
 
+async def fetch_questions_for_tests(conn, test_ids):
+    """Load questions for several tests in a single query, grouped by test id"""
+    question_rows = await conn.fetch("""
+        SELECT id, test_id, type, question, options, correct_answer, expected_language, points
+        FROM questions WHERE test_id = ANY($1::uuid[])
+        ORDER BY test_id, question_order
+    """, list(test_ids))
+    
+    questions_by_test = {}
+    for q_row in question_rows:
+        options = json.loads(q_row['options']) if q_row['options'] else None
+        questions_by_test.setdefault(q_row['test_id'], []).append(Question(
+            id=str(q_row['id']),
+            type=q_row['type'],
+            question=q_row['question'],
+            options=options,
+            correct_answer=q_row['correct_answer'],
+            expected_language=q_row['expected_language'],
+            points=q_row['points']
+        ))
+    return questions_by_test
+
+async def insert_test_questions(conn, test_id, questions):
+    """Bulk insert a test's questions in one pipelined executemany batch.
+
+    Must be called inside the caller's transaction so the test row and its
+    questions are written atomically. Returns the stored questions with ids.
+    """
+    stored_questions = []
+    records = []
+    for i, q in enumerate(questions):
+        question_id = uuid.uuid4()
+        records.append((
+            question_id, test_id, q.type, q.question,
+            json.dumps(q.options) if q.options else None,
+            q.correct_answer, q.expected_language, q.points, i
+        ))
+        stored_questions.append(Question(
+            id=str(question_id),
+            type=q.type,
+            question=q.question,
+            options=q.options,
+            correct_answer=q.correct_answer,
+            expected_language=q.expected_language,
+            points=q.points
+        ))
+    
+    if records:
+        await conn.executemany("""
+            INSERT INTO questions (id, test_id, type, question, options, correct_answer,
+                                 expected_language, points, question_order)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+        """, records)
+    
+    return stored_questions
+
+def score_submission(question_rows, submitted_answers):
+    """Score multiple choice questions against a {question_id: answer} map.
+
+    Runs in O(questions); essay/coding questions only mark the submission for review.
+    """
+    auto_score = 0
+    total_auto_points = 0
+    has_manual_questions = False
+
+    for question in question_rows:
+        if question['type'] == 'multiple_choice':
+            total_auto_points += question['points']
+            if question['correct_answer'] and submitted_answers.get(str(question['id'])) == question['correct_answer']:
+                auto_score += question['points']
+        elif question['type'] in ['essay', 'coding']:
+            has_manual_questions = True
+
+    # Calculate auto score percentage
+    auto_score_percentage = (auto_score / total_auto_points * 100) if total_auto_points > 0 else 0
+
+    # Determine scoring status and final score
+    if has_manual_questions:
+        scoring_status = 'needs_review'
+        if total_auto_points > 0:
+            # Mixed test (MCQ + SA/Coding): show auto score until manual review complete
+            final_score = auto_score_percentage
+        else:
+            # SA/Coding only test: show 0 until manual review complete
+            final_score = 0.0
+    else:
+        # MCQ only test: auto-scored
+        scoring_status = 'auto_only'
+        final_score = auto_score_percentage
+
+    return {
+        "auto_score": auto_score_percentage,
+        "final_score": final_score,
+        "scoring_status": scoring_status,
+        "needs_manual_review": has_manual_questions
+    }
+
+def score_bucket(score):
+    """Histogram bucket of a final score: whole percents, with exactly 100 in the last bucket"""
+    return min(SCORE_HISTOGRAM_BUCKETS - 1, max(0, math.floor(score)))
+
+async def record_score_changes(conn, changes):
+    """Apply (test_id, previous_score, new_score) changes to the test_statistics read model.
+
+    previous_score is None for a new submission and new_score is None for a deleted one.
+    Call it inside the transaction that changes the submissions so both commit together.
+    """
+    deltas = {}
+    for test_id, previous_score, new_score in changes:
+        if test_id is None or previous_score == new_score:
+            continue
+        delta = deltas.setdefault(test_id, [0, 0.0, 0.0, [0] * SCORE_HISTOGRAM_BUCKETS])
+        for score, sign in ((previous_score, -1), (new_score, 1)):
+            if score is None:
+                continue
+            delta[0] += sign
+            delta[1] += sign * score
+            delta[2] += sign * score * score
+            delta[3][score_bucket(score)] += sign
+
+    if not deltas:
+        return
+
+    # Rows are locked in test_id order so two writers touching several tests can't deadlock
+    await conn.executemany("""
+        INSERT INTO test_statistics AS s (test_id, submission_count, score_sum, score_sum_squares, score_histogram)
+        VALUES ($1, $2, $3, $4, $5::int[])
+        ON CONFLICT (test_id) DO UPDATE SET
+            submission_count = s.submission_count + EXCLUDED.submission_count,
+            score_sum = s.score_sum + EXCLUDED.score_sum,
+            score_sum_squares = s.score_sum_squares + EXCLUDED.score_sum_squares,
+            score_histogram = ARRAY(
+                SELECT current_count + delta_count
+                FROM unnest(s.score_histogram, EXCLUDED.score_histogram)
+                     WITH ORDINALITY AS h(current_count, delta_count, bucket)
+                ORDER BY bucket
+            ),
+            updated_at = CURRENT_TIMESTAMP
+    """, [(test_id, *delta) for test_id, delta in sorted(deltas.items())])
+
+def histogram_percentile(histogram, count, fraction):
+    """Score below which `fraction` of the submissions fall, interpolated within its bucket"""
+    rank = fraction * count
+    seen = 0
+    for bucket, bucket_count in enumerate(histogram):
+        if bucket_count and seen + bucket_count >= rank:
+            width = 0 if bucket == SCORE_HISTOGRAM_BUCKETS - 1 else 1
+            return bucket + width * (rank - seen) / bucket_count
+        seen += bucket_count
+    return float(SCORE_HISTOGRAM_BUCKETS - 1)
+
+async def complete_review(conn, submission_id, manual_score, final_score, reviewer_id):
+    """Store the reviewed scores of a submission and move it in test_statistics"""
+    async with conn.transaction():
+        # Lock the row while reading the score it replaces
+        row = await conn.fetchrow("""
+            WITH previous AS (
+                SELECT id, final_score FROM test_submissions WHERE id = $4 FOR UPDATE
+            )
+            UPDATE test_submissions ts
+            SET manual_score = $1,
+                final_score = $2,
+                scoring_status = 'fully_reviewed',
+                reviewed_by = $3,
+                review_completed_at = CURRENT_TIMESTAMP
+            FROM previous
+            WHERE ts.id = previous.id
+            RETURNING ts.test_id, COALESCE(previous.final_score, 0) as previous_score
+        """, manual_score, final_score, reviewer_id, submission_id)
+
+        if row:
+            await record_score_changes(conn, [(row['test_id'], row['previous_score'], final_score)])
+
+# Response codes in item-analysis choice arrays besides option indexes
+CHOICE_OMITTED = -1
+CHOICE_NOT_AN_OPTION = -2
+
+# Classical item-analysis rules of thumb used to flag questions for review
+ITEM_EASY_P_VALUE = 0.9
+ITEM_HARD_P_VALUE = 0.2
+ITEM_MIN_DISCRIMINATION = 0.2
+DISTRACTOR_MIN_SHARE = 0.05
+
+async def load_item_responses(conn, test_id: uuid.UUID, items):
+    """Every answer to the given multiple choice questions as three flat arrays.
+
+    Postgres maps each answer to its item position and option index (or a
+    CHOICE_* code) and aggregates them into one row, so no Python runs per answer.
+    """
+    option_question_ids, option_texts, option_indexes = [], [], []
+    for item in items:
+        seen = set()
+        for index, option in enumerate(item.options):
+            if option not in seen:
+                seen.add(option)
+                option_question_ids.append(uuid.UUID(item.id))
+                option_texts.append(option)
+                option_indexes.append(index)
+
+    row = await conn.fetchrow("""
+        WITH items AS (
+            SELECT id, (position - 1)::int as item
+            FROM unnest($2::uuid[]) WITH ORDINALITY AS i(id, position)
+        ), choices AS (
+            SELECT * FROM unnest($3::uuid[], $4::text[], $5::int[]) AS c(question_id, option, choice)
+        )
+        SELECT COALESCE(array_agg(i.item), '{}') as items,
+               COALESCE(array_agg(COALESCE(
+                   c.choice, CASE WHEN COALESCE(ta.answer, '') = '' THEN $6::int ELSE $7::int END
+               )), '{}') as choices,
+               COALESCE(array_agg(COALESCE(ts.final_score, 0)), '{}') as scores
+        FROM test_submissions ts
+        JOIN test_answers ta ON ta.submission_id = ts.id
+        JOIN items i ON i.id = ta.question_id
+        LEFT JOIN choices c ON c.question_id = ta.question_id AND c.option = ta.answer
+        WHERE ts.test_id = $1
+    """, test_id, [uuid.UUID(item.id) for item in items],
+        option_question_ids, option_texts, option_indexes, CHOICE_OMITTED, CHOICE_NOT_AN_OPTION)
+
+    return (np.array(row['items'], dtype=np.int64),
+            np.array(row['choices'], dtype=np.int64),
+            np.array(row['scores'], dtype=np.float64))
+
+def analyze_items(items, item_positions, choices, scores):
+    """Classical item statistics for multiple choice questions.
+
+    Takes one entry per answer: the question's position in `items`, the
+    chosen option index (or a CHOICE_* code) and the submission's final
+    score. p_value is the share of responses that are correct, and omitted
+    answers count as wrong. discrimination is the point-biserial correlation
+    between answering correctly and the final score. Every sum is one
+    np.bincount over the answers, so the cost is linear in the answer count.
+    """
+    item_count = len(items)
+    max_options = max((len(item.options) for item in items), default=0)
+    correct_choices = np.array([
+        item.options.index(item.correct_answer) if item.correct_answer in item.options else CHOICE_NOT_AN_OPTION
+        for item in items
+    ], dtype=np.int64)
+
+    # An item without a correct option must not match answers carrying the same CHOICE_* code
+    item_correct_choices = correct_choices[item_positions]
+    correct = ((choices == item_correct_choices) & (item_correct_choices >= 0)).astype(np.float64)
+    responses = np.bincount(item_positions, minlength=item_count).astype(np.float64)
+    sum_correct = np.bincount(item_positions, weights=correct, minlength=item_count)
+    sum_scores = np.bincount(item_positions, weights=scores, minlength=item_count)
+    sum_squares = np.bincount(item_positions, weights=scores * scores, minlength=item_count)
+    sum_cross = np.bincount(item_positions, weights=correct * scores, minlength=item_count)
+    omitted = np.bincount(item_positions, weights=choices == CHOICE_OMITTED, minlength=item_count)
+    not_an_option = np.bincount(item_positions, weights=choices == CHOICE_NOT_AN_OPTION, minlength=item_count)
+
+    chosen = choices >= 0
+    option_counts = np.bincount(
+        item_positions[chosen] * max_options + choices[chosen], minlength=item_count * max_options
+    ).reshape(item_count, max_options)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_values = sum_correct / responses
+        mean_scores = sum_scores / responses
+        covariance = sum_cross / responses - p_values * mean_scores
+        score_variance = sum_squares / responses - mean_scores * mean_scores
+        discrimination = covariance / np.sqrt(p_values * (1 - p_values) * score_variance)
+        option_shares = option_counts / responses[:, None]
+
+    def finite(value):
+        return round(float(value), 4) if np.isfinite(value) else None
+
+    analysis = []
+    for position, item in enumerate(items):
+        correct_choice = int(correct_choices[position])
+        p_value = finite(p_values[position])
+        item_discrimination = finite(discrimination[position])
+        options = [
+            {
+                "option": option,
+                "is_correct": index == correct_choice,
+                "count": int(option_counts[position, index]),
+                "share": finite(option_shares[position, index])
+            }
+            for index, option in enumerate(item.options)
+        ]
+
+        flags = []
+        if p_value is not None:
+            if p_value > ITEM_EASY_P_VALUE:
+                flags.append("too_easy")
+            elif p_value < ITEM_HARD_P_VALUE:
+                flags.append("too_hard")
+        if item_discrimination is not None and item_discrimination < ITEM_MIN_DISCRIMINATION:
+            flags.append("low_discrimination")
+        if correct_choice == CHOICE_NOT_AN_OPTION:
+            flags.append("no_correct_option")
+        # Answers to a repeated option text are counted on its first occurrence, so repeats are skipped
+        if responses[position] and any(
+            not option["is_correct"] and option["share"] < DISTRACTOR_MIN_SHARE
+            for index, option in enumerate(options) if item.options.index(option["option"]) == index
+        ):
+            flags.append("unused_distractor")
+
+        analysis.append({
+            "question_id": item.id,
+            "question": item.question,
+            "points": item.points,
+            "responses": int(responses[position]),
+            "omitted": int(omitted[position]),
+            "not_an_option": int(not_an_option[position]),
+            "p_value": p_value,
+            "discrimination": item_discrimination,
+            "options": options,
+            "flags": flags
+        })
+    return analysis
+
+class TestDefinitionCache:
+    """Bounded LRU of compiled test definitions keyed by test id.
+
+    Entries are per-process. Edits clear them on every worker over the signaling
+    bus (invalidate_test_definition), so while this worker's listener is connected
+    a hit is served from memory alone. While it is not, each hit is checked
+    against tests.definition_version, which every write path bumps. Entries also
+    expire after ttl_seconds. A miss loads through the caller's connection.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # test id -> (expires at, definition)
+        self.generation = 0
+        self.bus_connected = False
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    async def get(self, conn, test_id: uuid.UUID):
+        cached = self.entries.get(test_id)
+        if cached is not None and cached[0] > time.monotonic():
+            expires_at, entry = cached
+            current = self.bus_connected or entry["version"] == await conn.fetchval(
+                "SELECT definition_version FROM tests WHERE id = $1", test_id
+            )
+            if current:
+                self.entries.move_to_end(test_id)
+                self.hits += 1
+                return entry
+            self.stale += 1
+        self.entries.pop(test_id, None)
+
+        self.misses += 1
+        return await self._load(conn, test_id)
+
+    async def _load(self, conn, test_id: uuid.UUID):
+        generation = self.generation
+        # The version is read before the questions, so a definition loaded while an
+        # edit commits carries the older version
+        test_row = await conn.fetchrow(
+            "SELECT id, title, description, duration_minutes, created_by, created_at, is_active, "
+            "definition_version FROM tests WHERE id = $1",
+            test_id
+        )
+        if not test_row:
+            return None
+
+        question_rows = await conn.fetch("""
+            SELECT id, type, question, options, correct_answer, expected_language, points
+            FROM questions WHERE test_id = $1 ORDER BY question_order
+        """, test_id)
+        entry = compile_test_definition(test_row, question_rows)
+
+        # Don't store a definition that an invalidation overtook while it was loading
+        if generation == self.generation:
+            self.entries[test_id] = (time.monotonic() + self.ttl_seconds, entry)
+            self.entries.move_to_end(test_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, test_id):
+        self.generation += 1
+        self.entries.pop(uuid.UUID(str(test_id)), None)
+
+    def set_bus_connected(self, connected: bool):
+        # Edits made while nobody was listening were missed, so start over either way
+        self.generation += 1
+        self.entries.clear()
+        self.bus_connected = connected
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "checked_against_db": not self.bus_connected,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+def compile_test_definition(test_row, question_rows):
+    """Parse a test's questions once into the shapes the read and scoring paths need"""
+    questions = []
+    answer_key = []
+    candidate_questions = []
+    for q_row in question_rows:
+        options = json.loads(q_row['options']) if q_row['options'] else None
+        questions.append(Question(
+            id=str(q_row['id']),
+            type=q_row['type'],
+            question=q_row['question'],
+            options=options,
+            correct_answer=q_row['correct_answer'],
+            expected_language=q_row['expected_language'],
+            points=q_row['points']
+        ))
+        answer_key.append({
+            "id": q_row['id'],
+            "type": q_row['type'],
+            "points": q_row['points'],
+            "correct_answer": q_row['correct_answer']
+        })
+        # Correct answers are stripped from everything a candidate can see
+        candidate_questions.append({
+            "id": str(q_row['id']),
+            "type": q_row['type'],
+            "question": q_row['question'],
+            "options": options,
+            "expected_language": q_row['expected_language'],
+            "points": q_row['points']
+        })
+
+    return {
+        "test": dict(test_row),
+        "version": test_row['definition_version'],
+        "questions": questions,
+        "answer_key": answer_key,
+        "candidate_questions": candidate_questions
+    }
+
+test_cache = TestDefinitionCache(TEST_CACHE_SIZE, TEST_CACHE_TTL_SECONDS)
+
 # Database connection
+def db_connection_settings():
+    return {
+        "host": os.environ.get('DB_HOST', 'localhost'),
+        "port": int(os.environ.get('DB_PORT', 5432)),
+        "user": os.environ.get('DB_USER', 'postgres'),
+        "password": os.environ.get('DB_PASSWORD', 'password'),
+        "database": os.environ.get('DB_NAME', 'interview_platform')
+    }
+
 async def init_db():
     global db_pool
     db_pool = await asyncpg.create_pool(
-        host=os.environ.get('DB_HOST', 'localhost'),
-        port=int(os.environ.get('DB_PORT', 5432)),
-        user=os.environ.get('DB_USER', 'postgres'),
-        password=os.environ.get('DB_PASSWORD', 'password'),
-        database=os.environ.get('DB_NAME', 'interview_platform'),
+        **db_connection_settings(),
         min_size=10,
         max_size=20
     )
@@ -185,14 +749,71 @@ async def close_db():
     if db_pool:
         await db_pool.close()
 
-# Helper functions
-def verify_password(plain_password, hashed_password):
+# Password hashing
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+password_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_hash_stats = {"queued": 0, "running": 0, "completed": 0, "rejected": 0, "rehashed": 0, "total_wait_seconds": 0.0}
+
+async def run_password_job(func, *args):
+    """Run a bcrypt call on the hashing pool, tracking queue depth.
+
+    The queue is bounded: past PASSWORD_HASH_MAX_QUEUE waiting calls the request
+    is turned away with a 503 instead of piling up behind the pool. The counters
+    are only updated on the event loop: the pool threads hand their start and
+    finish back with call_soon_threadsafe.
+    """
+    if password_hash_stats["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+        password_hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many password requests in progress. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    loop = asyncio.get_running_loop()
+    submitted_at = time.monotonic()
+    password_hash_stats["queued"] += 1
+
+    def started(started_at):
+        password_hash_stats["queued"] -= 1
+        password_hash_stats["running"] += 1
+        password_hash_stats["total_wait_seconds"] += started_at - submitted_at
+
+    def finished(ran):
+        if ran:
+            password_hash_stats["running"] -= 1
+            password_hash_stats["completed"] += 1
+        else:
+            password_hash_stats["queued"] -= 1
+
+    def job():
+        loop.call_soon_threadsafe(started, time.monotonic())
+        return func(*args)
+
+    future = password_hash_executor.submit(job)
+    # Runs on the pool thread after job() (or on cancellation), so it lands after started()
+    future.add_done_callback(lambda done: loop.call_soon_threadsafe(finished, not done.cancelled()))
+    return await asyncio.wrap_future(future)
+
+def _check_password(plain_password, hashed_password):
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
-def get_password_hash(password):
-    salt = bcrypt.gensalt()
+def _hash_password(password):
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
+async def verify_password(plain_password, hashed_password):
+    return await run_password_job(_check_password, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await run_password_job(_hash_password, password)
+
+def password_needs_rehash(hashed_password) -> bool:
+    """True when a stored hash was made with a different cost factor than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -203,6 +824,178 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class PrincipalCache:
+    """Short-TTL cache of authenticated users keyed by token subject (email).
+
+    invalidate() also records when the user was changed, so tokens carrying
+    principal claims that were issued before that point fall back to the database.
+    Changes made on other workers arrive over the signaling bus; claims are only
+    trusted when issued after this worker started listening (trust_claims_from),
+    so changes it never heard, before a restart or while disconnected, cannot be
+    missed. Claims older than claims_max_age are never trusted, which also bounds
+    how long a change has to be remembered.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int, claims_max_age: float):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.claims_max_age = claims_max_age
+        self.entries = OrderedDict()
+        self.changed_at = {}  # email -> time of change, oldest first
+        self.trusted_since = None
+        self.hits = 0
+        self.misses = 0
+        self.claim_hits = 0
+
+    def get(self, email: str):
+        entry = self.entries.get(email)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.entries.pop(email, None)
+        self.misses += 1
+        return None
+
+    def put(self, email: str, user: User):
+        self.entries[email] = (time.monotonic() + self.ttl_seconds, user)
+        self.entries.move_to_end(email)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        now = time.time()
+        self.entries.pop(email, None)
+        self.changed_at.pop(email, None)
+        self.changed_at[email] = now
+        # Changes older than the oldest trusted token can no longer matter
+        horizon = now - self.claims_max_age
+        while self.changed_at:
+            oldest = next(iter(self.changed_at))
+            if self.changed_at[oldest] >= horizon:
+                break
+            del self.changed_at[oldest]
+
+    def trust_claims_from(self, timestamp: Optional[float]):
+        self.trusted_since = timestamp
+        self.changed_at.clear()
+
+    def claims_are_current(self, email: str, issued_at) -> bool:
+        if self.trusted_since is None or issued_at is None:
+            return False
+        if issued_at <= self.trusted_since or issued_at < time.time() - self.claims_max_age:
+            return False
+        changed_at = self.changed_at.get(email)
+        return changed_at is None or issued_at > changed_at
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "claim_hits": self.claim_hits,
+            "trusting_claims": self.trusted_since is not None,
+            "tracked_changes": len(self.changed_at),
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_SIZE, TOKEN_CLAIMS_MAX_AGE_SECONDS)
+
+class ResultCountCache:
+    """Short-TTL cache of GET /results totals keyed by filter, per process.
+
+    Totals may lag new submissions by up to the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.entries.pop(key, None)
+        self.misses += 1
+        return None
+
+    def put(self, key, total):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, total)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+result_count_cache = ResultCountCache(RESULTS_COUNT_CACHE_TTL_SECONDS)
+
+class ItemAnalysisCache:
+    """Bounded LRU of item analyses keyed by test id, per process.
+
+    Each entry carries the version it was computed for (the test's definition
+    version and its test_statistics count and timestamp), so a new submission or score
+    change on any worker makes the next read recompute.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, test_id, version):
+        entry = self.entries.get(test_id)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(test_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, test_id, version, analysis):
+        self.entries[test_id] = (version, analysis)
+        self.entries.move_to_end(test_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+item_analysis_cache = ItemAnalysisCache(ITEM_ANALYSIS_CACHE_SIZE)
+
+def principal_claims(user) -> dict:
+    """Token claims that let get_current_user skip the users lookup"""
+    return {
+        "sub": user['email'],
+        "uid": str(user['id']),
+        "role": user['role'],
+        "name": user['full_name'],
+        "created_at": user['created_at'].isoformat(),
+        "active": user['is_active'],
+        "iat": datetime.now(timezone.utc)
+    }
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -217,6 +1010,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.PyJWTError:
         raise credentials_exception
     
+    # Fast path: the token already carries the principal and nothing changed since it was issued
+    if TRUST_TOKEN_CLAIMS and payload.get("uid") and principal_cache.claims_are_current(email, payload.get("iat")):
+        principal_cache.claim_hits += 1
+        return User(
+            id=payload['uid'],
+            email=email,
+            full_name=payload['name'],
+            role=payload['role'],
+            created_at=datetime.fromisoformat(payload['created_at']),
+            is_active=payload['active']
+        )
+    
+    cached_user = principal_cache.get(email)
+    if cached_user is not None:
+        return cached_user
+    
     async with db_pool.acquire() as conn:
         row = await conn.fetchrow(
             "SELECT id, email, full_name, role, created_at, is_active FROM users WHERE email = $1",
@@ -226,7 +1035,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if row is None:
         raise credentials_exception
     
-    return User(
+    user = User(
         id=str(row['id']),
         email=row['email'],
         full_name=row['full_name'],
@@ -234,6 +1043,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         created_at=row['created_at'],
         is_active=row['is_active']
     )
+    principal_cache.put(email, user)
+    return user
 
 async def get_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
@@ -248,17 +1059,55 @@ def get_domain_from_request(request: Request) -> str:
     # Always use the environment variable for frontend domain
     return FRONTEND_DOMAIN
 
-def create_invite_email_template(applicant_name: str, test_title: str, invite_url: str, company_name: str = "Interview Team", scheduled_date: Optional[datetime] = None, admin_scheduled: bool = False, no_schedule: bool = False) -> str:
-    """Create a professional HTML email template for test invitations"""
-    return f"""
-    <!DOCTYPE html>
+class EmailTemplate:
+    """Email template compiled once into a format string.
+
+    Sources use {{slot}} markers. Indentation is stripped and literal braces
+    (CSS) are escaped at compile time, so rendering is a single format_map
+    call over the per-recipient slots. bind() fills slots that are fixed for
+    many renders, such as branding, and returns a smaller template.
+    """
+
+    SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+    def __init__(self, source: str, strip_indent: bool = False):
+        if strip_indent:
+            source = "\n".join(line.strip() for line in source.strip().splitlines())
+        parts = self.SLOT_PATTERN.split(source)
+        self.compile(parts[0::2], parts[1::2])
+
+    def compile(self, static: List[str], slots: List[str]):
+        self.static = static
+        self.slots = slots
+        pieces = [static[0].replace("{", "{{").replace("}", "}}")]
+        for slot, text in zip(slots, static[1:]):
+            pieces.append("{" + slot + "}")
+            pieces.append(text.replace("{", "{{").replace("}", "}}"))
+        self.compiled = "".join(pieces)
+
+    def bind(self, **values) -> "EmailTemplate":
+        static, slots = [self.static[0]], []
+        for slot, text in zip(self.slots, self.static[1:]):
+            if slot in values:
+                static[-1] += values[slot] + text
+            else:
+                slots.append(slot)
+                static.append(text)
+        template = EmailTemplate.__new__(EmailTemplate)
+        template.compile(static, slots)
+        return template
+
+    def render(self, values: Dict[str, str]) -> str:
+        return self.compiled.format_map(values)
+
+INVITE_EMAIL_HTML = EmailTemplate("""    <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Test Invitation</title>
         <style>
-            body {{
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 line-height: 1.6;
                 color: #333;
@@ -266,49 +1115,49 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
                 margin: 0 auto;
                 padding: 20px;
                 background-color: #f4f4f4;
-            }}
-            .container {{
+            }
+            .container {
                 background-color: #ffffff;
                 padding: 30px;
                 border-radius: 10px;
                 box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }}
-            .header {{
+            }
+            .header {
                 text-align: center;
                 margin-bottom: 30px;
                 padding-bottom: 20px;
                 border-bottom: 2px solid #e0e0e0;
-            }}
-            .logo {{
+            }
+            .logo {
                 font-size: 24px;
                 font-weight: bold;
-                color: #2563eb;
+                color: {{accent_color}};
                 margin-bottom: 10px;
-            }}
-            .title {{
+            }
+            .title {
                 font-size: 28px;
                 color: #1f2937;
                 margin-bottom: 20px;
-            }}
-            .content {{
+            }
+            .content {
                 margin-bottom: 30px;
-            }}
-            .test-info {{
+            }
+            .test-info {
                 background-color: #f8fafc;
                 padding: 20px;
                 border-radius: 8px;
-                border-left: 4px solid #2563eb;
+                border-left: 4px solid {{accent_color}};
                 margin: 20px 0;
-            }}
-            .test-title {{
+            }
+            .test-title {
                 font-size: 20px;
                 font-weight: bold;
                 color: #1f2937;
                 margin-bottom: 10px;
-            }}
-            .cta-button {{
+            }
+            .cta-button {
                 display: inline-block;
-                background-color: #2563eb;
+                background-color: {{accent_color}};
                 color: white;
                 padding: 15px 30px;
                 text-decoration: none;
@@ -317,49 +1166,49 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
                 font-size: 16px;
                 margin: 20px 0;
                 transition: background-color 0.3s;
-            }}
-            .cta-button:hover {{
-                background-color: #1d4ed8;
-            }}
-            .instructions {{
+            }
+            .cta-button:hover {
+                background-color: {{accent_hover_color}};
+            }
+            .instructions {
                 background-color: #fef3c7;
                 padding: 15px;
                 border-radius: 8px;
                 border-left: 4px solid #f59e0b;
                 margin: 20px 0;
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 margin-top: 30px;
                 padding-top: 20px;
                 border-top: 1px solid #e0e0e0;
                 color: #6b7280;
                 font-size: 14px;
-            }}
-            .security-note {{
+            }
+            .security-note {
                 background-color: #f3f4f6;
                 padding: 15px;
                 border-radius: 8px;
                 margin: 20px 0;
                 font-size: 14px;
                 color: #6b7280;
-            }}
+            }
         </style>
     </head>
     <body>
         <div class="container">
             <div class="header">
-                <div class="logo">🎯 Interview Platform</div>
+                <div class="logo">🎯 {{brand_name}}</div>
                 <h1 class="title">Test Invitation</h1>
             </div>
             
             <div class="content">
-                <p>Hi <strong>{applicant_name}</strong>,</p>
+                <p>Hi <strong>{{applicant_name}}</strong>,</p>
                 
                 <p>You have been invited to take a pre-interview assessment. This is an important step in our evaluation process.</p>
                 
                 <div class="test-info">
-                    <div class="test-title">📝 {test_title}</div>
+                    <div class="test-title">📝 {{test_title}}</div>
                     <p>Please complete this assessment at your earliest convenience to proceed with your application.</p>
                 </div>
                 
@@ -368,7 +1217,7 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
                     <ul>
                         <li>Click the button below to access the platform</li>
                         <li>Sign up or log in to your account</li>
-                        {"<li>Your test has been scheduled for: <strong>" + scheduled_date.strftime('%B %d, %Y at %I:%M %p') + "</strong></li>" if admin_scheduled and scheduled_date else "<li>You can take the test anytime at your convenience</li>" if no_schedule else "<li>Choose a convenient date and time for your assessment</li>"}
+                        <li>{{schedule_line}}</li>
                         <li>Ensure you have a stable internet connection</li>
                         <li>Find a quiet environment for the test</li>
                         <li>Have a valid ID ready for verification</li>
@@ -376,7 +1225,7 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
                 </div>
                 
                 <div style="text-align: center;">
-                    <a href="{invite_url}" class="cta-button">🚀 {"Access Platform" if admin_scheduled and scheduled_date else "Take Test Anytime" if no_schedule else "Sign Up & Take Test"}</a>
+                    <a href="{{invite_url}}" class="cta-button">🚀 {{cta_label}}</a>
                 </div>
                 
                 <div class="security-note">
@@ -389,7 +1238,7 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
             </div>
             
             <div class="footer">
-                <p>Best regards,<br><strong>{company_name}</strong></p>
+                <p>Best regards,<br><strong>{{company_name}}</strong></p>
                 <p style="font-size: 12px; color: #9ca3af;">
                     This is an automated message. Please do not reply to this email.
                 </p>
@@ -397,74 +1246,1357 @@ def create_invite_email_template(applicant_name: str, test_title: str, invite_ur
         </div>
     </body>
     </html>
+    
+""", strip_indent=True)
+
+INVITE_EMAIL_TEXT = EmailTemplate("""Hi {{applicant_name}},
+
+You have been invited to take a pre-interview assessment. This is an important step in our evaluation process.
+
+Test: {{test_title}}
+Please complete this assessment at your earliest convenience to proceed with your application.
+
+Instructions:
+- Open the link below to access the platform
+- Sign up or log in to your account
+- {{schedule_line}}
+- Ensure you have a stable internet connection
+- Find a quiet environment for the test
+- Have a valid ID ready for verification
+
+{{cta_label}}: {{invite_url}}
+
+Security Note: This link is unique to you and should not be shared with others. The assessment will be monitored for integrity purposes.
+
+If you have any questions or technical issues, please contact our support team immediately.
+
+Good luck with your assessment!
+
+Best regards,
+{{company_name}}
+
+This is an automated message. Please do not reply to this email.
+""")
+
+DEFAULT_EMAIL_BRANDING = {
+    "brand_name": "Interview Platform",
+    "company_name": "Interview Team",
+    "accent_color": "#2563eb",
+    "accent_hover_color": "#1d4ed8"
+}
+HEX_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{3,8}$")
+
+@lru_cache(maxsize=128)
+def compiled_invite_templates(brand_name: str, company_name: str, accent_color: str, accent_hover_color: str):
+    """HTML and text invite templates with one admin's branding baked in"""
+    html_template = INVITE_EMAIL_HTML.bind(
+        brand_name=html.escape(brand_name),
+        company_name=html.escape(company_name),
+        accent_color=accent_color,
+        accent_hover_color=accent_hover_color
+    )
+    return html_template, INVITE_EMAIL_TEXT.bind(company_name=company_name)
+
+def email_branding_from_settings(settings) -> Dict[str, str]:
+    """Branding for invite emails from an admin's email and theme settings"""
+    branding = dict(DEFAULT_EMAIL_BRANDING)
+    if not settings:
+        return branding
+    if settings.get('from_name'):
+        branding["brand_name"] = branding["company_name"] = settings['from_name']
+    # Colors end up inside CSS, so only plain hex values are accepted
+    for key, setting in (("accent_color", "brand_color"), ("accent_hover_color", "brand_hover_color")):
+        if settings.get(setting) and HEX_COLOR_PATTERN.match(settings[setting]):
+            branding[key] = settings[setting]
+    return branding
+
+def render_invite_email(applicant_name: str, test_title: str, invite_url: str, branding: Optional[Dict[str, str]] = None, scheduled_date: Optional[datetime] = None, admin_scheduled: bool = False, no_schedule: bool = False):
+    """Render the invite email; returns (html_body, text_body)"""
+    branding = branding or DEFAULT_EMAIL_BRANDING
+    html_template, text_template = compiled_invite_templates(
+        branding["brand_name"], branding["company_name"], branding["accent_color"], branding["accent_hover_color"]
+    )
+    
+    if admin_scheduled and scheduled_date:
+        scheduled_for = scheduled_date.strftime('%B %d, %Y at %I:%M %p')
+        html_schedule = f"Your test has been scheduled for: <strong>{scheduled_for}</strong>"
+        text_schedule = f"Your test has been scheduled for: {scheduled_for}"
+        cta_label = "Access Platform"
+    elif no_schedule:
+        html_schedule = text_schedule = "You can take the test anytime at your convenience"
+        cta_label = "Take Test Anytime"
+    else:
+        html_schedule = text_schedule = "Choose a convenient date and time for your assessment"
+        cta_label = "Sign Up & Take Test"
+    
+    html_body = html_template.render({
+        "applicant_name": html.escape(applicant_name),
+        "test_title": html.escape(test_title),
+        "schedule_line": html_schedule,
+        "invite_url": html.escape(invite_url),
+        "cta_label": html.escape(cta_label)
+    })
+    text_body = text_template.render({
+        "applicant_name": applicant_name,
+        "test_title": test_title,
+        "schedule_line": text_schedule,
+        "invite_url": invite_url,
+        "cta_label": cta_label
+    })
+    return html_body, text_body
+
+class SMTPSessionPool:
+    """Authenticated SMTP sessions reused across messages, keyed by SMTP settings.
+
+    Used from worker threads, so all bookkeeping happens under a lock. Sessions
+    idle for a while are health-checked with NOOP before reuse, and any session
+    that raised during a send is closed instead of being returned.
     """
 
-async def send_email(to_email: str, subject: str, body: str, admin_id: str = None):
-    try:
-        # Get email settings from database
-        async with db_pool.acquire() as conn:
-            if admin_id:
-                settings = await conn.fetchrow("""
-                    SELECT smtp_host, smtp_port, smtp_user, smtp_password, from_email, from_name
-                    FROM admin_email_settings 
-                    WHERE admin_id = $1
-                """, uuid.UUID(admin_id))
-            else:
-                # Get settings from any admin (fallback)
-                settings = await conn.fetchrow("""
-                    SELECT smtp_host, smtp_port, smtp_user, smtp_password, from_email, from_name
-                    FROM admin_email_settings 
-                    LIMIT 1
-                """)
-            
-            if not settings or not settings['smtp_host']:
-                print("No email settings configured")
-                return False
-            
-            # Create email message
-            msg = MIMEMultipart()
-            msg['From'] = f"{settings['from_name']} <{settings['from_email']}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body to email
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Connect to SMTP server
-            server = smtplib.SMTP(settings['smtp_host'], settings['smtp_port'])
-            server.set_debuglevel(1)  # Enable debug output
+    def __init__(self, max_per_key: int, max_idle_seconds: float, max_messages: int):
+        self.max_per_key = max_per_key
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0, "recycled": 0}
+
+    @staticmethod
+    def key_for(settings):
+        return (settings['smtp_host'], settings['smtp_port'], settings['smtp_user'], settings['smtp_password'])
+
+    def open_session(self, settings):
+        server = smtplib.SMTP(settings['smtp_host'], settings['smtp_port'], timeout=30)
+        if SMTP_DEBUG:
+            server.set_debuglevel(1)
+        if SMTP_REQUIRE_TLS:
             server.starttls()  # Enable TLS encryption
+        
+        try:
+            server.login(settings['smtp_user'], settings['smtp_password'])
+        except smtplib.SMTPAuthenticationError as e:
+            print(f"SMTP Authentication failed: {e}")
+            print("Common solutions:")
+            print("1. Use App Password instead of regular password")
+            print("2. Enable SMTP AUTH in Office 365 admin center")
+            print("3. Try smtp-mail.outlook.com instead of smtp.office365.com")
+            self.close_session(server)
+            raise e
+        
+        with self.lock:
+            self.stats["opened"] += 1
+        return {"server": server, "messages": 0, "last_used": time.monotonic()}
+
+    def acquire(self, settings):
+        key = self.key_for(settings)
+        while True:
+            with self.lock:
+                sessions = self.idle.get(key)
+                session = sessions.pop() if sessions else None
+            if session is None:
+                return self.open_session(settings)
             
-            try:
-                server.login(settings['smtp_user'], settings['smtp_password'])
-            except smtplib.SMTPAuthenticationError as e:
-                print(f"SMTP Authentication failed: {e}")
-                print("Common solutions:")
-                print("1. Use App Password instead of regular password")
-                print("2. Enable SMTP AUTH in Office 365 admin center")
-                print("3. Try smtp-mail.outlook.com instead of smtp.office365.com")
-                raise e
-            
-            # Send email
-            text = msg.as_string()
-            server.sendmail(settings['from_email'], to_email, text)
+            idle_for = time.monotonic() - session["last_used"]
+            if idle_for > self.max_idle_seconds:
+                self.discard(session)
+                continue
+            # Servers drop quiet connections, so check anything that sat idle briefly
+            if idle_for > 5:
+                try:
+                    if session["server"].noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except (smtplib.SMTPException, OSError):
+                    self.discard(session)
+                    continue
+            with self.lock:
+                self.stats["reused"] += 1
+            return session
+
+    def release(self, settings, session):
+        session["messages"] += 1
+        session["last_used"] = time.monotonic()
+        if session["messages"] >= self.max_messages:
+            self.discard(session)
+            return
+        
+        key = self.key_for(settings)
+        with self.lock:
+            sessions = self.idle.setdefault(key, [])
+            if len(sessions) < self.max_per_key:
+                sessions.append(session)
+                return
+        self.close_session(session["server"])
+
+    def discard(self, session):
+        with self.lock:
+            self.stats["recycled"] += 1
+        self.close_session(session["server"])
+
+    @staticmethod
+    def close_session(server):
+        try:
             server.quit()
-            
-            print(f"Email sent successfully to {to_email}")
-            return True
-            
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def close_all(self):
+        with self.lock:
+            sessions = [session for pool in self.idle.values() for session in pool]
+            self.idle.clear()
+        for session in sessions:
+            self.close_session(session["server"])
+
+smtp_pool = SMTPSessionPool(SMTP_POOL_SIZE, SMTP_SESSION_MAX_IDLE_SECONDS, SMTP_SESSION_MAX_MESSAGES)
+
+def encode_header_value(value: str) -> str:
+    """RFC 2047-encode a header value when it is not plain ASCII"""
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode()
+
+@lru_cache(maxsize=256)
+def encoded_sender(from_name: str, from_email: str) -> str:
+    return f"{encode_header_value(from_name)} <{from_email}>"
+
+@lru_cache(maxsize=256)
+def encoded_subject(subject: str) -> str:
+    return encode_header_value(subject)
+
+MIME_PART = (
+    '--{boundary}\n'
+    'Content-Type: text/{subtype}; charset="utf-8"\n'
+    'MIME-Version: 1.0\n'
+    'Content-Transfer-Encoding: base64\n'
+    '\n'
+    '{payload}'
+)
+
+def build_email_message(settings, to_email: str, subject: str, body: str, text_body: str = None) -> str:
+    """Serialize an HTML email, as multipart/alternative when a text part is given.
+
+    Every invite has the same shape, so the message is written directly from a
+    fixed envelope instead of going through email.generator, which re-folds
+    headers and compiles a boundary regex per message. The output matches what
+    MIMEMultipart/MIMEText produce for these parts.
+    """
+    boundary = f"==============={uuid.uuid4().hex}=="
+    parts = []
+    if text_body:
+        # Clients show the last alternative they support, so HTML goes last
+        parts.append(MIME_PART.format(boundary=boundary, subtype='plain',
+                                      payload=base64.encodebytes(text_body.encode('utf-8')).decode('ascii')))
+    parts.append(MIME_PART.format(boundary=boundary, subtype='html',
+                                  payload=base64.encodebytes(body.encode('utf-8')).decode('ascii')))
+    return (
+        f'Content-Type: multipart/{"alternative" if text_body else "mixed"}; boundary="{boundary}"\n'
+        'MIME-Version: 1.0\n'
+        f"From: {encoded_sender(settings['from_name'], settings['from_email'])}\n"
+        f"To: {encode_header_value(to_email)}\n"
+        f"Subject: {encoded_subject(subject)}\n"
+        '\n'
+        + "".join(parts)
+        + f'--{boundary}--\n'
+    )
+
+def deliver_smtp_message(settings, to_email: str, subject: str, body: str, text_body: str = None):
+    """Blocking SMTP delivery over a pooled session; always called from a worker thread"""
+    text = build_email_message(settings, to_email, subject, body, text_body)
+    
+    session = smtp_pool.acquire(settings)
+    try:
+        session["server"].sendmail(settings['from_email'], to_email, text)
+    except smtplib.SMTPServerDisconnected:
+        # A pooled session can still drop between the health check and the send
+        smtp_pool.discard(session)
+        session = smtp_pool.open_session(settings)
+        try:
+            session["server"].sendmail(settings['from_email'], to_email, text)
+        except Exception:
+            smtp_pool.discard(session)
+            raise
+    except Exception:
+        smtp_pool.discard(session)
+        raise
+    smtp_pool.release(settings, session)
+
+# Email settings per admin (None = fallback to any admin) -> (expires at, settings), per worker.
+# Changes clear every worker's cache over the signaling bus; the TTL covers workers that
+# missed it. The generation keeps a load that raced a change from being stored.
+email_settings_cache = {}
+email_settings_generation = 0
+
+async def get_admin_email_settings(admin_id: str = None):
+    cache_key = str(admin_id) if admin_id else None
+    entry = email_settings_cache.get(cache_key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    
+    generation = email_settings_generation
+    async with db_pool.acquire() as conn:
+        if admin_id:
+            settings = await conn.fetchrow("""
+                SELECT es.smtp_host, es.smtp_port, es.smtp_user, es.smtp_password, es.from_email, es.from_name,
+                       ts.custom_colors->>'primary' as brand_color,
+                       ts.custom_colors->>'primaryHover' as brand_hover_color
+                FROM admin_email_settings es
+                LEFT JOIN admin_theme_settings ts ON ts.admin_id = es.admin_id
+                WHERE es.admin_id = $1
+            """, uuid.UUID(str(admin_id)))
+        else:
+            # Get settings from any admin (fallback)
+            settings = await conn.fetchrow("""
+                SELECT es.smtp_host, es.smtp_port, es.smtp_user, es.smtp_password, es.from_email, es.from_name,
+                       ts.custom_colors->>'primary' as brand_color,
+                       ts.custom_colors->>'primaryHover' as brand_hover_color
+                FROM admin_email_settings es
+                LEFT JOIN admin_theme_settings ts ON ts.admin_id = es.admin_id
+                LIMIT 1
+            """)
+    
+    if not settings:
+        # Not cached, so settings saved on another worker are used right away
+        return None
+    settings = dict(settings)
+    if generation == email_settings_generation:
+        email_settings_cache[cache_key] = (time.monotonic() + EMAIL_SETTINGS_CACHE_TTL_SECONDS, settings)
+    return settings
+
+def forget_email_settings():
+    global email_settings_generation
+    email_settings_generation += 1
+    email_settings_cache.clear()
+
+async def invalidate_email_settings(conn=None):
+    """Drop cached email settings here and on every other worker"""
+    forget_email_settings()
+    if signaling_hub.bus:
+        await signaling_hub.bus.send(SIGNAL_SYNC_CHANNEL, {"op": "email_settings"}, conn)
+
+async def get_email_branding(admin_id: str = None):
+    """Invite email branding for an admin; shares the email settings cache"""
+    return email_branding_from_settings(await get_admin_email_settings(admin_id))
+
+async def deliver_email(to_email: str, subject: str, body: str, admin_id: str = None, text_body: str = None):
+    """Send an email with the admin's SMTP settings, raising on failure"""
+    settings = await get_admin_email_settings(admin_id)
+    
+    if not settings or not settings['smtp_host']:
+        raise RuntimeError("No email settings configured")
+    
+    # smtplib blocks, so keep it off the event loop
+    await asyncio.to_thread(deliver_smtp_message, settings, to_email, subject, body, text_body)
+    print(f"Email sent successfully to {to_email}")
+
+async def send_email(to_email: str, subject: str, body: str, admin_id: str = None):
+    try:
+        await deliver_email(to_email, subject, body, admin_id)
+        return True
     except Exception as e:
         print(f"Email sending failed: {e}")
         return False
 
+# Email outbox: request handlers only enqueue, a background worker delivers
+email_outbox_wakeup = asyncio.Event()
+email_outbox_stats = {"sent": 0, "failed": 0, "retried": 0}
+email_sent_times = deque(maxlen=10000)
+
+async def enqueue_email(conn, to_email: str, subject: str, body: str, admin_id: str = None, invite_id=None, text_body: str = None):
+    """Queue an email for the background sender; joins the caller's transaction"""
+    outbox_id = await conn.fetchval("""
+        INSERT INTO email_outbox (invite_id, admin_id, to_email, subject, body, text_body)
+        VALUES ($1, $2, $3, $4, $5, $6)
+        RETURNING id
+    """, invite_id, uuid.UUID(str(admin_id)) if admin_id else None, to_email, subject, body, text_body)
+    email_outbox_wakeup.set()
+    return outbox_id
+
+async def enqueue_emails(conn, messages, admin_id: str = None):
+    """Queue many emails in one statement; messages are (to_email, subject, body, text_body, invite_id) tuples"""
+    if not messages:
+        return 0
+    to_emails, subjects, bodies, text_bodies, invite_ids = zip(*messages)
+    await conn.execute("""
+        INSERT INTO email_outbox (invite_id, admin_id, to_email, subject, body, text_body)
+        SELECT m.invite_id, $1, m.to_email, m.subject, m.body, m.text_body
+        FROM unnest($2::uuid[], $3::text[], $4::text[], $5::text[], $6::text[])
+             AS m(invite_id, to_email, subject, body, text_body)
+    """, uuid.UUID(str(admin_id)) if admin_id else None,
+        list(invite_ids), list(to_emails), list(subjects), list(bodies), list(text_bodies))
+    email_outbox_wakeup.set()
+    return len(messages)
+
+async def deliver_outbox_message(message):
+    """Send one claimed outbox message and record the outcome on the invite"""
+    error = None
+    try:
+        await deliver_email(message['to_email'], message['subject'], message['body'],
+                            message['admin_id'], message['text_body'])
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+        print(f"Email sending failed: {error}")
+    
+    async with db_pool.acquire() as conn:
+        async with conn.transaction():
+            if error is None:
+                await conn.execute("""
+                    UPDATE email_outbox
+                    SET status = 'sent', sent_at = CURRENT_TIMESTAMP, locked_at = NULL, last_error = NULL
+                    WHERE id = $1
+                """, message['id'])
+                if message['invite_id']:
+                    await conn.execute("""
+                        UPDATE test_invites
+                        SET email_sent = true, email_sent_at = CURRENT_TIMESTAMP, email_error = NULL
+                        WHERE id = $1
+                    """, message['invite_id'])
+                email_outbox_stats["sent"] += 1
+                email_sent_times.append(time.monotonic())
+            else:
+                # Exponential backoff until the attempt budget is used up
+                gave_up = message['attempts'] >= EMAIL_OUTBOX_MAX_ATTEMPTS
+                backoff = EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** (message['attempts'] - 1))
+                await conn.execute("""
+                    UPDATE email_outbox
+                    SET status = $2, last_error = $3, locked_at = NULL,
+                        next_attempt_at = CURRENT_TIMESTAMP + make_interval(secs => $4)
+                    WHERE id = $1
+                """, message['id'], 'failed' if gave_up else 'pending', error, backoff)
+                if message['invite_id']:
+                    await conn.execute("""
+                        UPDATE test_invites SET email_sent = false, email_error = $2 WHERE id = $1
+                    """, message['invite_id'], error)
+                email_outbox_stats["failed" if gave_up else "retried"] += 1
+
+async def process_email_outbox_batch():
+    """Claim due outbox messages and deliver them; returns how many were claimed"""
+    async with db_pool.acquire() as conn:
+        # SKIP LOCKED lets several backend workers drain the outbox without double sends;
+        # rows stuck in 'sending' by a crashed worker are reclaimed after 10 minutes
+        messages = await conn.fetch("""
+            UPDATE email_outbox
+            SET status = 'sending', attempts = attempts + 1, locked_at = CURRENT_TIMESTAMP
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP)
+                   OR (status = 'sending' AND locked_at < CURRENT_TIMESTAMP - INTERVAL '10 minutes')
+                ORDER BY next_attempt_at
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, invite_id, admin_id, to_email, subject, body, text_body, attempts
+        """, EMAIL_OUTBOX_BATCH_SIZE)
+    
+    # Deliver concurrently, one message per pooled SMTP session
+    semaphore = asyncio.Semaphore(SMTP_POOL_SIZE)
+    
+    async def deliver(message):
+        async with semaphore:
+            await deliver_outbox_message(message)
+    
+    await asyncio.gather(*[deliver(message) for message in messages])
+    return len(messages)
+
+async def email_outbox_worker():
+    """Background loop draining the email outbox"""
+    while True:
+        try:
+            processed = await process_email_outbox_batch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Email outbox worker error: {e}")
+            processed = 0
+        
+        if processed == 0:
+            try:
+                await asyncio.wait_for(email_outbox_wakeup.wait(), timeout=EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            email_outbox_wakeup.clear()
+
+async def get_email_outbox_metrics():
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT status, COUNT(*) as count FROM email_outbox GROUP BY status")
+    
+    counts = {row['status']: row['count'] for row in rows}
+    cutoff = time.monotonic() - 60
+    return {
+        "queue_depth": counts.get('pending', 0) + counts.get('sending', 0),
+        "by_status": counts,
+        "sent_last_minute": sum(1 for sent_at in email_sent_times if sent_at >= cutoff),
+        "smtp_sessions": dict(smtp_pool.stats),
+        **email_outbox_stats
+    }
+
+async def webrtc_signal_maintenance_worker():
+    """Background loop keeping webrtc_signals partitions rolling: create upcoming days, drop expired ones"""
+    retention = timedelta(days=WEBRTC_SIGNAL_RETENTION_DAYS)
+    while True:
+        try:
+            async with db_pool.acquire() as conn:
+                created = await conn.fetchval("SELECT create_webrtc_signal_partitions(3, NULL, $1)",
+                                              WEBRTC_STORE_UNLOGGED)
+                dropped = await conn.fetchval("SELECT drop_old_webrtc_signal_partitions($1)", retention)
+            if created or dropped:
+                print(f"webrtc_signals partitions: {created} created, {dropped} dropped")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WebRTC signal maintenance error: {e}")
+        await asyncio.sleep(WEBRTC_MAINTENANCE_INTERVAL_SECONDS)
+
+class HeartbeatBuffer:
+    """Latest heartbeat per invite, written for all invites in one UPDATE per flush.
+
+    A client beating several times between flushes costs one row write.
+    Heartbeats are not authenticated, so at most max_pending invites are held
+    until the next flush; beats for further invites are dropped.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = {}
+        self.stats = {"received": 0, "dropped": 0, "flushes": 0, "written": 0, "reaped": 0}
+
+    def touch(self, invite_uuid: uuid.UUID) -> bool:
+        """Buffer a heartbeat; False if it was dropped because the buffer is full"""
+        if invite_uuid not in self.pending and len(self.pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            return False
+        self.pending[invite_uuid] = datetime.now(timezone.utc)
+        self.stats["received"] += 1
+        return True
+
+    async def flush(self):
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, {}
+        try:
+            async with db_pool.acquire() as conn:
+                result = await conn.execute("""
+                    UPDATE active_webrtc_sessions s
+                    SET last_heartbeat_at = GREATEST(s.last_heartbeat_at, h.seen_at)
+                    FROM unnest($1::uuid[], $2::timestamptz[]) AS h(invite_id, seen_at)
+                    WHERE s.invite_id = h.invite_id AND s.status <> 'ended'
+                """, list(pending), list(pending.values()))
+        except Exception:
+            # Keep them for the next flush unless a newer beat arrived meanwhile
+            for invite_uuid, seen_at in pending.items():
+                if invite_uuid in self.pending or len(self.pending) < self.max_pending:
+                    self.pending.setdefault(invite_uuid, seen_at)
+            raise
+        written = int(result.split()[-1])
+        self.stats["flushes"] += 1
+        self.stats["written"] += written
+        return written
+
+    def metrics(self):
+        return {**self.stats, "pending": len(self.pending), "max_pending": self.max_pending}
+
+heartbeat_buffer = HeartbeatBuffer(WEBRTC_HEARTBEAT_MAX_PENDING)
+
+async def reap_stale_webrtc_sessions():
+    """End sessions with no heartbeat for WEBRTC_HEARTBEAT_TIMEOUT_SECONDS.
+
+    Only the submissions of the sessions ended here have is_monitored
+    updated. Every worker runs this; the UPDATE hands each session to one.
+    """
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch("""
+            WITH reaped AS (
+                UPDATE active_webrtc_sessions
+                SET status = 'ended', ended_at = CURRENT_TIMESTAMP
+                WHERE status <> 'ended'
+                AND COALESCE(last_heartbeat_at, created_at) < CURRENT_TIMESTAMP - $1::interval
+                RETURNING invite_id
+            ), unmonitored AS (
+                UPDATE test_submissions SET is_monitored = false
+                WHERE invite_id IN (SELECT invite_id FROM reaped) AND is_monitored
+            )
+            SELECT invite_id FROM reaped
+        """, timedelta(seconds=WEBRTC_HEARTBEAT_TIMEOUT_SECONDS))
+        for row in rows:
+            await monitoring_feed.invite_changed(conn, row['invite_id'])
+    for row in rows:
+        await signaling_hub.close_room(str(row['invite_id']))
+    heartbeat_buffer.stats["reaped"] += len(rows)
+    return len(rows)
+
+async def webrtc_heartbeat_worker():
+    """Background loop writing buffered heartbeats and ending stale sessions"""
+    next_reap = time.monotonic() + WEBRTC_REAPER_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(WEBRTC_HEARTBEAT_FLUSH_SECONDS)
+        try:
+            await heartbeat_buffer.flush()
+            if time.monotonic() >= next_reap:
+                next_reap = time.monotonic() + WEBRTC_REAPER_INTERVAL_SECONDS
+                reaped = await reap_stale_webrtc_sessions()
+                if reaped:
+                    print(f"Ended {reaped} WebRTC session(s) with a stale heartbeat")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WebRTC heartbeat worker error: {e}")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def encode_position_cursor(position) -> str:
+    """Opaque cursor for a (timestamp, id) position in a keyset-ordered listing"""
+    timestamp, row_id = position
+    return f"{(timestamp - EPOCH) // timedelta(microseconds=1)}_{row_id}"
+
+def decode_position_cursor(cursor: str):
+    """Parse a cursor from encode_position_cursor; raises ValueError if malformed"""
+    micros, row_id = cursor.split("_", 1)
+    return (EPOCH + timedelta(microseconds=int(micros)), str(uuid.UUID(row_id)))
+
+def encode_signal_cursor(seq: int) -> str:
+    """Opaque cursor for a signal's sequence number in its store"""
+    return str(seq)
+
+def decode_signal_cursor(cursor: str) -> int:
+    """Parse a cursor from encode_signal_cursor; raises ValueError if malformed"""
+    seq = int(cursor)
+    if seq < 0:
+        raise ValueError("negative signal cursor")
+    return seq
+
+# Sequence number before every signal: returned when an invite has none yet, so a
+# poller always holds a cursor to long-poll from
+SIGNAL_LOG_START_CURSOR = encode_signal_cursor(0)
+
+def make_signal(signal_id, signal_type: str, data: Dict[str, Any], sender_role: Optional[str]):
+    return {
+        "id": str(signal_id),
+        "type": signal_type,
+        "from": sender_role,
+        "data": data,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+class SignalStore(ABC):
+    """Where offers, answers and ICE candidates are kept for REST readers.
+
+    `shared` stores are visible to every worker; a worker-local store also
+    receives the signals other workers fan out. Methods take an optional
+    connection so a store backed by Postgres can join the caller's work.
+
+    Signals are numbered by a `seq` the store assigns, which only grows per
+    invite, and a signal becomes visible to readers only after every signal
+    of its invite numbered below it; readers resume after the last `seq`
+    they saw and miss nothing. The creation time is not usable for this: it
+    comes from each worker's clock, and concurrent requests store their
+    signals out of clock order.
+    """
+
+    shared = False
+
+    @abstractmethod
+    async def add(self, invite_id: str, signals: List[Dict[str, Any]], conn=None):
+        """Keep signals for an invite"""
+
+    @abstractmethod
+    async def since(self, invite_id: str, after_seq: int = 0, conn=None) -> List[Dict[str, Any]]:
+        """Signals for an invite numbered above after_seq, in `seq` order, each with its `seq`"""
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+class InviteSignals:
+    def __init__(self):
+        self.signals = deque()  # (seq, signal, size) in arrival order
+        self.ids = set()
+        self.size = 0
+        self.touched = time.monotonic()
+
+class MemorySignalStore(SignalStore):
+    """Worker-local store: per-invite count and byte limits, idle invites expire after the TTL"""
+
+    def __init__(self, ttl_seconds: float, max_signals: int, max_bytes: int, max_invites: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_signals = max_signals
+        self.max_bytes = max_bytes
+        self.max_invites = max_invites
+        self.invites = OrderedDict()  # least recently written first
+        self.last_seq = 0  # store-wide, so an invite dropped and written again keeps counting up
+        self.stats = {"stored": 0, "evicted": 0, "expired_invites": 0}
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self.invites:
+            invite_id, entry = next(iter(self.invites.items()))
+            if entry.touched >= cutoff and len(self.invites) <= self.max_invites:
+                break
+            del self.invites[invite_id]
+            self.stats["expired_invites"] += 1
+
+    async def add(self, invite_id: str, signals: List[Dict[str, Any]], conn=None):
+        entry = self.invites.pop(invite_id, None) or InviteSignals()
+        self.invites[invite_id] = entry
+        entry.touched = time.monotonic()
+        for signal in signals:
+            if signal["id"] in entry.ids:
+                continue
+            size = len(json.dumps(signal["data"]))
+            self.last_seq += 1
+            entry.signals.append((self.last_seq, signal, size))
+            entry.ids.add(signal["id"])
+            entry.size += size
+            self.stats["stored"] += 1
+            # The newest signal always stays, even if it alone exceeds the byte limit
+            while len(entry.signals) > 1 and (len(entry.signals) > self.max_signals or entry.size > self.max_bytes):
+                _, oldest, oldest_size = entry.signals.popleft()
+                entry.ids.discard(oldest["id"])
+                entry.size -= oldest_size
+                self.stats["evicted"] += 1
+        self.expire()
+
+    async def since(self, invite_id: str, after_seq: int = 0, conn=None) -> List[Dict[str, Any]]:
+        entry = self.invites.get(invite_id)
+        if entry is None:
+            return []
+        return [{**signal, "seq": seq} for seq, signal, _ in entry.signals if seq > after_seq]
+
+    def metrics(self):
+        return {
+            **self.stats,
+            "backend": "memory",
+            "invites": len(self.invites),
+            "signals": sum(len(entry.signals) for entry in self.invites.values()),
+            "bytes": sum(entry.size for entry in self.invites.values())
+        }
+
+class PostgresSignalStore(SignalStore):
+    """Shared store in webrtc_signals, for REST readers spread over several workers.
+
+    The seq range of a batch is taken from the invite's webrtc_signal_counters
+    row, whose lock is held until the caller's transaction commits. Writers for
+    one invite therefore commit in seq order, whichever worker they run on.
+    """
+
+    shared = True
+
+    def __init__(self):
+        self.stats = {"stored": 0}
+
+    async def add(self, invite_id: str, signals: List[Dict[str, Any]], conn=None):
+        if conn is None:
+            async with db_pool.acquire() as conn:
+                return await self.add(invite_id, signals, conn)
+        await conn.execute("""
+            WITH counter AS (
+                INSERT INTO webrtc_signal_counters AS c (invite_id, last_seq) VALUES ($2, $6)
+                ON CONFLICT (invite_id) DO UPDATE SET last_seq = c.last_seq + EXCLUDED.last_seq
+                RETURNING last_seq
+            )
+            INSERT INTO webrtc_signals (id, invite_id, type, data, created_at, seq)
+            SELECT s.id, $2, s.type, s.data::jsonb, s.created_at, counter.last_seq - $6 + s.n
+            FROM counter, unnest($1::uuid[], $3::text[], $4::text[], $5::timestamptz[])
+                WITH ORDINALITY AS s(id, type, data, created_at, n)
+            ON CONFLICT (id, created_at) DO NOTHING
+        """, [uuid.UUID(signal["id"]) for signal in signals], uuid.UUID(invite_id),
+            [signal["type"] for signal in signals],
+            [json.dumps({**signal["data"], "from": signal["from"]}) for signal in signals],
+            [datetime.fromisoformat(signal["created_at"]) for signal in signals], len(signals))
+        self.stats["stored"] += len(signals)
+
+    async def since(self, invite_id: str, after_seq: int = 0, conn=None) -> List[Dict[str, Any]]:
+        if conn is None:
+            async with db_pool.acquire() as conn:
+                return await self.since(invite_id, after_seq, conn)
+        rows = await conn.fetch("""
+            SELECT id, type, data, created_at, seq
+            FROM webrtc_signals
+            WHERE invite_id = $1 AND seq > $2
+            ORDER BY seq ASC
+        """, uuid.UUID(invite_id), after_seq)
+
+        signals = []
+        for row in rows:
+            signal_data = json.loads(row['data'])
+            signals.append({
+                "id": str(row['id']),
+                "type": row['type'],
+                "from": signal_data.get('from'),
+                "data": signal_data,
+                "created_at": row['created_at'].isoformat(),
+                "seq": row['seq']
+            })
+        return signals
+
+    def metrics(self):
+        return {**self.stats, "backend": "postgres"}
+
+if WEBRTC_STORE == 'postgres':
+    signal_store = PostgresSignalStore()
+else:
+    signal_store = MemorySignalStore(WEBRTC_STORE_TTL_SECONDS, WEBRTC_STORE_MAX_SIGNALS,
+                                     WEBRTC_STORE_MAX_BYTES, WEBRTC_STORE_MAX_INVITES)
+
+class SignalingRoom:
+    def __init__(self, buffer_size: int):
+        self.peers = {}  # websocket -> role
+        self.recent = deque(maxlen=buffer_size)
+        self.seen = OrderedDict()  # recent signal ids, so fan-out replays are not delivered twice
+        self.waiters = set()  # events of REST long-polls waiting for the next signal
+        self.touched = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return not self.peers and not self.waiters
+
+class SignalingHub:
+    """Per-worker relay of WebRTC offers, answers and ICE candidates by invite.
+
+    Peers connected over WebSocket get each other's messages straight from
+    memory. The current negotiation (latest offer and everything after it) is
+    buffered so a peer that joins late still receives it, and REST long-polls
+    are woken when a signal arrives. With a SignalingBus attached, signals
+    also reach peers on other workers.
+    """
+
+    def __init__(self, buffer_size: int, room_ttl_seconds: float):
+        self.buffer_size = buffer_size
+        self.room_ttl_seconds = room_ttl_seconds
+        self.rooms = {}
+        self.bus = None
+        self.stats = {"connections": 0, "relayed": 0}
+
+    def room(self, invite_id: str) -> SignalingRoom:
+        room = self.rooms.get(invite_id)
+        if room is None:
+            self.prune()
+            room = self.rooms[invite_id] = SignalingRoom(self.buffer_size)
+        return room
+
+    def prune(self):
+        """Drop rooms nobody is connected to that have been quiet past the TTL"""
+        cutoff = time.monotonic() - self.room_ttl_seconds
+        for invite_id in [key for key, room in self.rooms.items() if room.idle and room.touched < cutoff]:
+            del self.rooms[invite_id]
+
+    async def join(self, invite_id: str, websocket: WebSocket, role: str):
+        room = self.room(invite_id)
+        first_peer = room.idle
+        room.peers[websocket] = role
+        self.stats["connections"] += 1
+        for signal in list(room.recent):
+            if signal["from"] != role:
+                await websocket.send_json(signal)
+        if first_peer and self.bus:
+            await self.bus.subscribe(invite_id)
+
+    async def leave(self, invite_id: str, websocket: WebSocket):
+        room = self.rooms.get(invite_id)
+        if room:
+            room.peers.pop(websocket, None)
+            room.touched = time.monotonic()
+            if room.idle and self.bus:
+                await self.bus.unsubscribe(invite_id)
+
+    @asynccontextmanager
+    async def watch(self, invite_id: str):
+        """Yield an event that is set when the next signal for the invite arrives.
+
+        Register before reading signals so nothing slips in between the read
+        and the wait.
+        """
+        room = self.room(invite_id)
+        first_listener = room.idle
+        changed = asyncio.Event()
+        room.waiters.add(changed)
+        if first_listener and self.bus:
+            await self.bus.subscribe(invite_id)
+        try:
+            yield changed
+        finally:
+            room.waiters.discard(changed)
+            room.touched = time.monotonic()
+            if room.idle and self.bus and self.rooms.get(invite_id) is room:
+                await self.bus.unsubscribe(invite_id)
+
+    async def deliver(self, invite_id: str, signal: Dict[str, Any], sender: WebSocket = None) -> bool:
+        """Buffer a signal and hand it to this worker's peers; False if it was already seen"""
+        room = self.room(invite_id)
+        if signal["id"] in room.seen:
+            return False
+        room.seen[signal["id"]] = True
+        if len(room.seen) > self.buffer_size * 4:
+            room.seen.popitem(last=False)
+        
+        if signal["type"] == "offer":
+            # A new offer starts a new negotiation; older candidates belong to a dead connection
+            room.recent.clear()
+        room.recent.append(signal)
+        room.touched = time.monotonic()
+        for changed in room.waiters:
+            changed.set()
+        
+        for websocket, role in list(room.peers.items()):
+            # Never echo a signal back to the side that produced it
+            if websocket is sender or role == signal["from"]:
+                continue
+            try:
+                await websocket.send_json(signal)
+                self.stats["relayed"] += 1
+            except Exception:
+                room.peers.pop(websocket, None)
+        return True
+
+    async def publish(self, invite_id: str, signal: Dict[str, Any], sender: WebSocket = None, conn=None):
+        """Deliver locally and fan out to the other workers"""
+        await self.deliver(invite_id, signal, sender)
+        if self.bus:
+            await self.bus.publish(invite_id, signal, conn)
+
+    async def publish_batch(self, invite_id: str, signals: List[Dict[str, Any]], conn=None):
+        """publish() for several signals, fanned out in as few notifications as fit"""
+        for signal in signals:
+            await self.deliver(invite_id, signal)
+        if self.bus:
+            await self.bus.publish_batch(invite_id, signals, conn)
+
+    async def close_room(self, invite_id: str, broadcast: bool = True):
+        room = self.rooms.pop(invite_id, None)
+        if room:
+            for changed in room.waiters:
+                changed.set()
+            for websocket in list(room.peers):
+                try:
+                    await websocket.send_json({"type": "session_ended", "invite_id": invite_id})
+                except Exception:
+                    pass
+        if self.bus:
+            if room and not room.idle:
+                await self.bus.unsubscribe(invite_id)
+            if broadcast:
+                await self.bus.send(SIGNAL_SYNC_CHANNEL, {"op": "end", "invite_id": invite_id})
+
+    def metrics(self):
+        return {
+            **self.stats,
+            "rooms": len(self.rooms),
+            "connected_peers": sum(len(room.peers) for room in self.rooms.values()),
+            "long_polls": sum(len(room.waiters) for room in self.rooms.values()),
+            "store": signal_store.metrics(),
+            "fanout": self.bus.metrics() if self.bus else None
+        }
+
+# Postgres caps NOTIFY payloads at 8000 bytes; larger signals are sent in chunks
+NOTIFY_PAYLOAD_LIMIT = 7900
+# JSON-encoding a chunk can at most double it (escaped quotes and backslashes)
+NOTIFY_CHUNK_SIZE = (NOTIFY_PAYLOAD_LIMIT - 300) // 2
+SIGNAL_SYNC_CHANNEL = "webrtc_sync"
+
+def signal_channel(invite_id: str) -> str:
+    return f"webrtc_{uuid.UUID(invite_id).hex}"
+
+class SignalingBus:
+    """Cross-worker fan-out for the signaling hub over Postgres LISTEN/NOTIFY.
+
+    Each worker keeps one dedicated listener connection. It LISTENs on an
+    invite's channel only while local peers are connected to that invite, and
+    always on a shared sync channel used to ask other workers for the
+    negotiation they have buffered when a peer joins here. Notifications are
+    handled in arrival order by a single task.
+
+    If the listener connection drops, it is reopened with exponential backoff
+    and every channel is LISTENed again. Notifications sent in between are
+    lost, so on reconnect the worker asks for buffered negotiations again and
+    drops the caches that rely on hearing invalidations.
+    """
+
+    def __init__(self, hub: SignalingHub, worker_id: str):
+        self.hub = hub
+        self.worker_id = worker_id
+        self.conn = None
+        self.task = None
+        self.reconnect_task = None
+        self.queue = None
+        self.lock = None
+        self.channels = set()
+        self.partial = OrderedDict()  # (origin, signal id) -> chunks received so far
+        self.stats = {"published": 0, "received": 0, "chunked": 0, "reconnects": 0}
+
+    async def start(self):
+        # Bound to the running loop, so created here rather than at import
+        self.queue = asyncio.Queue()
+        self.lock = asyncio.Lock()
+        self.channels = set()
+        await self.connect()
+        self.task = asyncio.create_task(self.consume())
+        self.hub.bus = self
+
+    async def connect(self):
+        conn = await asyncpg.connect(**db_connection_settings())
+        try:
+            conn.add_termination_listener(self.on_termination)
+            await conn.add_listener(SIGNAL_SYNC_CHANNEL, self.on_notify)
+            for channel in self.channels:
+                await conn.add_listener(channel, self.on_notify)
+        except Exception:
+            await conn.close()
+            raise
+        self.conn = conn
+        # From here on, user and test changes on other workers reach this one
+        principal_cache.trust_claims_from(time.time())
+        test_cache.set_bus_connected(True)
+
+    async def stop(self):
+        self.hub.bus = None
+        principal_cache.trust_claims_from(None)
+        test_cache.set_bus_connected(False)
+        for task in (self.reconnect_task, self.task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.reconnect_task = None
+        if self.conn:
+            conn, self.conn = self.conn, None
+            await conn.close()
+
+    def on_notify(self, conn, pid, channel, payload):
+        self.queue.put_nowait(payload)
+
+    def on_termination(self, conn):
+        if conn is not self.conn:
+            return
+        self.conn = None
+        # Changes announced while nobody listens would be missed
+        principal_cache.trust_claims_from(None)
+        test_cache.set_bus_connected(False)
+        print("Signaling listener connection lost, reconnecting")
+        if self.reconnect_task is None or self.reconnect_task.done():
+            self.reconnect_task = asyncio.create_task(self.reconnect())
+
+    async def reconnect(self):
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                async with self.lock:
+                    await self.connect()
+            except Exception as e:
+                delay = min(delay * 2, WEBRTC_NOTIFY_RECONNECT_MAX_SECONDS)
+                print(f"Signaling listener reconnect failed, retrying in {delay:.0f}s: {e}")
+                continue
+            break
+        self.stats["reconnects"] += 1
+        print(f"Signaling listener reconnected, listening on {len(self.channels)} invite channels")
+        principal_cache.entries.clear()
+        forget_email_settings()
+        # Ask again for negotiations relayed to local invites while disconnected
+        try:
+            for channel in list(self.channels):
+                invite_id = str(uuid.UUID(channel[len("webrtc_"):]))
+                await self.send(SIGNAL_SYNC_CHANNEL, {"op": "sync", "invite_id": invite_id})
+        except Exception as e:
+            print(f"Signaling resync after reconnect failed: {e}")
+
+    async def subscribe(self, invite_id: str):
+        channel = signal_channel(invite_id)
+        async with self.lock:
+            if channel in self.channels:
+                return
+            # While disconnected the channel is only recorded; reconnect LISTENs on it
+            self.channels.add(channel)
+            if self.conn is not None:
+                await self.conn.add_listener(channel, self.on_notify)
+        # Another worker may hold a negotiation that started before anyone joined here
+        await self.send(SIGNAL_SYNC_CHANNEL, {"op": "sync", "invite_id": invite_id})
+
+    async def unsubscribe(self, invite_id: str):
+        channel = signal_channel(invite_id)
+        async with self.lock:
+            if channel not in self.channels:
+                return
+            self.channels.discard(channel)
+            if self.conn is not None:
+                await self.conn.remove_listener(channel, self.on_notify)
+
+    async def send(self, channel: str, message: Dict[str, Any], conn=None):
+        payload = json.dumps({**message, "origin": self.worker_id})
+        if conn is None:
+            async with db_pool.acquire() as conn:
+                await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+        else:
+            await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def publish(self, invite_id: str, signal: Dict[str, Any], conn=None):
+        channel = signal_channel(invite_id)
+        message = {"op": "signal", "invite_id": invite_id, "signal": signal}
+        encoded = json.dumps(signal)
+        if len(encoded) + 200 <= NOTIFY_PAYLOAD_LIMIT:
+            await self.send(channel, message, conn)
+        else:
+            # Large SDPs: split the encoded signal, the receiving workers put it back together
+            parts = [encoded[start:start + NOTIFY_CHUNK_SIZE] for start in range(0, len(encoded), NOTIFY_CHUNK_SIZE)]
+            for index, part in enumerate(parts):
+                await self.send(channel, {"op": "chunk", "invite_id": invite_id, "id": signal["id"],
+                                          "index": index, "count": len(parts), "part": part}, conn)
+            self.stats["chunked"] += 1
+        self.stats["published"] += 1
+
+    async def publish_batch(self, invite_id: str, signals: List[Dict[str, Any]], conn=None):
+        message = {"op": "signals", "invite_id": invite_id, "signals": signals}
+        if len(signals) > 1 and len(json.dumps(message)) + 100 <= NOTIFY_PAYLOAD_LIMIT:
+            await self.send(signal_channel(invite_id), message, conn)
+            self.stats["published"] += 1
+        else:
+            for signal in signals:
+                await self.publish(invite_id, signal, conn)
+
+    async def consume(self):
+        while True:
+            payload = await self.queue.get()
+            try:
+                await self.handle(json.loads(payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Signaling fan-out error: {e}")
+
+    async def receive(self, invite_id: str, signals: List[Dict[str, Any]]):
+        for signal in signals:
+            await self.hub.deliver(invite_id, signal)
+        if not signal_store.shared:
+            await signal_store.add(invite_id, signals)
+
+    async def handle(self, message: Dict[str, Any]):
+        if message.get("origin") == self.worker_id:
+            return
+        self.stats["received"] += 1
+        invite_id = message.get("invite_id")
+        
+        if message["op"] == "signal":
+            await self.receive(invite_id, [message["signal"]])
+        elif message["op"] == "signals":
+            await self.receive(invite_id, message["signals"])
+        elif message["op"] == "chunk":
+            key = (message["origin"], message["id"])
+            parts = self.partial.setdefault(key, [None] * message["count"])
+            parts[message["index"]] = message["part"]
+            if None not in parts:
+                del self.partial[key]
+                await self.receive(invite_id, [json.loads("".join(parts))])
+            while len(self.partial) > 100:
+                self.partial.popitem(last=False)
+        elif message["op"] == "sync":
+            room = self.hub.rooms.get(invite_id)
+            if room and room.recent:
+                await self.publish_batch(invite_id, list(room.recent))
+        elif message["op"] == "end":
+            await self.hub.close_room(invite_id, broadcast=False)
+        elif message["op"] == "monitoring":
+            monitoring_feed.deliver(message["event"])
+        elif message["op"] == "principal":
+            principal_cache.invalidate(message["email"])
+        elif message["op"] == "email_settings":
+            forget_email_settings()
+        elif message["op"] == "test_definition":
+            test_cache.invalidate(message["test_id"])
+
+    def metrics(self):
+        return {**self.stats, "worker_id": self.worker_id, "listening_channels": len(self.channels),
+                "connected": self.conn is not None}
+
+signaling_hub = SignalingHub(WEBRTC_SIGNAL_BUFFER, WEBRTC_ROOM_TTL_SECONDS)
+signaling_bus = SignalingBus(signaling_hub, uuid.uuid4().hex)
+
+async def invalidate_test_definition(test_id, conn=None):
+    """Drop an edited test's cached definition here and on every other worker"""
+    test_cache.invalidate(test_id)
+    if signaling_hub.bus:
+        await signaling_hub.bus.send(SIGNAL_SYNC_CHANNEL, {"op": "test_definition", "test_id": str(test_id)}, conn)
+
+async def invalidate_principal(email: str, conn=None):
+    """Forget a changed user here and tell the other workers to do the same"""
+    principal_cache.invalidate(email)
+    if signaling_hub.bus:
+        await signaling_hub.bus.send(SIGNAL_SYNC_CHANNEL, {"op": "principal", "email": email}, conn)
+
+MONITORED_INVITES_QUERY = """
+    SELECT ti.id, ti.test_id, t.title as test_title, ti.applicant_email, ti.applicant_name,
+           ti.scheduled_date, ti.status, ti.started_at, ti.created_at,
+           s.status as session_status, s.created_at as session_created_at
+    FROM test_invites ti
+    JOIN tests t ON t.id = ti.test_id
+    LEFT JOIN active_webrtc_sessions s ON s.invite_id = ti.id
+    WHERE ti.status = 'in_progress'
+"""
+
+def monitored_invite(row) -> Dict[str, Any]:
+    return {
+        "id": str(row['id']),
+        "test_id": str(row['test_id']),
+        "test_title": row['test_title'],
+        "applicant_email": row['applicant_email'],
+        "applicant_name": row['applicant_name'],
+        "status": row['status'],
+        "scheduled_date": row['scheduled_date'].isoformat() if row['scheduled_date'] else None,
+        "started_at": row['started_at'].isoformat() if row['started_at'] else None,
+        "created_at": row['created_at'].isoformat() if row['created_at'] else None,
+        "session_status": row['session_status'] or 'not_started',
+        "session_created_at": row['session_created_at'].isoformat() if row['session_created_at'] else None
+    }
+
+class MonitoringFeed:
+    """Pushes changes of the in-progress invites to the open monitoring streams.
+
+    Handlers call invite_changed() once their change is committed. The event
+    goes to the streams on this worker and, over the signaling bus, to the
+    streams on the other workers.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.stats = {"published": 0, "delivered": 0, "resyncs": 0}
+
+    @asynccontextmanager
+    async def subscribe(self):
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers.discard(queue)
+
+    def deliver(self, event: Dict[str, Any]):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # A stream this far behind drops its backlog and starts over from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"event": "resync"})
+                self.stats["resyncs"] += 1
+
+    async def publish(self, event: Dict[str, Any], conn=None):
+        self.deliver(event)
+        self.stats["published"] += 1
+        if signaling_hub.bus:
+            await signaling_hub.bus.send(SIGNAL_SYNC_CHANNEL, {
+                "op": "monitoring", "invite_id": event["invite"]["id"], "event": event}, conn)
+
+    async def invite_changed(self, conn, invite_uuid: uuid.UUID):
+        """Publish the current row of an invite, or its removal once it is no longer in progress"""
+        try:
+            row = await conn.fetchrow(MONITORED_INVITES_QUERY + " AND ti.id = $1", invite_uuid)
+            if row:
+                await self.publish({"event": "upsert", "invite": monitored_invite(row)}, conn)
+            else:
+                await self.publish({"event": "remove", "invite": {"id": str(invite_uuid)}}, conn)
+        except Exception as e:
+            print(f"Failed to publish monitoring update: {str(e)}")
+
+    async def invites_removed(self, invite_ids, conn=None):
+        try:
+            for invite_id in invite_ids:
+                await self.publish({"event": "remove", "invite": {"id": str(invite_id)}}, conn)
+        except Exception as e:
+            print(f"Failed to publish monitoring update: {str(e)}")
+
+    def metrics(self):
+        return {**self.stats, "streams": len(self.subscribers)}
+
+monitoring_feed = MonitoringFeed(MONITORING_STREAM_QUEUE_SIZE)
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def monitoring_snapshot_event() -> str:
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch(MONITORED_INVITES_QUERY + " ORDER BY ti.started_at")
+    return sse_event("snapshot", {"invites": [monitored_invite(row) for row in rows]})
+
+async def record_webrtc_session_state(conn, invite_uuid: uuid.UUID, signal: Dict[str, Any]):
+    """Session bookkeeping for the two signals that change it: offer and answer"""
+    if signal["type"] == 'offer':
+        await conn.execute("""
+            INSERT INTO active_webrtc_sessions (invite_id, admin_offer_id, status, created_at, last_heartbeat_at)
+            VALUES ($1, $2, 'offer_sent', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ON CONFLICT (invite_id) DO UPDATE SET
+            admin_offer_id = EXCLUDED.admin_offer_id,
+            status = EXCLUDED.status,
+            created_at = CURRENT_TIMESTAMP,
+            last_heartbeat_at = CURRENT_TIMESTAMP
+        """, invite_uuid, uuid.UUID(signal["id"]))
+    elif signal["type"] == 'answer':
+        await conn.execute("""
+            UPDATE active_webrtc_sessions
+            SET applicant_answer_id = $1, status = 'connected'
+            WHERE invite_id = $2
+        """, uuid.UUID(signal["id"]), invite_uuid)
+        # Update any existing submission to mark it as monitored
+        await conn.execute("""
+            UPDATE test_submissions SET is_monitored = true WHERE invite_id = $1
+        """, invite_uuid)
+
+async def store_webrtc_signals(invite_uuid: uuid.UUID, signals: List[Dict[str, Any]], sender: WebSocket = None):
+    """Store signals, record session state changes and relay them to every peer.
+
+    Only offers and answers touch the database, unless the store itself lives
+    in Postgres.
+    """
+    invite_key = str(invite_uuid)
+    heartbeat_buffer.touch(invite_uuid)
+    if signal_store.shared or any(signal["type"] in ('offer', 'answer') for signal in signals):
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                await signal_store.add(invite_key, signals, conn)
+                for signal in signals:
+                    await record_webrtc_session_state(conn, invite_uuid, signal)
+            await relay_webrtc_signals(invite_key, signals, sender, conn)
+            if any(signal["type"] in ('offer', 'answer') for signal in signals):
+                await monitoring_feed.invite_changed(conn, invite_uuid)
+    else:
+        await signal_store.add(invite_key, signals)
+        await relay_webrtc_signals(invite_key, signals, sender)
+
+async def relay_webrtc_signals(invite_key: str, signals: List[Dict[str, Any]], sender: WebSocket = None, conn=None):
+    if len(signals) == 1:
+        await signaling_hub.publish(invite_key, signals[0], sender, conn)
+    else:
+        await signaling_hub.publish_batch(invite_key, signals, conn)
+
 # Create the app with lifespan management
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    outbox_task = asyncio.create_task(email_outbox_worker())
+    maintenance_task = asyncio.create_task(webrtc_signal_maintenance_worker())
+    heartbeat_task = asyncio.create_task(webrtc_heartbeat_worker())
+    if WEBRTC_NOTIFY:
+        try:
+            await signaling_bus.start()
+        except Exception as e:
+            # Signaling still works within this worker, just not across workers
+            print(f"Signaling fan-out disabled: {e}")
     yield
     # Shutdown
+    await signaling_bus.stop()
+    for task in (outbox_task, maintenance_task, heartbeat_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    try:
+        await heartbeat_buffer.flush()
+    except Exception as e:
+        print(f"Failed to write pending heartbeats: {e}")
+    await asyncio.to_thread(smtp_pool.close_all)
     await close_db()
+    password_hash_executor.shutdown(wait=False)
 
 # Create the main app
 app = FastAPI(title="Pre-Interview Test Platform", lifespan=lifespan)
@@ -497,26 +2629,33 @@ async def register(user_create: UserCreate):
                     status_code=403, 
                     detail="Admin registration is not allowed. Only applicants can register when admins already exist."
                 )
-        
-        # Create user
-        user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_create.password)
-        
-        row = await conn.fetchrow("""
-            INSERT INTO users (id, email, password, full_name, role)
-            VALUES ($1, $2, $3, $4, $5)
-            RETURNING id, email, full_name, role, created_at, is_active
-        """, uuid.UUID(user_id), user_create.email, hashed_password, 
-            user_create.full_name, user_create.role)
-        
-        return User(
-            id=str(row['id']),
-            email=row['email'],
-            full_name=row['full_name'],
-            role=row['role'],
-            created_at=row['created_at'],
-            is_active=row['is_active']
-        )
+    
+    # Hash between the checks and the insert, holding no pool connection: bcrypt takes far
+    # longer than the queries, and rejected requests never reach it
+    hashed_password = await get_password_hash(user_create.password)
+    
+    # Create user
+    user_id = str(uuid.uuid4())
+    async with db_pool.acquire() as conn:
+        try:
+            row = await conn.fetchrow("""
+                INSERT INTO users (id, email, password, full_name, role)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING id, email, full_name, role, created_at, is_active
+            """, uuid.UUID(user_id), user_create.email, hashed_password, 
+                user_create.full_name, user_create.role)
+        except asyncpg.UniqueViolationError:
+            # Registered by a concurrent request while hashing
+            raise HTTPException(status_code=400, detail="Email already registered")
+    
+    return User(
+        id=str(row['id']),
+        email=row['email'],
+        full_name=row['full_name'],
+        role=row['role'],
+        created_at=row['created_at'],
+        is_active=row['is_active']
+    )
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_login: UserLogin):
@@ -525,29 +2664,40 @@ async def login(user_login: UserLogin):
             "SELECT id, email, password, full_name, role, created_at, is_active FROM users WHERE email = $1",
             user_login.email
         )
-        
-        if not user or not verify_password(user_login.password, user['password']):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user['email']}, expires_delta=access_token_expires
-        )
-        
-        user_obj = User(
-            id=str(user['id']),
-            email=user['email'],
-            full_name=user['full_name'],
-            role=user['role'],
-            created_at=user['created_at'],
-            is_active=user['is_active']
+    
+    # Verify without holding a pooled connection while bcrypt runs
+    if not user or not await verify_password(user_login.password, user['password']):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        
-        return Token(access_token=access_token, token_type="bearer", user=user_obj)
+    
+    # Transparently upgrade hashes made with an old cost factor
+    if password_needs_rehash(user['password']):
+        new_hash = await get_password_hash(user_login.password)
+        async with db_pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE users SET password = $1 WHERE id = $2",
+                new_hash, user['id']
+            )
+        password_hash_stats["rehashed"] += 1
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data=principal_claims(user), expires_delta=access_token_expires
+    )
+    
+    user_obj = User(
+        id=str(user['id']),
+        email=user['email'],
+        full_name=user['full_name'],
+        role=user['role'],
+        created_at=user['created_at'],
+        is_active=user['is_active']
+    )
+    
+    return Token(access_token=access_token, token_type="bearer", user=user_obj)
 
 @api_router.get("/auth/me", response_model=User)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
@@ -557,38 +2707,19 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @api_router.post("/tests", response_model=Test)
 async def create_test(test_create: TestCreate, admin: User = Depends(get_admin_user)):
     async with db_pool.acquire() as conn:
-        test_id = str(uuid.uuid4())
-        
-        # Insert test
-        test_row = await conn.fetchrow("""
-            INSERT INTO tests (id, title, description, duration_minutes, created_by)
-            VALUES ($1, $2, $3, $4, $5)
-            RETURNING id, title, description, duration_minutes, created_by, created_at, is_active
-        """, uuid.UUID(test_id), test_create.title, test_create.description,
-            test_create.duration_minutes, uuid.UUID(admin.id))
-        
-        # Insert questions
-        questions = []
-        for i, q in enumerate(test_create.questions):
-            question_id = str(uuid.uuid4())
-            options_json = json.dumps(q.options) if q.options else None
+        async with conn.transaction():
+            test_id = uuid.uuid4()
             
-            await conn.execute("""
-                INSERT INTO questions (id, test_id, type, question, options, correct_answer,
-                                     expected_language, points, question_order)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-            """, uuid.UUID(question_id), uuid.UUID(test_id), q.type, q.question,
-                options_json, q.correct_answer, q.expected_language, q.points, i)
+            # Insert test
+            test_row = await conn.fetchrow("""
+                INSERT INTO tests (id, title, description, duration_minutes, created_by)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING id, title, description, duration_minutes, created_by, created_at, is_active
+            """, test_id, test_create.title, test_create.description,
+                test_create.duration_minutes, uuid.UUID(admin.id))
             
-            questions.append(Question(
-                id=question_id,
-                type=q.type,
-                question=q.question,
-                options=q.options,
-                correct_answer=q.correct_answer,
-                expected_language=q.expected_language,
-                points=q.points
-            ))
+            # Insert questions
+            questions = await insert_test_questions(conn, test_id, test_create.questions)
         
         return Test(
             id=str(test_row['id']),
@@ -602,90 +2733,176 @@ async def create_test(test_create: TestCreate, admin: User = Depends(get_admin_u
         )
 
 @api_router.get("/tests", response_model=List[Test])
-async def get_tests(admin: User = Depends(get_admin_user)):
+async def get_tests(
+    admin: User = Depends(get_admin_user),
+    page: Optional[int] = None,
+    limit: Optional[int] = None,
+    include_questions: bool = True
+):
+    """Get active tests, optionally paginated; include_questions=false returns summaries only"""
     async with db_pool.acquire() as conn:
-        # Get all active tests
-        test_rows = await conn.fetch(
-            "SELECT id, title, description, duration_minutes, created_by, created_at, is_active "
-            "FROM tests WHERE is_active = true ORDER BY created_at DESC"
-        )
-        
-        tests = []
-        for test_row in test_rows:
-            # Get questions for each test
-            question_rows = await conn.fetch("""
-                SELECT id, type, question, options, correct_answer, expected_language, points
-                FROM questions WHERE test_id = $1 ORDER BY question_order
-            """, test_row['id'])
-            
-            questions = []
-            for q_row in question_rows:
-                options = json.loads(q_row['options']) if q_row['options'] else None
-                questions.append(Question(
-                    id=str(q_row['id']),
-                    type=q_row['type'],
-                    question=q_row['question'],
-                    options=options,
-                    correct_answer=q_row['correct_answer'],
-                    expected_language=q_row['expected_language'],
-                    points=q_row['points']
-                ))
-            
-            tests.append(Test(
-                id=str(test_row['id']),
-                title=test_row['title'],
-                description=test_row['description'],
-                questions=questions,
-                duration_minutes=test_row['duration_minutes'],
-                created_by=str(test_row['created_by']),
-                created_at=test_row['created_at'],
-                is_active=test_row['is_active']
-            ))
-        
-        return tests
+        params = []
+        pagination_clause = ""
+        if limit is not None:
+            limit = max(1, limit)
+            offset = (max(1, page or 1) - 1) * limit
+            pagination_clause = "LIMIT $1 OFFSET $2"
+            params.extend([limit, offset])
+        
+        # Get active tests (with question counts for summary mode)
+        test_rows = await conn.fetch(f"""
+            SELECT t.id, t.title, t.description, t.duration_minutes, t.created_by, t.created_at, t.is_active,
+                   (SELECT COUNT(*) FROM questions q WHERE q.test_id = t.id) as question_count
+            FROM tests t WHERE t.is_active = true
+            ORDER BY t.created_at DESC
+            {pagination_clause}
+        """, *params)
+        
+        # Fetch questions for every listed test in one query instead of one per test
+        questions_by_test = {}
+        if include_questions and test_rows:
+            questions_by_test = await fetch_questions_for_tests(conn, [row['id'] for row in test_rows])
+        
+        return [Test(
+            id=str(test_row['id']),
+            title=test_row['title'],
+            description=test_row['description'],
+            questions=questions_by_test.get(test_row['id'], []),
+            question_count=test_row['question_count'],
+            duration_minutes=test_row['duration_minutes'],
+            created_by=str(test_row['created_by']),
+            created_at=test_row['created_at'],
+            is_active=test_row['is_active']
+        ) for test_row in test_rows]
 
 @api_router.get("/tests/{test_id}", response_model=Test)
 async def get_test(test_id: str, admin: User = Depends(get_admin_user)):
     async with db_pool.acquire() as conn:
-        test_row = await conn.fetchrow(
-            "SELECT id, title, description, duration_minutes, created_by, created_at, is_active "
-            "FROM tests WHERE id = $1 AND is_active = true",
-            uuid.UUID(test_id)
-        )
+        compiled = await test_cache.get(conn, uuid.UUID(test_id))
         
-        if not test_row:
+        if not compiled or not compiled['test']['is_active']:
             raise HTTPException(status_code=404, detail="Test not found")
         
-        # Get questions
-        question_rows = await conn.fetch("""
-            SELECT id, type, question, options, correct_answer, expected_language, points
-            FROM questions WHERE test_id = $1 ORDER BY question_order
-        """, test_row['id'])
-        
-        questions = []
-        for q_row in question_rows:
-            options = json.loads(q_row['options']) if q_row['options'] else None
-            questions.append(Question(
-                id=str(q_row['id']),
-                type=q_row['type'],
-                question=q_row['question'],
-                options=options,
-                correct_answer=q_row['correct_answer'],
-                expected_language=q_row['expected_language'],
-                points=q_row['points']
-            ))
-        
+        test_row = compiled['test']
         return Test(
             id=str(test_row['id']),
             title=test_row['title'],
             description=test_row['description'],
-            questions=questions,
+            questions=compiled['questions'],
             duration_minutes=test_row['duration_minutes'],
             created_by=str(test_row['created_by']),
             created_at=test_row['created_at'],
             is_active=test_row['is_active']
         )
 
+@api_router.get("/tests/{test_id}/stats")
+async def get_test_stats(
+    test_id: str,
+    pass_score: int = TEST_PASS_SCORE,
+    admin: User = Depends(get_admin_user)
+):
+    """Score statistics for one test, read from the test_statistics row.
+
+    The cost does not grow with the number of submissions. Median and p90
+    come from the whole-percent histogram, so they are accurate to within
+    a point; the pass rate counts final scores >= pass_score exactly.
+    """
+    if not 0 <= pass_score <= 100:
+        raise HTTPException(status_code=400, detail="pass_score must be between 0 and 100")
+    try:
+        test_uuid = uuid.UUID(test_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid test ID format")
+
+    async with db_pool.acquire() as conn:
+        row = await conn.fetchrow("""
+            SELECT t.id, t.title, s.submission_count, s.score_sum, s.score_sum_squares,
+                   s.score_histogram, s.updated_at
+            FROM tests t
+            LEFT JOIN test_statistics s ON s.test_id = t.id
+            WHERE t.id = $1
+        """, test_uuid)
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Test not found")
+
+    count = row['submission_count'] or 0
+    stats = {
+        "test_id": str(row['id']),
+        "title": row['title'],
+        "submissions": count,
+        "pass_score": pass_score,
+        "passed": 0,
+        "pass_rate": None,
+        "mean": None,
+        "stddev": None,
+        "median": None,
+        "p90": None,
+        "updated_at": row['updated_at'].isoformat() if row['updated_at'] else None
+    }
+    if count > 0:
+        histogram = row['score_histogram']
+        mean = row['score_sum'] / count
+        variance = max(0.0, row['score_sum_squares'] / count - mean * mean)
+        passed = sum(histogram[pass_score:])
+        stats.update({
+            "passed": passed,
+            "pass_rate": round(passed / count * 100, 2),
+            "mean": round(mean, 2),
+            "stddev": round(math.sqrt(variance), 2),
+            "median": round(histogram_percentile(histogram, count, 0.5), 2),
+            "p90": round(histogram_percentile(histogram, count, 0.9), 2)
+        })
+    return stats
+
+@api_router.get("/tests/{test_id}/item-analysis")
+async def get_item_analysis(test_id: str, admin: User = Depends(get_admin_user)):
+    """Difficulty, discrimination and option frequencies for each multiple choice question.
+
+    The analysis is computed with NumPy over all of the test's answers and
+    reused until the test's questions, submissions or scores change.
+    """
+    if not NUMPY_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Item analysis is not available. Please install numpy: pip install numpy==1.26.2"
+        )
+    try:
+        test_uuid = uuid.UUID(test_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid test ID format")
+
+    async with db_pool.acquire() as conn:
+        compiled = await test_cache.get(conn, test_uuid)
+        if not compiled:
+            raise HTTPException(status_code=404, detail="Test not found")
+
+        items = [q for q in compiled['questions'] if q.type == 'multiple_choice' and q.options]
+        # test_statistics changes with every submission and score change, so it versions the analysis
+        statistics_row = await conn.fetchrow(
+            "SELECT submission_count, updated_at FROM test_statistics WHERE test_id = $1", test_uuid
+        )
+        submissions = statistics_row['submission_count'] if statistics_row else 0
+        version = (
+            compiled['version'],
+            submissions,
+            statistics_row['updated_at'] if statistics_row else None
+        )
+        cached = item_analysis_cache.get(test_uuid, version)
+        if cached is not None:
+            return cached
+
+        item_positions, choices, scores = await load_item_responses(conn, test_uuid, items)
+
+    analysis = {
+        "test_id": str(test_uuid),
+        "submissions": submissions,
+        "answers_analyzed": int(len(choices)),
+        "items": analyze_items(items, item_positions, choices, scores)
+    }
+    item_analysis_cache.put(test_uuid, version, analysis)
+    return analysis
+
 @api_router.post("/tests/auto-generate")
 async def auto_generate_test(data: AutoGenerateTest, admin: User = Depends(get_admin_user)):
     """Auto generate a test using Gemini AI"""
@@ -929,6 +3146,52 @@ Return ONLY the JSON object, no additional text or formatting.
                 detail=f"AI generated {len(test_data['questions'])} questions, expected {data.questionCount}"
             )
         
+        # Validate questions before touching the database
+        questions = []
+        for i, question_data in enumerate(test_data['questions']):
+            # Validate question structure based on type
+            if question_data['type'] == 'multiple_choice':
+                if not all(key in question_data for key in ['type', 'question', 'options', 'correct_answer', 'points']):
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Question {i+1} missing required fields for multiple choice"
+                    )
+                
+                if question_data['correct_answer'] not in question_data['options']:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Question {i+1}: correct_answer must be one of the options"
+                    )
+                
+                questions.append(Question(
+                    type=question_data['type'],
+                    question=question_data['question'],
+                    options=question_data['options'],
+                    correct_answer=question_data['correct_answer'],
+                    points=question_data['points']
+                ))
+            
+            elif question_data['type'] == 'coding':
+                if not all(key in question_data for key in ['type', 'question', 'correct_answer', 'expected_language', 'points']):
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Question {i+1} missing required fields for coding question"
+                    )
+                
+                questions.append(Question(
+                    type=question_data['type'],
+                    question=question_data['question'],
+                    correct_answer=question_data['correct_answer'],
+                    expected_language=question_data['expected_language'],
+                    points=question_data['points']
+                ))
+            
+            else:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Question {i+1}: unsupported question type '{question_data['type']}'"
+                )
+        
         # Create the test in database
         async with db_pool.acquire() as conn:
             async with conn.transaction():
@@ -942,51 +3205,7 @@ Return ONLY the JSON object, no additional text or formatting.
                     datetime.now(timezone.utc), True)
                 
                 # Insert questions
-                for i, question_data in enumerate(test_data['questions']):
-                    question_id = uuid.uuid4()
-                    
-                    # Validate question structure based on type
-                    if question_data['type'] == 'multiple_choice':
-                        if not all(key in question_data for key in ['type', 'question', 'options', 'correct_answer', 'points']):
-                            raise HTTPException(
-                                status_code=500,
-                                detail=f"Question {i+1} missing required fields for multiple choice"
-                            )
-                        
-                        if question_data['correct_answer'] not in question_data['options']:
-                            raise HTTPException(
-                                status_code=500,
-                                detail=f"Question {i+1}: correct_answer must be one of the options"
-                            )
-                        
-                        await conn.execute("""
-                            INSERT INTO questions (id, test_id, type, question, options, correct_answer, 
-                                                 expected_language, points, question_order)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                        """, question_id, test_id, question_data['type'], question_data['question'],
-                            json.dumps(question_data['options']), question_data['correct_answer'],
-                            None, question_data['points'], i + 1)
-                    
-                    elif question_data['type'] == 'coding':
-                        if not all(key in question_data for key in ['type', 'question', 'correct_answer', 'expected_language', 'points']):
-                            raise HTTPException(
-                                status_code=500,
-                                detail=f"Question {i+1} missing required fields for coding question"
-                            )
-                        
-                        await conn.execute("""
-                            INSERT INTO questions (id, test_id, type, question, options, correct_answer, 
-                                                 expected_language, points, question_order)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                        """, question_id, test_id, question_data['type'], question_data['question'],
-                            None, question_data['correct_answer'],
-                            question_data['expected_language'], question_data['points'], i + 1)
-                    
-                    else:
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Question {i+1}: unsupported question type '{question_data['type']}'"
-                        )
+                await insert_test_questions(conn, test_id, questions)
         
         return {
             "success": True,
@@ -1039,8 +3258,10 @@ async def delete_test(test_id: str, admin: User = Depends(get_admin_user)):
 
         # Soft delete by setting is_active to false
         await conn.execute("""
-            UPDATE tests SET is_active = false WHERE id = $1
+            UPDATE tests SET is_active = false, definition_version = definition_version + 1
+            WHERE id = $1
         """, uuid.UUID(test_id))
+        await invalidate_test_definition(test_id, conn)
 
         return {"message": f"Test '{test['title']}' has been deleted successfully"}
 
@@ -1066,7 +3287,17 @@ async def force_delete_test(test_id: str, admin: User = Depends(get_admin_user))
 
             # Delete in proper order to handle foreign key constraints
             
-            # 1. Delete test answers for submissions related to this test
+            # 1. Delete WebRTC sessions for invites of this test. Sessions go before
+            # submissions, the order the heartbeat reaper locks them in
+            await conn.execute("""
+                DELETE FROM active_webrtc_sessions 
+                WHERE invite_id IN (
+                    SELECT id FROM test_invites 
+                    WHERE test_id = $1
+                )
+            """, uuid.UUID(test_id))
+
+            # 2. Delete test answers for submissions related to this test
             await conn.execute("""
                 DELETE FROM test_answers 
                 WHERE submission_id IN (
@@ -1075,21 +3306,12 @@ async def force_delete_test(test_id: str, admin: User = Depends(get_admin_user))
                 )
             """, uuid.UUID(test_id))
 
-            # 2. Delete test submissions
+            # 3. Delete test submissions
             await conn.execute("""
                 DELETE FROM test_submissions 
                 WHERE test_id = $1
             """, uuid.UUID(test_id))
 
-            # 3. Delete WebRTC sessions for invites of this test
-            await conn.execute("""
-                DELETE FROM active_webrtc_sessions 
-                WHERE invite_id IN (
-                    SELECT id FROM test_invites 
-                    WHERE test_id = $1
-                )
-            """, uuid.UUID(test_id))
-
             # 4. Get count of invites before deleting
             deleted_invites_count = await conn.fetchval("""
                 SELECT COUNT(*) FROM test_invites WHERE test_id = $1
@@ -1110,11 +3332,14 @@ async def force_delete_test(test_id: str, admin: User = Depends(get_admin_user))
                 DELETE FROM tests WHERE id = $1
             """, uuid.UUID(test_id))
 
-            return {
-                "message": f"Test '{test['title']}' and all associated data have been force deleted successfully",
-                "deleted_invites": deleted_invites_count or 0,
-                "force_deleted": True
-            }
+        await invalidate_test_definition(test_id, conn)
+        await monitoring_feed.invites_removed([row['id'] for row in invites], conn)
+
+        return {
+            "message": f"Test '{test['title']}' and all associated data have been force deleted successfully",
+            "deleted_invites": deleted_invites_count or 0,
+            "force_deleted": True
+        }
 
 @api_router.put("/tests/{test_id}", response_model=Test)
 async def update_test(test_id: str, test_update: TestCreate, admin: User = Depends(get_admin_user)):
@@ -1141,60 +3366,21 @@ async def update_test(test_id: str, test_update: TestCreate, admin: User = Depen
                 detail="Cannot update test while someone is currently taking it. Please wait for all active test sessions to complete."
             )
         
-        # Update the test
-        updated_test = await conn.fetchrow("""
-            UPDATE tests 
-            SET title = $2, description = $3, duration_minutes = $4
-            WHERE id = $1
-            RETURNING id, title, description, duration_minutes, created_by, created_at, is_active
-        """, uuid.UUID(test_id), test_update.title, test_update.description, test_update.duration_minutes)
-        
-        # Delete existing questions for this test
-        await conn.execute("DELETE FROM questions WHERE test_id = $1", uuid.UUID(test_id))
-        
-        # Insert updated questions
-        for question in test_update.questions:
-            # Convert options list to JSON string if it's a list
-            options_json = None
-            if question.options:
-                if isinstance(question.options, list):
-                    options_json = json.dumps(question.options)
-                else:
-                    options_json = question.options
+        async with conn.transaction():
+            # Update the test
+            updated_test = await conn.fetchrow("""
+                UPDATE tests 
+                SET title = $2, description = $3, duration_minutes = $4,
+                    definition_version = definition_version + 1
+                WHERE id = $1
+                RETURNING id, title, description, duration_minutes, created_by, created_at, is_active
+            """, uuid.UUID(test_id), test_update.title, test_update.description, test_update.duration_minutes)
             
-            question_id = await conn.fetchval("""
-                INSERT INTO questions (test_id, type, question, options, correct_answer, expected_language, points)
-                VALUES ($1, $2, $3, $4, $5, $6, $7)
-                RETURNING id
-            """, 
-            uuid.UUID(test_id),
-            question.type,
-            question.question,
-            options_json,
-            question.correct_answer,
-            question.expected_language,
-            question.points
-            )
+            # Replace existing questions for this test
+            await conn.execute("DELETE FROM questions WHERE test_id = $1", uuid.UUID(test_id))
+            questions = await insert_test_questions(conn, uuid.UUID(test_id), test_update.questions)
         
-        # Fetch updated questions
-        questions_rows = await conn.fetch("""
-            SELECT id, type, question, options, correct_answer, expected_language, points
-            FROM questions
-            WHERE test_id = $1
-            ORDER BY id
-        """, uuid.UUID(test_id))
-        
-        questions = [
-            Question(
-                id=str(row['id']),
-                type=row['type'],
-                question=row['question'],
-                options=json.loads(row['options']) if row['options'] else None,
-                correct_answer=row['correct_answer'],
-                expected_language=row['expected_language'],
-                points=row['points']
-            ) for row in questions_rows
-        ]
+        await invalidate_test_definition(test_id, conn)
         
         return Test(
             id=str(updated_test['id']),
@@ -1210,6 +3396,7 @@ async def update_test(test_id: str, test_update: TestCreate, admin: User = Depen
 # Test Invitation Routes
 @api_router.post("/invites", response_model=TestInvite)
 async def send_test_invite(invite_create: TestInviteCreate, request: Request, admin: User = Depends(get_admin_user)):
+    branding = await get_email_branding(admin.id)
     async with db_pool.acquire() as conn:
         # Check if test exists
         test = await conn.fetchrow(
@@ -1222,63 +3409,229 @@ async def send_test_invite(invite_create: TestInviteCreate, request: Request, ad
         invite_id = str(uuid.uuid4())
         invite_token = str(uuid.uuid4())
         
-        # Insert invite
-        invite_row = await conn.fetchrow("""
-            INSERT INTO test_invites (id, test_id, applicant_email, applicant_name,
-                                    invited_by, invite_token, scheduled_date, admin_scheduled, no_schedule, status)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-            RETURNING id, test_id, applicant_email, applicant_name, invited_by,
-                      invite_token, scheduled_date, admin_scheduled, no_schedule, status, created_at
-        """, uuid.UUID(invite_id), uuid.UUID(invite_create.test_id),
-            invite_create.applicant_email, invite_create.applicant_name,
-            uuid.UUID(admin.id), uuid.UUID(invite_token), 
-            invite_create.scheduled_date, invite_create.admin_scheduled, invite_create.no_schedule,
-            "scheduled" if invite_create.admin_scheduled and invite_create.scheduled_date else "sent")
-        
-        # Send email
+        # Build email
         domain = get_domain_from_request(request)
         invite_url = domain  # Just send the domain, user will go to login page
-        email_body = create_invite_email_template(
+        email_body, email_text = render_invite_email(
             applicant_name=invite_create.applicant_name,
             test_title=test['title'],
             invite_url=invite_url,
-            company_name="Interview Team",
+            branding=branding,
             scheduled_date=invite_create.scheduled_date,
             admin_scheduled=invite_create.admin_scheduled,
             no_schedule=invite_create.no_schedule
         )
         
-        # Try to send email, but don't fail the invite creation if email fails
-        email_sent = await send_email(invite_create.applicant_email, f"Test Invitation: {test['title']}", email_body, admin.id)
-        
-        # Update invite with email status
-        await conn.execute("""
-            UPDATE test_invites 
-            SET email_sent = $1, email_sent_at = $2
-            WHERE id = $3
-        """, email_sent, datetime.now(timezone.utc) if email_sent else None, uuid.UUID(invite_id))
-        
-        # Fetch the updated invite with email status
-        updated_invite = await conn.fetchrow("""
-            SELECT id, test_id, applicant_email, applicant_name, invited_by,
-                   invite_token, scheduled_date, status, email_sent, email_sent_at, email_error, created_at
-            FROM test_invites WHERE id = $1
-        """, uuid.UUID(invite_id))
+        async with conn.transaction():
+            # Insert invite
+            invite_row = await conn.fetchrow("""
+                INSERT INTO test_invites (id, test_id, applicant_email, applicant_name,
+                                        invited_by, invite_token, scheduled_date, admin_scheduled, no_schedule, status)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                RETURNING id, test_id, applicant_email, applicant_name, invited_by,
+                          invite_token, scheduled_date, status, email_sent, email_sent_at, email_error, created_at
+            """, uuid.UUID(invite_id), uuid.UUID(invite_create.test_id),
+                invite_create.applicant_email, invite_create.applicant_name,
+                uuid.UUID(admin.id), uuid.UUID(invite_token), 
+                invite_create.scheduled_date, invite_create.admin_scheduled, invite_create.no_schedule,
+                "scheduled" if invite_create.admin_scheduled and invite_create.scheduled_date else "sent")
+            
+            # Queue the email; the outbox worker records delivery on the invite
+            await enqueue_email(conn, invite_create.applicant_email, f"Test Invitation: {test['title']}",
+                                email_body, admin.id, invite_row['id'], email_text)
         
         return TestInvite(
-            id=str(updated_invite['id']),
-            test_id=str(updated_invite['test_id']),
-            applicant_email=updated_invite['applicant_email'],
-            applicant_name=updated_invite['applicant_name'],
-            invited_by=str(updated_invite['invited_by']),
-            invite_token=str(updated_invite['invite_token']),
-            scheduled_date=updated_invite['scheduled_date'],
-            status=updated_invite['status'],
-            email_sent=updated_invite['email_sent'],
-            email_sent_at=updated_invite['email_sent_at'],
-            email_error=updated_invite['email_error'],
-            created_at=updated_invite['created_at']
+            id=str(invite_row['id']),
+            test_id=str(invite_row['test_id']),
+            applicant_email=invite_row['applicant_email'],
+            applicant_name=invite_row['applicant_name'],
+            invited_by=str(invite_row['invited_by']),
+            invite_token=str(invite_row['invite_token']),
+            scheduled_date=invite_row['scheduled_date'],
+            status=invite_row['status'],
+            email_sent=invite_row['email_sent'],
+            email_sent_at=invite_row['email_sent_at'],
+            email_error=invite_row['email_error'],
+            email_queued=True,
+            created_at=invite_row['created_at']
+        )
+
+def parse_bulk_invite_csv(content: bytes) -> List[Dict[str, Any]]:
+    """Read applicant rows from an uploaded CSV (email and name columns, header optional)"""
+    text = content.decode('utf-8-sig')
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return []
+    
+    header = [cell.strip().lower() for cell in rows[0]]
+    email_col = next((i for i, h in enumerate(header) if h in ('applicant_email', 'email')), None)
+    name_col = next((i for i, h in enumerate(header) if h in ('applicant_name', 'name')), None)
+    if email_col is None:
+        # No header row: first column is the email, second the name
+        email_col, name_col = 0, 1
+    else:
+        rows = rows[1:]
+    
+    applicants = []
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        applicants.append({
+            "applicant_email": row[email_col].strip() if email_col < len(row) else "",
+            "applicant_name": row[name_col].strip() if name_col is not None and name_col < len(row) else ""
+        })
+    return applicants
+
+async def read_bulk_invite_request(request: Request) -> BulkInviteCreate:
+    """Accept either a JSON body or a multipart CSV upload for bulk invites"""
+    content_type = request.headers.get('content-type', '')
+    try:
+        if content_type.startswith('multipart/form-data'):
+            form = await request.form()
+            upload = form.get('file')
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=400, detail="CSV file is required")
+            return BulkInviteCreate(
+                test_id=form.get('test_id') or '',
+                applicants=parse_bulk_invite_csv(await upload.read()),
+                scheduled_date=form.get('scheduled_date') or None,
+                admin_scheduled=(form.get('admin_scheduled') or 'false').lower() == 'true',
+                no_schedule=(form.get('no_schedule') or 'false').lower() == 'true'
+            )
+        return BulkInviteCreate(**await request.json())
+    except HTTPException:
+        raise
+    except (ValueError, TypeError) as e:
+        # Covers malformed JSON/CSV and pydantic validation errors
+        raise HTTPException(status_code=400, detail=f"Invalid bulk invite request: {e}")
+
+@api_router.post("/invites/bulk", response_model=BulkInviteReport)
+async def send_bulk_invites(request: Request, admin: User = Depends(get_admin_user)):
+    """Invite many applicants to one test from a JSON list or CSV upload"""
+    bulk = await read_bulk_invite_request(request)
+    if not bulk.applicants:
+        raise HTTPException(status_code=400, detail="No applicants provided")
+    if len(bulk.applicants) > BULK_INVITE_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_INVITE_MAX_ROWS} applicants per request")
+    try:
+        test_uuid = uuid.UUID(bulk.test_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid test_id")
+    
+    # Validate every row up front; bad rows are reported, not fatal
+    results = []
+    candidates = {}
+    for row_number, raw in enumerate(bulk.applicants, start=1):
+        if not isinstance(raw, dict):
+            results.append(BulkInviteRowResult(row=row_number, status="invalid", detail="Row must be an object"))
+            continue
+        raw = {**raw, "applicant_email": raw.get('applicant_email', raw.get('email')),
+               "applicant_name": raw.get('applicant_name', raw.get('name')) or ""}
+        try:
+            applicant = BulkInviteApplicant(**raw)
+        except ValidationError as e:
+            results.append(BulkInviteRowResult(
+                row=row_number,
+                applicant_email=str(raw['applicant_email']) if raw['applicant_email'] else None,
+                status="invalid",
+                detail="; ".join(f"{error['loc'][0]}: {error['msg']}" for error in e.errors())
+            ))
+            continue
+        
+        email_key = applicant.applicant_email.lower()
+        name = applicant.applicant_name.strip() or applicant.applicant_email.split('@')[0]
+        if email_key in candidates:
+            results.append(BulkInviteRowResult(
+                row=row_number, applicant_email=applicant.applicant_email, applicant_name=name,
+                status="duplicate", detail=f"Same email as row {candidates[email_key].row}"
+            ))
+            continue
+        
+        result = BulkInviteRowResult(row=row_number, applicant_email=applicant.applicant_email,
+                                     applicant_name=name, status="invited")
+        candidates[email_key] = result
+        results.append(result)
+    
+    status_value = "scheduled" if bulk.admin_scheduled and bulk.scheduled_date else "sent"
+    domain = get_domain_from_request(request)
+    branding = await get_email_branding(admin.id)
+    
+    async with db_pool.acquire() as conn:
+        test = await conn.fetchrow(
+            "SELECT id, title FROM tests WHERE id = $1 AND is_active = true", test_uuid
         )
+        if not test:
+            raise HTTPException(status_code=404, detail="Test not found")
+        
+        # Render every email before the transaction so it only covers the
+        # duplicate check and the inserts
+        subject = f"Test Invitation: {test['title']}"
+        rendered = {}
+        for email_key, result in candidates.items():
+            rendered[email_key] = render_invite_email(
+                applicant_name=result.applicant_name,
+                test_title=test['title'],
+                invite_url=domain,
+                branding=branding,
+                scheduled_date=bulk.scheduled_date,
+                admin_scheduled=bulk.admin_scheduled,
+                no_schedule=bulk.no_schedule
+            )
+        
+        async with conn.transaction():
+            # Serialize bulk runs for the same test so the duplicate check below
+            # cannot race another request. An advisory lock rather than a row lock
+            # on tests, which would also block submissions and single invites
+            # taking FOR KEY SHARE on the test through their foreign keys.
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1::text))", str(test_uuid))
+            
+            # Applicants that already hold a live invite for this test
+            existing = await conn.fetch("""
+                SELECT LOWER(applicant_email) as email_key, status
+                FROM test_invites
+                WHERE test_id = $1 AND status <> 'expired' AND LOWER(applicant_email) = ANY($2::text[])
+            """, test_uuid, list(candidates.keys()))
+            for row in existing:
+                result = candidates.pop(row['email_key'], None)
+                if result:
+                    result.status = "duplicate"
+                    result.detail = f"Already invited to this test (status: {row['status']})"
+            
+            if candidates:
+                invite_ids = [uuid.uuid4() for _ in candidates]
+                to_invite = list(candidates.values())
+                await conn.execute("""
+                    INSERT INTO test_invites (id, test_id, applicant_email, applicant_name, invited_by,
+                                              invite_token, scheduled_date, admin_scheduled, no_schedule, status)
+                    SELECT r.id, $1, r.applicant_email, r.applicant_name, $2,
+                           uuid_generate_v4(), $3, $4, $5, $6
+                    FROM unnest($7::uuid[], $8::text[], $9::text[]) AS r(id, applicant_email, applicant_name)
+                """, test_uuid, uuid.UUID(admin.id), bulk.scheduled_date, bulk.admin_scheduled,
+                    bulk.no_schedule, status_value, invite_ids,
+                    [result.applicant_email for result in to_invite],
+                    [result.applicant_name for result in to_invite])
+                
+                messages = []
+                for invite_id, (email_key, result) in zip(invite_ids, candidates.items()):
+                    result.invite_id = str(invite_id)
+                    email_body, email_text = rendered[email_key]
+                    messages.append((result.applicant_email, subject, email_body, email_text, invite_id))
+                
+                # The outbox worker drains these in EMAIL_OUTBOX_BATCH_SIZE batches
+                await enqueue_emails(conn, messages, admin.id)
+    
+    invited = sum(1 for result in results if result.status == "invited")
+    duplicates = sum(1 for result in results if result.status == "duplicate")
+    print(f"Bulk invite for test {bulk.test_id}: {invited} invited, {duplicates} duplicates, "
+          f"{len(results) - invited - duplicates} invalid")
+    return BulkInviteReport(
+        test_id=bulk.test_id,
+        total=len(results),
+        invited=invited,
+        duplicates=duplicates,
+        invalid=len(results) - invited - duplicates,
+        results=results
+    )
 
 @api_router.get("/invites", response_model=List[TestInvite])
 async def get_invites(
@@ -1326,7 +3679,11 @@ async def get_invites(
         
         query = f"""
             SELECT id, test_id, applicant_email, applicant_name, invited_by,
-                   invite_token, scheduled_date, status, email_sent, email_sent_at, email_error, created_at
+                   invite_token, scheduled_date, status, email_sent, email_sent_at, email_error, created_at,
+                   EXISTS (
+                       SELECT 1 FROM email_outbox eo
+                       WHERE eo.invite_id = test_invites.id AND eo.status IN ('pending', 'sending')
+                   ) as email_queued
             FROM test_invites
             WHERE {where_clause}
             ORDER BY created_at DESC
@@ -1346,11 +3703,13 @@ async def get_invites(
             email_sent=row['email_sent'],
             email_sent_at=row['email_sent_at'],
             email_error=row['email_error'],
+            email_queued=row['email_queued'],
             created_at=row['created_at']
         ) for row in rows]
 
 @api_router.post("/invites/{invite_id}/retry-email")
 async def retry_invite_email(invite_id: str, request: Request, admin: User = Depends(get_admin_user)):
+    branding = await get_email_branding(admin.id)
     async with db_pool.acquire() as conn:
         # Get invite details
         invite_row = await conn.fetchrow("""
@@ -1363,31 +3722,34 @@ async def retry_invite_email(invite_id: str, request: Request, admin: User = Dep
         if not invite_row:
             raise HTTPException(status_code=404, detail="Invite not found")
         
-        # Send email
-        domain = get_domain_from_request(request)
-        invite_url = f"{domain}/test-invite/{invite_row['invite_token']}"
-        email_body = create_invite_email_template(
-            applicant_name=invite_row['applicant_name'],
-            test_title=invite_row['test_title'],
-            invite_url=invite_url,
-            company_name="Interview Team"
-        )
+        # Don't queue a second copy while one is still waiting to go out
+        already_queued = await conn.fetchval("""
+            SELECT EXISTS (
+                SELECT 1 FROM email_outbox WHERE invite_id = $1 AND status IN ('pending', 'sending')
+            )
+        """, uuid.UUID(invite_id))
         
-        # Try to send email
-        email_sent = await send_email(invite_row['applicant_email'], f"Test Invitation: {invite_row['test_title']}", email_body, admin.id)
+        if not already_queued:
+            domain = get_domain_from_request(request)
+            invite_url = f"{domain}/test-invite/{invite_row['invite_token']}"
+            email_body, email_text = render_invite_email(
+                applicant_name=invite_row['applicant_name'],
+                test_title=invite_row['test_title'],
+                invite_url=invite_url,
+                branding=branding,
+                scheduled_date=invite_row['scheduled_date'],
+                admin_scheduled=invite_row['admin_scheduled'],
+                no_schedule=invite_row['no_schedule']
+            )
+            
+            async with conn.transaction():
+                await enqueue_email(conn, invite_row['applicant_email'], f"Test Invitation: {invite_row['test_title']}",
+                                    email_body, admin.id, uuid.UUID(invite_id), email_text)
+                await conn.execute("""
+                    UPDATE test_invites SET email_error = NULL WHERE id = $1
+                """, uuid.UUID(invite_id))
         
-        # Update invite with email status
-        await conn.execute("""
-            UPDATE test_invites 
-            SET email_sent = $1, email_sent_at = $2, email_error = $3
-            WHERE id = $4
-        """, email_sent, datetime.now(timezone.utc) if email_sent else None, 
-             None if email_sent else "Email sending failed", uuid.UUID(invite_id))
-        
-        if email_sent:
-            return {"message": "Email sent successfully", "email_sent": True}
-        else:
-            return {"message": "Failed to send email", "email_sent": False}
+        return {"message": "Email queued for delivery", "email_sent": False, "email_queued": True}
 
 @api_router.get("/invites/token/{token}")
 async def get_invite_by_token(token: str):
@@ -1401,33 +3763,14 @@ async def get_invite_by_token(token: str):
         if not invite_row:
             raise HTTPException(status_code=404, detail="Invalid invite token")
         
-        test_row = await conn.fetchrow("""
-            SELECT t.id, t.title, t.description, t.duration_minutes,
-                   t.created_by, t.created_at, t.is_active
-            FROM tests t WHERE t.id = $1
-        """, invite_row['test_id'])
+        compiled = await test_cache.get(conn, invite_row['test_id'])
         
-        if not test_row:
+        if not compiled:
             raise HTTPException(status_code=404, detail="Test not found")
         
-        # Get questions
-        question_rows = await conn.fetch("""
-            SELECT id, type, question, options, correct_answer, expected_language, points
-            FROM questions WHERE test_id = $1 ORDER BY question_order
-        """, test_row['id'])
-        
-        questions = []
-        for q_row in question_rows:
-            options = json.loads(q_row['options']) if q_row['options'] else None
-            questions.append(Question(
-                id=str(q_row['id']),
-                type=q_row['type'],
-                question=q_row['question'],
-                options=options,
-                correct_answer=q_row['correct_answer'],
-                expected_language=q_row['expected_language'],
-                points=q_row['points']
-            ))
+        # This endpoint is public, so serve the questions without correct answers
+        test_row = compiled['test']
+        questions = [Question(**q) for q in compiled['candidate_questions']]
         
         return {
             "invite": TestInvite(
@@ -1493,33 +3836,14 @@ async def start_test(token: str):
             if scheduled_time > now + timedelta(minutes=30) or scheduled_time < now - timedelta(minutes=30):
                 raise HTTPException(status_code=400, detail="Test can only be taken within 30 minutes of scheduled time")
 
-        test_row = await conn.fetchrow(
-            "SELECT id, title, description, duration_minutes, created_by, created_at, is_active "
-            "FROM tests WHERE id = $1",
-            invite_row['test_id']
-        )
-
-        if not test_row:
-            raise HTTPException(status_code=404, detail="Test not found")
-
-        # Remove correct answers from questions for security
-        question_rows = await conn.fetch("""
-            SELECT id, type, question, options, correct_answer, expected_language, points
-            FROM questions WHERE test_id = $1 ORDER BY question_order
-        """, test_row['id'])
-
-        questions_for_display = []
-        for q_row in question_rows:
-            options = json.loads(q_row['options']) if q_row['options'] else None
-            question_dict = {
-                "id": str(q_row['id']),
-                "type": q_row['type'],
-                "question": q_row['question'],
-                "options": options,
-                "expected_language": q_row['expected_language'],
-                "points": q_row['points']
-            }
-            questions_for_display.append(question_dict)
+        compiled = await test_cache.get(conn, invite_row['test_id'])
+
+        if not compiled:
+            raise HTTPException(status_code=404, detail="Test not found")
+
+        # Correct answers are already removed from the candidate payload
+        test_row = compiled['test']
+        questions_for_display = compiled['candidate_questions']
 
         # Clean the test object
         test_clean = {
@@ -1610,128 +3934,99 @@ async def start_test_monitoring(token: str):
             "invite_id": str(invite['id']),
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
+        await monitoring_feed.invite_changed(conn, invite['id'])
 
         return {"message": "Test started successfully", "status": "in_progress"}
 
 @api_router.post("/submit-test/{token}")
 async def submit_test(token: str, submission: TestSubmissionCreate):
     async with db_pool.acquire() as conn:
-        # Convert token string to UUID for database query
-        invite_token_uuid = uuid.UUID(token)
-        invite = await conn.fetchrow("""
-            SELECT id, test_id, applicant_email FROM test_invites
-            WHERE invite_token = $1 AND status = 'in_progress'
-        """, invite_token_uuid)
+        async with conn.transaction():
+            # Lock the invite so concurrent submits of the same token can't both succeed;
+            # the monitoring check rides along in the same round trip
+            invite = await conn.fetchrow("""
+                SELECT ti.id, ti.test_id, ti.applicant_email, ti.applicant_name, ti.started_at,
+                       EXISTS (
+                           SELECT 1 FROM active_webrtc_sessions s
+                           WHERE s.invite_id = ti.id AND s.status IN ('connected', 'offer_sent')
+                       ) as is_monitored
+                FROM test_invites ti
+                WHERE ti.invite_token = $1 AND ti.status = 'in_progress'
+                FOR UPDATE
+            """, uuid.UUID(token))
 
-        if not invite:
-            raise HTTPException(status_code=404, detail="Invalid or inactive test session")
+            if not invite:
+                raise HTTPException(status_code=404, detail="Invalid or inactive test session")
 
-        test = await conn.fetchrow(
-            "SELECT id FROM tests WHERE id = $1",
-            invite['test_id']
-        )
-        if not test:
-            raise HTTPException(status_code=404, detail="Test not found")
+            compiled = await test_cache.get(conn, invite['test_id'])
+            if not compiled:
+                raise HTTPException(status_code=404, detail="Test not found")
 
-        # Calculate score for multiple choice questions only
-        auto_score = 0
-        total_auto_points = 0
-        total_manual_points = 0
-        has_manual_questions = False
+            # Precomputed answer key for every question in this test
+            question_rows = compiled['answer_key']
 
-        # Get all questions for this test
-        question_rows = await conn.fetch("""
-            SELECT id, type, points, correct_answer FROM questions WHERE test_id = $1
-        """, invite['test_id'])
-
-        for question in question_rows:
-            if question['type'] == 'multiple_choice':
-                total_auto_points += question['points']
-                if question['correct_answer']:
-                    for answer in submission.answers:
-                        if answer.question_id == str(question['id']) and answer.answer == question['correct_answer']:
-                            auto_score += question['points']
-            elif question['type'] in ['essay', 'coding']:
-                total_manual_points += question['points']
-                has_manual_questions = True
-
-        # Calculate auto score percentage
-        auto_score_percentage = (auto_score / total_auto_points * 100) if total_auto_points > 0 else 0
-        
-        # Determine scoring status and final score
-        if has_manual_questions:
-            scoring_status = 'needs_review'
-            if total_auto_points > 0:
-                # Mixed test (MCQ + SA/Coding): show auto score until manual review complete
-                final_score = auto_score_percentage
-            else:
-                # SA/Coding only test: show 0 until manual review complete
-                final_score = 0.0
-        else:
-            # MCQ only test: auto-scored
-            scoring_status = 'auto_only'
-            final_score = auto_score_percentage
+            # Create a map of submitted answers for easy lookup
+            submitted_answers = {answer.question_id: answer.answer for answer in submission.answers}
+            result = score_submission(question_rows, submitted_answers)
 
-        # Check if this test was monitored (has active WebRTC session)
-        webrtc_session = await conn.fetchrow("""
-            SELECT status FROM active_webrtc_sessions 
-            WHERE invite_id = $1 AND status IN ('connected', 'offer_sent')
-        """, invite['id'])
-        
-        is_monitored = webrtc_session is not None
-        
-        # Get the actual started_at timestamp from the invite
-        started_at = invite.get('started_at')
-        if not started_at:
-            # If no started_at in invite, use current time as fallback
-            started_at = datetime.now(timezone.utc)
-        
-        # Insert submission
-        submission_id = str(uuid.uuid4())
-        await conn.execute("""
-            INSERT INTO test_submissions (id, invite_id, test_id, applicant_email, auto_score, final_score, scoring_status, started_at, submitted_at, is_monitored)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-        """, uuid.UUID(submission_id), invite['id'], invite['test_id'],
-            invite['applicant_email'], auto_score_percentage, final_score, scoring_status, started_at, datetime.now(timezone.utc), is_monitored)
-
-        # Create a map of submitted answers for easy lookup
-        submitted_answers = {}
-        for answer in submission.answers:
-            submitted_answers[answer.question_id] = answer.answer
-        
-        # Insert records for ALL questions in the test, not just answered ones
-        for question in question_rows:
-            question_id_str = str(question['id'])
-            
-            # Get the submitted answer or use empty string for unattempted questions
-            answer_text = submitted_answers.get(question_id_str, "")
-            
-            # Set manual scoring status based on question type
-            manual_status = 'pending' if question['type'] in ['essay', 'coding'] else None
-            
+            # Get the actual started_at timestamp from the invite
+            now = datetime.now(timezone.utc)
+            started_at = invite['started_at'] or now
+
+            # Records for ALL questions in the test, not just answered ones
+            question_ids = [question['id'] for question in question_rows]
+            answer_texts = [submitted_answers.get(str(question['id']), "") for question in question_rows]
+            manual_statuses = [
+                'pending' if question['type'] in ['essay', 'coding'] else None
+                for question in question_rows
+            ]
+            manual_questions = sum(1 for status in manual_statuses if status == 'pending')
+            test_row = compiled['test']
+
+            # Insert the submission, its summary and all answer rows, complete the invite and
+            # end any active WebRTC session in a single statement
+            submission_id = uuid.uuid4()
             await conn.execute("""
-                INSERT INTO test_answers (submission_id, question_id, answer, manual_score_status)
-                VALUES ($1, $2, $3, $4)
-            """, uuid.UUID(submission_id), question['id'], answer_text, manual_status)
+                WITH new_submission AS (
+                    INSERT INTO test_submissions (id, invite_id, test_id, applicant_email, auto_score, final_score,
+                                                  scoring_status, started_at, submitted_at, is_monitored)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                ), new_summary AS (
+                    INSERT INTO submission_summaries (
+                        submission_id, invite_id, test_id, applicant_email, applicant_name, invite_token,
+                        invite_status, test_title, test_description, duration_minutes, started_at, submitted_at,
+                        final_score, auto_score, scoring_status, is_monitored,
+                        total_answers, manual_questions, pending_reviews
+                    )
+                    VALUES ($1, $2, $3, $4, $14, $15, 'completed', $16, $17, $18, $8, $9,
+                            $6, $5, $7, $10, cardinality($11::uuid[]), $19, $19)
+                ), new_answers AS (
+                    INSERT INTO test_answers (submission_id, question_id, answer, manual_score_status)
+                    SELECT $1, a.question_id, a.answer, a.manual_score_status
+                    FROM unnest($11::uuid[], $12::text[], $13::text[]) AS a(question_id, answer, manual_score_status)
+                ), completed_invite AS (
+                    UPDATE test_invites SET status = 'completed' WHERE id = $2
+                )
+                UPDATE active_webrtc_sessions
+                SET status = 'ended', ended_at = $9
+                WHERE invite_id = $2 AND status IN ('connected', 'offer_sent', 'initializing')
+            """, submission_id, invite['id'], invite['test_id'], invite['applicant_email'],
+                result['auto_score'], result['final_score'], result['scoring_status'],
+                started_at, now, invite['is_monitored'],
+                question_ids, answer_texts, manual_statuses,
+                invite['applicant_name'], uuid.UUID(token), test_row['title'], test_row['description'],
+                test_row['duration_minutes'], manual_questions)
 
-        # Update invite status
-        await conn.execute("""
-            UPDATE test_invites SET status = 'completed' WHERE invite_token = $1
-        """, token)
+            await record_score_changes(conn, [(invite['test_id'], None, result['final_score'])])
 
-        # End any active WebRTC session for this invite
-        await conn.execute("""
-            UPDATE active_webrtc_sessions 
-            SET status = 'ended', ended_at = $1 
-            WHERE invite_id = $2 AND status IN ('connected', 'offer_sent', 'initializing')
-        """, datetime.now(timezone.utc), invite['id'])
+        await monitoring_feed.invites_removed([invite['id']], conn)
 
         return {
             "message": "Test submitted successfully", 
-            "auto_score": auto_score_percentage,
-            "final_score": final_score,
-            "scoring_status": scoring_status,
-            "needs_manual_review": has_manual_questions
+            "auto_score": result['auto_score'],
+            "final_score": result['final_score'],
+            "scoring_status": result['scoring_status'],
+            "needs_manual_review": result['needs_manual_review']
         }
 
 # Admin Settings Routes
@@ -1770,7 +4065,7 @@ async def update_applicant_status(
     async with db_pool.acquire() as conn:
         # Check if applicant exists
         applicant = await conn.fetchrow(
-            "SELECT id FROM users WHERE id = $1 AND role = 'applicant'",
+            "SELECT id, email FROM users WHERE id = $1 AND role = 'applicant'",
             uuid.UUID(applicant_id)
         )
         
@@ -1783,6 +4078,7 @@ async def update_applicant_status(
             "UPDATE users SET is_active = $1 WHERE id = $2",
             is_active, uuid.UUID(applicant_id)
         )
+        await invalidate_principal(applicant['email'], conn)
         
         return {"message": f"Applicant status updated to {'active' if is_active else 'inactive'}"}
 
@@ -1805,7 +4101,17 @@ async def delete_applicant_completely(
             
             # Delete in proper order to handle foreign key constraints
             
-            # 1. Delete test answers first
+            # 1. Delete WebRTC sessions associated with the applicant's invites. Sessions
+            # go before submissions, the order the heartbeat reaper locks them in
+            await conn.execute("""
+                DELETE FROM active_webrtc_sessions 
+                WHERE invite_id IN (
+                    SELECT id FROM test_invites 
+                    WHERE applicant_email = $1
+                )
+            """, applicant['email'])
+            
+            # 2. Delete test answers
             await conn.execute("""
                 DELETE FROM test_answers 
                 WHERE submission_id IN (
@@ -1814,20 +4120,15 @@ async def delete_applicant_completely(
                 )
             """, applicant['email'])
             
-            # 2. Delete test submissions
-            await conn.execute("""
+            # 3. Delete test submissions and take their scores out of the per-test statistics
+            deleted_submissions = await conn.fetch("""
                 DELETE FROM test_submissions 
                 WHERE applicant_email = $1
+                RETURNING test_id, COALESCE(final_score, 0) as final_score
             """, applicant['email'])
-            
-            # 3. Delete WebRTC sessions associated with the applicant's invites
-            await conn.execute("""
-                DELETE FROM active_webrtc_sessions 
-                WHERE invite_id IN (
-                    SELECT id FROM test_invites 
-                    WHERE applicant_email = $1
-                )
-            """, applicant['email'])
+            await record_score_changes(conn, [
+                (row['test_id'], row['final_score'], None) for row in deleted_submissions
+            ])
             
             # 4. Delete test invites
             deleted_invites = await conn.fetch("""
@@ -1840,12 +4141,15 @@ async def delete_applicant_completely(
             await conn.execute("""
                 DELETE FROM users WHERE id = $1
             """, uuid.UUID(applicant_id))
-            
-            return {
-                "message": f"Applicant '{applicant['full_name']}' and all associated data deleted successfully",
-                "deleted_invites_count": len(deleted_invites),
-                "applicant_email": applicant['email']
-            }
+        
+        await invalidate_principal(applicant['email'], conn)
+        await monitoring_feed.invites_removed([row['id'] for row in deleted_invites], conn)
+        
+        return {
+            "message": f"Applicant '{applicant['full_name']}' and all associated data deleted successfully",
+            "deleted_invites_count": len(deleted_invites),
+            "applicant_email": applicant['email']
+        }
 
 @api_router.get("/admin/email-settings")
 async def get_email_settings(admin: User = Depends(get_admin_user)):
@@ -1923,6 +4227,7 @@ async def update_email_settings(
             settings.get('fromName', '12th Wonder Interview Platform')
             )
         
+        await invalidate_email_settings(conn)
         return {"message": "Email settings updated successfully"}
 
 @api_router.post("/admin/email-settings/test")
@@ -2036,6 +4341,14 @@ async def create_admin(
     if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    # Validate required fields
+    email = admin_data.get('email')
+    password = admin_data.get('password')
+    full_name = admin_data.get('full_name')
+    
+    if not email or not password or not full_name:
+        raise HTTPException(status_code=400, detail="Email, password, and full name are required")
+    
     async with db_pool.acquire() as conn:
         # Check if current user is first admin
         first_admin = await conn.fetchrow("""
@@ -2048,14 +4361,6 @@ async def create_admin(
         if not first_admin or str(first_admin['id']) != current_user.id:
             raise HTTPException(status_code=403, detail="Only the superadmin can create other admins")
         
-        # Validate required fields
-        email = admin_data.get('email')
-        password = admin_data.get('password')
-        full_name = admin_data.get('full_name')
-        
-        if not email or not password or not full_name:
-            raise HTTPException(status_code=400, detail="Email, password, and full name are required")
-        
         # Check if user already exists
         existing_user = await conn.fetchrow(
             "SELECT id FROM users WHERE email = $1",
@@ -2063,25 +4368,30 @@ async def create_admin(
         )
         if existing_user:
             raise HTTPException(status_code=400, detail="User with this email already exists")
-        
-        # Create new admin
-        admin_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(password)
-        
-        await conn.execute("""
-            INSERT INTO users (id, email, password, full_name, role, is_active)
-            VALUES ($1, $2, $3, $4, 'admin', true)
-        """, uuid.UUID(admin_id), email, hashed_password, full_name)
-        
-        return {
-            "message": "Admin created successfully",
-            "admin": {
-                "id": admin_id,
-                "email": email,
-                "full_name": full_name,
-                "role": "admin"
-            }
+    
+    # Hash between the checks and the insert, holding no pool connection
+    hashed_password = await get_password_hash(password)
+    
+    # Create new admin
+    admin_id = str(uuid.uuid4())
+    async with db_pool.acquire() as conn:
+        try:
+            await conn.execute("""
+                INSERT INTO users (id, email, password, full_name, role, is_active)
+                VALUES ($1, $2, $3, $4, 'admin', true)
+            """, uuid.UUID(admin_id), email, hashed_password, full_name)
+        except asyncpg.UniqueViolationError:
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+    
+    return {
+        "message": "Admin created successfully",
+        "admin": {
+            "id": admin_id,
+            "email": email,
+            "full_name": full_name,
+            "role": "admin"
         }
+    }
 
 @api_router.put("/admin/change-password/{admin_id}")
 async def change_admin_password(
@@ -2093,6 +4403,11 @@ async def change_admin_password(
     if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    # Validate new password
+    new_password = password_data.get('new_password')
+    if not new_password or len(new_password) < 6:
+        raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
+    
     async with db_pool.acquire() as conn:
         # Check if current user is first admin
         first_admin = await conn.fetchrow("""
@@ -2113,20 +4428,19 @@ async def change_admin_password(
         
         if not target_admin:
             raise HTTPException(status_code=404, detail="Admin not found")
-        
-        # Validate new password
-        new_password = password_data.get('new_password')
-        if not new_password or len(new_password) < 6:
-            raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
-        
+    
+    # Hash between the checks and the update, holding no pool connection
+    hashed_password = await get_password_hash(new_password)
+    
+    async with db_pool.acquire() as conn:
         # Update password
-        hashed_password = get_password_hash(new_password)
         await conn.execute(
             "UPDATE users SET password = $1 WHERE id = $2",
             hashed_password, uuid.UUID(admin_id)
         )
-        
-        return {"message": f"Password changed successfully for {target_admin['email']}"}
+        await invalidate_principal(target_admin['email'], conn)
+    
+    return {"message": f"Password changed successfully for {target_admin['email']}"}
 
 @api_router.delete("/admin/delete-admin/{admin_id}")
 async def delete_admin(
@@ -2188,6 +4502,9 @@ async def delete_admin(
                 uuid.UUID(admin_id)
             )
         
+        await invalidate_principal(target_admin['email'], conn)
+        await invalidate_email_settings(conn)
+        
         return {"message": f"Admin {target_admin['email']} deleted successfully"}
 
 @api_router.get("/admin/check-signup-restriction")
@@ -2204,6 +4521,32 @@ async def check_signup_restriction():
             "allow_admin_signup": admin_exists['count'] == 0
         }
 
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(admin: User = Depends(get_admin_user)):
+    """Get hit/miss counters for the in-process caches"""
+    return {
+        "test_definitions": test_cache.stats(),
+        "principals": principal_cache.stats(),
+        "result_counts": result_count_cache.stats(),
+        "item_analyses": item_analysis_cache.stats()
+    }
+
+@api_router.get("/admin/metrics")
+async def get_metrics(admin: User = Depends(get_admin_user)):
+    """Get runtime metrics for background work pools"""
+    return {
+        "password_hashing": {
+            **password_hash_stats,
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_queue": PASSWORD_HASH_MAX_QUEUE,
+            "bcrypt_rounds": BCRYPT_ROUNDS
+        },
+        "email_outbox": await get_email_outbox_metrics(),
+        "signaling": signaling_hub.metrics(),
+        "monitoring_streams": monitoring_feed.metrics(),
+        "heartbeats": heartbeat_buffer.metrics()
+    }
+
 @api_router.get("/admin/theme-settings")
 async def get_theme_settings(admin: User = Depends(get_admin_user)):
     """Get theme configuration settings"""
@@ -2262,9 +4605,55 @@ async def update_theme_settings(
             json.dumps(settings.get('customColors', {}))
             )
         
+        # Theme colors are part of invite email branding
+        await invalidate_email_settings(conn)
         return {"message": "Theme settings updated successfully"}
 
 # Results Routes
+def results_filter(start_date: Optional[str], end_date: Optional[str], test_id: Optional[str]):
+    """WHERE conditions on submission_summaries (alias s) and their parameters for the results filters"""
+    where_conditions = []
+    params = []
+    try:
+        if start_date:
+            params.append(datetime.fromisoformat(start_date))
+            where_conditions.append(f"s.submitted_at >= ${len(params)}")
+        if end_date:
+            # End of the given day
+            params.append(datetime.combine(datetime.fromisoformat(end_date).date(), datetime.max.time()))
+            where_conditions.append(f"s.submitted_at <= ${len(params)}")
+        if test_id:
+            params.append(uuid.UUID(test_id))
+            where_conditions.append(f"s.test_id = ${len(params)}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date or test ID filter")
+    return where_conditions, params
+
+async def count_results(conn, where_conditions: List[str], params: List[Any]):
+    """Total for GET /results as (total, is_estimate), cached per filter.
+
+    Without filters a table larger than RESULTS_EXACT_COUNT_LIMIT is not
+    counted; the planner's estimate is used.
+    """
+    key = (tuple(where_conditions), tuple(params))
+    cached = result_count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    total = None
+    if not where_conditions:
+        estimate = await conn.fetchval(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'submission_summaries'::regclass"
+        )
+        if estimate > RESULTS_EXACT_COUNT_LIMIT:
+            total = (estimate, True)
+    if total is None:
+        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        count = await conn.fetchval(f"SELECT COUNT(*) FROM submission_summaries s {where_clause}", *params)
+        total = (count, False)
+    result_count_cache.put(key, total)
+    return total
+
 @api_router.get("/results")
 async def get_results(
     admin: User = Depends(get_admin_user),
@@ -2272,72 +4661,82 @@ async def get_results(
     limit: int = 10,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    test_id: Optional[str] = None
+    test_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    include_total: bool = True
 ):
-    """Get test results with pagination and filtering"""
+    """Get test results with pagination and filtering.
+
+    Pass next_cursor (direction=next) or prev_cursor (direction=prev) from a
+    previous page to seek on (submitted_at, id) instead of using an OFFSET;
+    page is then only echoed back. Without a cursor, page is an offset, so
+    its cost grows with the page number; only cursor steps cost the same on
+    every page. limit is clamped to 1..RESULTS_PAGE_MAX_LIMIT.
+    """
+    if direction not in ('next', 'prev'):
+        raise HTTPException(status_code=400, detail="direction must be 'next' or 'prev'")
+    if page < 1:
+        raise HTTPException(status_code=400, detail="page must be 1 or greater")
+    limit = min(max(limit, 1), RESULTS_PAGE_MAX_LIMIT)
+    position = None
+    if cursor:
+        try:
+            position = decode_position_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    where_conditions, params = results_filter(start_date, end_date, test_id)
+    param_count = len(params)
+
     async with db_pool.acquire() as conn:
-        # Build WHERE clause for filtering
-        where_conditions = []
-        params = []
-        param_count = 0
-        
-        if start_date:
-            param_count += 1
-            where_conditions.append(f"ts.submitted_at >= ${param_count}")
-            # Convert string to datetime
-            from datetime import datetime
-            params.append(datetime.fromisoformat(start_date))
-            
-        if end_date:
-            param_count += 1
-            where_conditions.append(f"ts.submitted_at <= ${param_count}")
-            # Convert string to datetime and add end of day
-            from datetime import datetime, time
-            end_datetime = datetime.combine(datetime.fromisoformat(end_date).date(), time.max)
-            params.append(end_datetime)
-            
-        if test_id:
-            param_count += 1
-            where_conditions.append(f"ts.test_id = ${param_count}")
-            params.append(uuid.UUID(test_id))
-        
-        where_clause = ""
-        if where_conditions:
-            where_clause = "WHERE " + " AND ".join(where_conditions)
-        
-        # Calculate offset for pagination
+        total_count, total_is_estimate = None, False
+        if include_total:
+            total_count, total_is_estimate = await count_results(conn, where_conditions, params)
+        
+        # Keyset: rows strictly after (next) or before (prev) the cursor position
+        page_conditions = list(where_conditions)
+        page_params = list(params)
+        order = "DESC"
         offset = (page - 1) * limit
+        if position:
+            comparison = "<" if direction == "next" else ">"
+            page_conditions.append(f"(s.submitted_at, s.submission_id) {comparison} (${param_count + 1}, ${param_count + 2})")
+            page_params += [position[0], uuid.UUID(position[1])]
+            param_count += 2
+            if direction == "prev":
+                order = "ASC"
+            offset = 0
         
-        # Get total count for pagination
-        count_query = f"""
-            SELECT COUNT(*) FROM test_submissions ts
-            JOIN test_invites ti ON ts.invite_id = ti.id
-            JOIN tests t ON ts.test_id = t.id
-            {where_clause}
-        """
-        total_count = await conn.fetchval(count_query, *params)
-        
-        # Get paginated results
-        param_count += 1
-        limit_param = param_count
-        param_count += 1
-        offset_param = param_count
+        where_clause = ""
+        if page_conditions:
+            where_clause = "WHERE " + " AND ".join(page_conditions)
         
+        # One extra row tells whether there is another page in this direction
         query = f"""
             SELECT
-                ts.id, ts.invite_id, ts.test_id, ts.applicant_email, ts.started_at,
-                ts.submitted_at, ts.final_score as score, ts.auto_score, ts.manual_score, 
-                ts.scoring_status, ts.is_monitored,
-                ti.applicant_name, t.title as test_title, t.duration_minutes
-            FROM test_submissions ts
-            JOIN test_invites ti ON ts.invite_id = ti.id
-            JOIN tests t ON ts.test_id = t.id
+                s.submission_id as id, s.invite_id, s.test_id, s.applicant_email, s.started_at,
+                s.submitted_at, s.final_score as score, s.auto_score, s.manual_score,
+                s.scoring_status, s.is_monitored,
+                s.applicant_name, s.test_title, s.duration_minutes
+            FROM submission_summaries s
             {where_clause}
-            ORDER BY ts.submitted_at DESC
-            LIMIT ${limit_param} OFFSET ${offset_param}
+            ORDER BY s.submitted_at {order}, s.submission_id {order}
+            LIMIT ${param_count + 1} OFFSET ${param_count + 2}
         """
         
-        submission_rows = await conn.fetch(query, *params, limit, offset)
+        submission_rows = await conn.fetch(query, *page_params, limit + 1, offset)
+        has_more = len(submission_rows) > limit
+        submission_rows = submission_rows[:limit]
+        if order == "ASC":
+            submission_rows.reverse()
+
+        if position and direction == "prev":
+            has_next, has_prev = True, has_more
+        elif position:
+            has_next, has_prev = has_more, True
+        else:
+            has_next, has_prev = has_more, page > 1
 
         results = []
         for row in submission_rows:
@@ -2356,66 +4755,223 @@ async def get_results(
                 "is_monitored": row['is_monitored']
             })
 
+        first, last = (submission_rows[0], submission_rows[-1]) if submission_rows else (None, None)
         return {
             "results": results,
             "pagination": {
                 "page": page,
                 "limit": limit,
                 "total": total_count,
-                "total_pages": (total_count + limit - 1) // limit,
-                "has_next": page * limit < total_count,
-                "has_prev": page > 1
+                "total_is_estimate": total_is_estimate,
+                "total_pages": (total_count + limit - 1) // limit if total_count is not None else None,
+                "has_next": has_next,
+                "has_prev": has_prev,
+                "next_cursor": encode_position_cursor((last['submitted_at'], last['id'])) if has_next and last else None,
+                "prev_cursor": encode_position_cursor((first['submitted_at'], first['id'])) if has_prev and first else None
             }
         }
 
-@api_router.get("/results/{submission_id}")
-async def get_result_details(submission_id: str, admin: User = Depends(get_admin_user)):
-    async with db_pool.acquire() as conn:
-        submission = await conn.fetchrow("""
-            SELECT
-                ts.id, ts.invite_id, ts.test_id, ts.applicant_email, ts.started_at,
-                ts.submitted_at, ts.final_score as score, ts.auto_score, ts.manual_score,
-                ts.scoring_status, ts.is_monitored,
-                ti.applicant_name, t.title as test_title, t.duration_minutes
-            FROM test_submissions ts
-            JOIN test_invites ti ON ts.invite_id = ti.id
-            JOIN tests t ON ts.test_id = t.id
-            WHERE ts.id = $1
-        """, uuid.UUID(submission_id))
+EXPORT_COLUMNS = [
+    "submission_id", "applicant_name", "applicant_email", "test_id", "test_title",
+    "score", "auto_score", "manual_score", "scoring_status", "is_monitored", "started_at", "submitted_at"
+]
+
+def export_record(row, include_answers: bool) -> Dict[str, Any]:
+    record = {
+        "submission_id": str(row['id']),
+        "applicant_name": row['applicant_name'],
+        "applicant_email": row['applicant_email'],
+        "test_id": str(row['test_id']),
+        "test_title": row['test_title'],
+        "score": row['score'],
+        "auto_score": row['auto_score'],
+        "manual_score": row['manual_score'],
+        "scoring_status": row['scoring_status'],
+        "is_monitored": row['is_monitored'],
+        "started_at": row['started_at'].isoformat() if row['started_at'] else None,
+        "submitted_at": row['submitted_at'].isoformat() if row['submitted_at'] else None
+    }
+    if include_answers:
+        record["answers"] = json.loads(row['answers']) if row['answers'] else []
+    return record
+
+@api_router.get("/results/export")
+async def export_results(
+    admin: User = Depends(get_admin_user),
+    format: str = "csv",
+    include_answers: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    test_id: Optional[str] = None
+):
+    """Stream every matching result as CSV or NDJSON, newest first.
 
-        if not submission:
-            raise HTTPException(status_code=404, detail="Submission not found")
+    Rows come from a server-side cursor and are written out a batch at a
+    time, so memory does not grow with the export. With include_answers
+    each row carries its answers (a JSON array in the CSV `answers` column).
+    """
+    if format not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    where_conditions, params = results_filter(start_date, end_date, test_id)
+    where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    answers_column = """,
+                (SELECT json_agg(json_build_object(
+                            'question_id', q.id, 'question', q.question, 'question_type', q.type,
+                            'points', q.points, 'answer', ta.answer, 'manual_score', ta.manual_score,
+                            'manual_score_status', ta.manual_score_status
+                        ) ORDER BY q.question_order, q.id)
+                 FROM test_answers ta JOIN questions q ON q.id = ta.question_id
+                 WHERE ta.submission_id = s.submission_id) as answers""" if include_answers else ""
+    query = f"""
+        SELECT
+            s.submission_id as id, s.test_id, s.applicant_email, s.started_at, s.submitted_at,
+            s.final_score as score, s.auto_score, s.manual_score, s.scoring_status, s.is_monitored,
+            s.applicant_name, s.test_title{answers_column}
+        FROM submission_summaries s
+        {where_clause}
+        ORDER BY s.submitted_at DESC, s.submission_id DESC
+    """
+    columns = EXPORT_COLUMNS + (["answers"] if include_answers else [])
 
-        # Get answers for this submission
-        answer_rows = await conn.fetch("""
-            SELECT ta.answer, q.question, q.type, q.points, q.correct_answer
-            FROM test_answers ta
-            JOIN questions q ON ta.question_id = q.id
-            WHERE ta.submission_id = $1
-        """, uuid.UUID(submission_id))
+    async def rows():
+        # A pool connection is held for the length of the download
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                batch = []
+                async for row in conn.cursor(query, *params, prefetch=RESULTS_EXPORT_BATCH_SIZE):
+                    batch.append(export_record(row, include_answers))
+                    if len(batch) >= RESULTS_EXPORT_BATCH_SIZE:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+    async def csv_body():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        async for batch in rows():
+            for record in batch:
+                if include_answers:
+                    record["answers"] = json.dumps(record["answers"])
+                writer.writerow(record)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    async def ndjson_body():
+        async for batch in rows():
+            yield "".join(json.dumps(record) + "\n" for record in batch)
+
+    filename = f"results-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        csv_body() if format == 'csv' else ndjson_body(),
+        media_type="text/csv" if format == 'csv' else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
-        answers = []
-        for row in answer_rows:
-            answers.append({
-                "question": row['question'],
-                "question_type": row['type'],
-                "answer": row['answer'],
-                "correct_answer": row['correct_answer'],
-                "points": row['points']
-            })
+async def fetch_result_details(conn, submission_ids):
+    """Result details with answers and review fields for many submissions, keyed by submission id.
 
-        return {
+    Two set-based queries however many submissions are asked for.
+    """
+    submissions = await conn.fetch("""
+        SELECT
+            submission_id as id, invite_id, test_id, applicant_email, started_at,
+            submitted_at, final_score as score, auto_score, manual_score,
+            scoring_status, review_completed_at, is_monitored,
+            applicant_name, test_title, duration_minutes
+        FROM submission_summaries
+        WHERE submission_id = ANY($1::uuid[])
+    """, submission_ids)
+    if not submissions:
+        return {}
+
+    answer_rows = await conn.fetch("""
+        SELECT ta.submission_id, ta.id, ta.question_id, ta.answer, ta.manual_score,
+               ta.manual_score_status, ta.review_comments, ta.reviewed_at,
+               q.question, q.type, q.points, q.correct_answer
+        FROM test_answers ta
+        JOIN questions q ON ta.question_id = q.id
+        WHERE ta.submission_id = ANY($1::uuid[])
+        ORDER BY ta.submission_id, q.question_order
+    """, [row['id'] for row in submissions])
+
+    answers_by_submission = {}
+    for row in answer_rows:
+        answers_by_submission.setdefault(row['submission_id'], []).append({
+            "answer_id": str(row['id']),
+            "question_id": str(row['question_id']),
+            "question": row['question'],
+            "question_type": row['type'],
+            "answer": row['answer'],
+            "correct_answer": row['correct_answer'],
+            "points": row['points'],
+            "manual_score": row['manual_score'],
+            "manual_score_status": row['manual_score_status'],
+            "review_comments": row['review_comments'],
+            "reviewed_at": row['reviewed_at']
+        })
+
+    return {
+        submission['id']: {
             "submission_id": str(submission['id']),
+            "test_id": str(submission['test_id']),
             "applicant_name": submission['applicant_name'],
             "applicant_email": submission['applicant_email'],
             "test_title": submission['test_title'],
             "test_duration_minutes": submission['duration_minutes'],
             "score": submission['score'],
+            "auto_score": submission['auto_score'],
+            "manual_score": submission['manual_score'],
+            "scoring_status": submission['scoring_status'],
+            "review_completed_at": submission['review_completed_at'],
             "started_at": submission['started_at'],
             "submitted_at": submission['submitted_at'],
             "is_monitored": submission['is_monitored'],
-            "answers": answers
+            "answers": answers_by_submission.get(submission['id'], [])
         }
+        for submission in submissions
+    }
+
+@api_router.post("/results/batch")
+async def get_result_details_batch(request: ResultBatchRequest, admin: User = Depends(get_admin_user)):
+    """Result details for several submissions at once, in the order requested.
+
+    Ids that match no submission are listed under `missing`.
+    """
+    if len(request.submission_ids) > RESULTS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {RESULTS_BATCH_MAX} submissions per request")
+    submission_ids = []
+    for submission_id in request.submission_ids:
+        try:
+            submission_ids.append(uuid.UUID(submission_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid submission ID format: {submission_id}")
+    submission_ids = list(dict.fromkeys(submission_ids))
+
+    async with db_pool.acquire() as conn:
+        details = await fetch_result_details(conn, submission_ids)
+
+    return {
+        "results": [details[submission_id] for submission_id in submission_ids if submission_id in details],
+        "missing": [str(submission_id) for submission_id in submission_ids if submission_id not in details]
+    }
+
+@api_router.get("/results/{submission_id}")
+async def get_result_details(submission_id: str, admin: User = Depends(get_admin_user)):
+    try:
+        submission_uuid = uuid.UUID(submission_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid submission ID format")
+
+    async with db_pool.acquire() as conn:
+        details = await fetch_result_details(conn, [submission_uuid])
+
+    if submission_uuid not in details:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return details[submission_uuid]
 
 @api_router.get("/my-invites")
 async def get_my_invites(current_user: User = Depends(get_current_user)):
@@ -2458,16 +5014,14 @@ async def get_my_submissions(current_user: User = Depends(get_current_user)):
     """Get test submissions for current applicant user with scores"""
     async with db_pool.acquire() as conn:
         submission_rows = await conn.fetch("""
-            SELECT ts.id, ts.invite_id, ts.test_id, ts.applicant_email, ts.started_at,
-                   ts.submitted_at, ts.final_score, ts.auto_score, ts.manual_score, 
-                   ts.scoring_status, ts.is_monitored,
-                   ti.applicant_name, ti.invite_token, ti.status as invite_status,
-                   t.title as test_title, t.description as test_description, t.duration_minutes
-            FROM test_submissions ts
-            JOIN test_invites ti ON ts.invite_id = ti.id
-            JOIN tests t ON ts.test_id = t.id
-            WHERE ts.applicant_email = $1
-            ORDER BY ts.submitted_at DESC
+            SELECT submission_id as id, invite_id, test_id, applicant_email, started_at,
+                   submitted_at, final_score, auto_score, manual_score,
+                   scoring_status, is_monitored,
+                   applicant_name, invite_token, invite_status,
+                   test_title, test_description, duration_minutes
+            FROM submission_summaries
+            WHERE applicant_email = $1
+            ORDER BY submitted_at DESC
         """, current_user.email)
 
         submissions = []
@@ -2513,22 +5067,8 @@ async def handle_webrtc_offer(data: Dict[str, Any]):
 
         offer_id = str(uuid.uuid4())
 
-        async with db_pool.acquire() as conn:
-            # Store offer for the specific invite/test session
-            await conn.execute("""
-                INSERT INTO webrtc_signals (id, type, data, created_at)
-                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
-            """, uuid.UUID(offer_id), "offer", json.dumps(data))
-
-            # Also store in a dedicated table for active sessions
-            await conn.execute("""
-                INSERT INTO active_webrtc_sessions (invite_id, admin_offer_id, status, created_at)
-                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
-                ON CONFLICT (invite_id) DO UPDATE SET
-                admin_offer_id = EXCLUDED.admin_offer_id,
-                status = EXCLUDED.status,
-                created_at = CURRENT_TIMESTAMP
-            """, invite_uuid, uuid.UUID(offer_id), 'offer_sent')
+        # Store the offer, mark the session offer_sent and relay it to connected peers
+        await store_webrtc_signals(invite_uuid, [make_signal(offer_id, "offer", data, data.get('from', 'applicant'))])
 
         return {"offer_id": offer_id, "status": "offer_sent"}
     except Exception as e:
@@ -2552,26 +5092,8 @@ async def handle_webrtc_answer(data: Dict[str, Any]):
 
         answer_id = str(uuid.uuid4())
 
-        async with db_pool.acquire() as conn:
-            # Store answer
-            await conn.execute("""
-                INSERT INTO webrtc_signals (id, type, data, created_at)
-                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
-            """, uuid.UUID(answer_id), "answer", json.dumps(data))
-
-            # Update session status
-            await conn.execute("""
-                UPDATE active_webrtc_sessions
-                SET applicant_answer_id = $1, status = 'connected'
-                WHERE invite_id = $2
-            """, uuid.UUID(answer_id), invite_uuid)
-            
-            # Update any existing submission to mark it as monitored
-            await conn.execute("""
-                UPDATE test_submissions
-                SET is_monitored = true
-                WHERE invite_id = $1
-            """, invite_uuid)
+        # Store the answer, mark the session connected and the submission monitored
+        await store_webrtc_signals(invite_uuid, [make_signal(answer_id, "answer", data, data.get('from', 'admin'))])
 
         return {"answer_id": answer_id, "status": "answer_sent"}
     except Exception as e:
@@ -2870,15 +5392,7 @@ async def recalculate_final_score(conn, submission_id: str, reviewer_id: str):
         final_score = 0
     
     # Update submission
-    await conn.execute("""
-        UPDATE test_submissions
-        SET manual_score = $1,
-            final_score = $2,
-            scoring_status = 'fully_reviewed',
-            reviewed_by = $3,
-            review_completed_at = CURRENT_TIMESTAMP
-        WHERE id = $4
-    """, total_manual_score, final_score, uuid.UUID(reviewer_id), uuid.UUID(submission_id))
+    await complete_review(conn, uuid.UUID(submission_id), total_manual_score, final_score, uuid.UUID(reviewer_id))
 
 @api_router.post("/admin/auto-review/{submission_id}")
 async def auto_review_submission(
@@ -3111,18 +5625,9 @@ IMPORTANT:
                 reviewer_uuid = uuid.UUID(current_user.id)
                 submission_uuid = uuid.UUID(submission_id)
                 
-                await conn.execute("""
-                    UPDATE test_submissions
-                    SET manual_score = $1,
-                        final_score = $2,
-                        scoring_status = 'fully_reviewed',
-                        reviewed_by = $3,
-                        review_completed_at = CURRENT_TIMESTAMP
-                    WHERE id = $4
-                """, total_ai_score, 
-                    (submission_data['auto_score'] or 0) + total_ai_score, 
-                    reviewer_uuid, 
-                    submission_uuid)
+                await complete_review(conn, submission_uuid, total_ai_score,
+                                      (submission_data['auto_score'] or 0) + total_ai_score,
+                                      reviewer_uuid)
             except ValueError as e:
                 print(f"Invalid UUID format in final update: {e}")
                 raise HTTPException(status_code=500, detail="Invalid UUID format")
@@ -3164,61 +5669,126 @@ async def handle_ice_candidate(data: Dict[str, Any]):
 
         candidate_id = str(uuid.uuid4())
 
-        async with db_pool.acquire() as conn:
-            # Store ICE candidate
-            await conn.execute("""
-                INSERT INTO webrtc_signals (id, type, data, created_at)
-                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
-            """, uuid.UUID(candidate_id), "ice_candidate", json.dumps(data))
+        await store_webrtc_signals(invite_uuid, [make_signal(candidate_id, "ice_candidate", data, data.get('from'))])
 
         return {"candidate_id": candidate_id, "status": "candidate_sent"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to handle ICE candidate: {str(e)}")
 
+@api_router.post("/webrtc/ice-candidates")
+async def handle_ice_candidates(data: Dict[str, Any]):
+    """Handle a batch of ICE candidates for one invite: {"invite_id", "from", "candidates": [...]}"""
+    try:
+        candidates = data.get('candidates')
+        if 'invite_id' not in data or not isinstance(candidates, list) or not candidates:
+            raise HTTPException(status_code=400, detail="invite_id and a non-empty candidates list are required")
+        if len(candidates) > WEBRTC_ICE_BATCH_MAX:
+            raise HTTPException(status_code=400, detail=f"At most {WEBRTC_ICE_BATCH_MAX} candidates per batch")
+
+        # Validate invite_id format
+        try:
+            invite_uuid = uuid.UUID(data['invite_id'])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid invite ID format")
+
+        # Same shape as a single /webrtc/ice-candidate signal, so readers need no changes
+        signals = [
+            make_signal(uuid.uuid4(), "ice_candidate",
+                        {"candidate": candidate, "invite_id": data['invite_id'], "from": data.get('from')},
+                        data.get('from'))
+            for candidate in candidates
+        ]
+        await store_webrtc_signals(invite_uuid, signals)
+
+        return {"candidate_ids": [signal["id"] for signal in signals], "status": "candidates_sent"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to handle ICE candidates: {str(e)}")
+
 @api_router.get("/webrtc/signals/{invite_id}")
-async def get_webrtc_signals_for_invite(invite_id: str):
-    """Get all WebRTC signals for a specific invite/test session"""
+async def get_webrtc_signals_for_invite(invite_id: str, since: Optional[str] = None, wait: float = 0):
+    """Get WebRTC signals for a specific invite/test session.
+
+    Pass the returned cursor as `since` to get only newer signals, and `wait`
+    (seconds) to hold the request open until one arrives. A cursor is always
+    returned, also when there are no signals yet.
+    """
     try:
         # Validate UUID format
         try:
             invite_uuid = uuid.UUID(invite_id)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid invite ID format")
+        try:
+            after_seq = decode_signal_cursor(since) if since else 0
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid signal cursor")
+
+        invite_key = str(invite_uuid)
+        wait = min(max(wait, 0), WEBRTC_LONG_POLL_MAX_SECONDS)
+        deadline = time.monotonic() + wait
+        async with (signaling_hub.watch(invite_key) if wait else nullcontext()) as changed:
+            while True:
+                if changed:
+                    changed.clear()
+                async with db_pool.acquire() as conn:
+                    signals = await signal_store.since(invite_key, after_seq, conn)
+                    session_row = await conn.fetchrow("""
+                        SELECT status, created_at
+                        FROM active_webrtc_sessions
+                        WHERE invite_id = $1
+                    """, invite_uuid)
+
+                remaining = deadline - time.monotonic()
+                if signals or not changed or remaining <= 0 or (session_row and session_row['status'] == 'ended'):
+                    break
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
 
-        async with db_pool.acquire() as conn:
-            # Get all signals for this invite
-            signal_rows = await conn.fetch("""
-                SELECT id, type, data, created_at
-                FROM webrtc_signals
-                WHERE data->>'invite_id' = $1
-                ORDER BY created_at ASC
-            """, str(invite_uuid))
-
-            signals = []
-            for row in signal_rows:
-                signal_data = json.loads(row['data'])
-                signals.append({
-                    "id": str(row['id']),
-                    "type": row['type'],
-                    "data": signal_data,
-                    "created_at": row['created_at'].isoformat()
-                })
-
-            # Also get session status
-            session_row = await conn.fetchrow("""
-                SELECT status, created_at
-                FROM active_webrtc_sessions
-                WHERE invite_id = $1
-            """, uuid.UUID(invite_id))
-
-            return {
-                "signals": signals,
-                "session_status": session_row['status'] if session_row else 'not_started',
-                "session_created_at": session_row['created_at'].isoformat() if session_row else None
-            }
+        return {
+            "signals": signals,
+            "cursor": encode_signal_cursor(signals[-1]["seq"]) if signals else (since or SIGNAL_LOG_START_CURSOR),
+            "session_status": session_row['status'] if session_row else 'not_started',
+            "session_created_at": session_row['created_at'].isoformat() if session_row else None
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get signals: {str(e)}")
 
+@api_router.get("/monitoring/stream")
+async def monitoring_stream(request: Request, admin: User = Depends(get_admin_user)):
+    """Server-sent events for the monitoring console.
+
+    Sends a snapshot of the in-progress invites with their WebRTC session
+    status, then an upsert or remove event whenever one of them changes.
+    """
+    async def events():
+        # Subscribe before loading the snapshot so no change in between is lost
+        async with monitoring_feed.subscribe() as queue:
+            yield await monitoring_snapshot_event()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), MONITORING_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if event["event"] == "resync":
+                    yield await monitoring_snapshot_event()
+                else:
+                    yield sse_event(event["event"], event["invite"])
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @api_router.post("/webrtc/start-session/{invite_id}")
 async def start_webrtc_session(invite_id: str):
     """Initialize a WebRTC session for monitoring"""
@@ -3240,12 +5810,14 @@ async def start_webrtc_session(invite_id: str):
 
             # Create or update session record
             await conn.execute("""
-                INSERT INTO active_webrtc_sessions (invite_id, status, created_at)
-                VALUES ($1, $2, CURRENT_TIMESTAMP)
+                INSERT INTO active_webrtc_sessions (invite_id, status, created_at, last_heartbeat_at)
+                VALUES ($1, $2, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
                 ON CONFLICT (invite_id) DO UPDATE SET
                 status = EXCLUDED.status,
-                created_at = CURRENT_TIMESTAMP
+                created_at = CURRENT_TIMESTAMP,
+                last_heartbeat_at = CURRENT_TIMESTAMP
             """, uuid.UUID(invite_id), 'initializing')
+            await monitoring_feed.invite_changed(conn, invite_uuid)
 
             return {"status": "session_initialized", "invite_id": invite_id}
     except Exception as e:
@@ -3253,31 +5825,45 @@ async def start_webrtc_session(invite_id: str):
             raise e
         raise HTTPException(status_code=500, detail=f"Failed to start session: {str(e)}")
 
+@api_router.post("/webrtc/heartbeat/{invite_id}")
+async def webrtc_heartbeat(invite_id: str):
+    """Report that a monitoring session is still alive.
+
+    Buffered in memory and written in batches; sessions that stop beating
+    are ended by the reaper. A 503 means the buffer is full until the next
+    flush.
+    """
+    try:
+        invite_uuid = uuid.UUID(invite_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid invite ID format")
+    if not heartbeat_buffer.touch(invite_uuid):
+        raise HTTPException(status_code=503, detail="Too many heartbeats pending. Please try again shortly.",
+                            headers={"Retry-After": str(math.ceil(WEBRTC_HEARTBEAT_FLUSH_SECONDS))})
+    return {"status": "ok", "timeout_seconds": WEBRTC_HEARTBEAT_TIMEOUT_SECONDS}
+
 @api_router.post("/admin/fix-monitoring-status")
 async def fix_monitoring_status(admin: User = Depends(get_admin_user)):
-    """Fix monitoring status for existing submissions based on WebRTC sessions"""
+    """Fix monitoring status for existing submissions based on WebRTC sessions.
+
+    Submit, answer and the heartbeat reaper keep is_monitored current as
+    sessions change, so this is only needed for data written before they
+    did. Only submissions whose flag disagrees with their session are written.
+    """
     async with db_pool.acquire() as conn:
-        # Update submissions to reflect actual monitoring status
-        await conn.execute("""
-            UPDATE test_submissions 
-            SET is_monitored = true
-            WHERE invite_id IN (
-                SELECT invite_id FROM active_webrtc_sessions 
-                WHERE status IN ('connected', 'offer_sent')
-            )
-        """)
-        
-        # Update submissions to reflect no monitoring for sessions that ended
-        await conn.execute("""
-            UPDATE test_submissions 
-            SET is_monitored = false
-            WHERE invite_id IN (
-                SELECT invite_id FROM active_webrtc_sessions 
-                WHERE status = 'ended'
-            )
+        result = await conn.execute("""
+            UPDATE test_submissions ts
+            SET is_monitored = (s.status <> 'ended')
+            FROM active_webrtc_sessions s
+            WHERE s.invite_id = ts.invite_id
+            AND s.status IN ('connected', 'offer_sent', 'ended')
+            AND ts.is_monitored IS DISTINCT FROM (s.status <> 'ended')
         """)
         
-        return {"message": "Monitoring status updated for all submissions"}
+        return {
+            "message": "Monitoring status updated for all submissions",
+            "updated": int(result.split()[-1])
+        }
 
 @api_router.post("/webrtc/end-session/{invite_id}")
 async def end_webrtc_session(invite_id: str):
@@ -3289,25 +5875,62 @@ async def end_webrtc_session(invite_id: str):
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid invite ID format")
 
+        # Signals are not deleted here; webrtc_signal_maintenance_worker drops whole days of them
         async with db_pool.acquire() as conn:
-            # Update session status
             await conn.execute("""
                 UPDATE active_webrtc_sessions
                 SET status = 'ended', ended_at = CURRENT_TIMESTAMP
                 WHERE invite_id = $1
             """, invite_uuid)
+            await monitoring_feed.invite_changed(conn, invite_uuid)
 
-            # Clean up old signals (keep for 1 hour for debugging)
-            await conn.execute("""
-                DELETE FROM webrtc_signals
-                WHERE data->>'invite_id' = $1
-                AND created_at < CURRENT_TIMESTAMP - INTERVAL '1 hour'
-            """, invite_id)
+        await signaling_hub.close_room(str(invite_uuid))
 
         return {"status": "session_ended", "invite_id": invite_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to end session: {str(e)}")
 
+@api_router.websocket("/webrtc/ws/{invite_id}")
+async def webrtc_signaling_socket(websocket: WebSocket, invite_id: str, role: str = "applicant"):
+    """Relay offer/answer/ICE messages between the applicant and admin of one invite"""
+    try:
+        invite_uuid = uuid.UUID(invite_id)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+    if role not in ('admin', 'applicant'):
+        await websocket.close(code=1008)
+        return
+    
+    async with db_pool.acquire() as conn:
+        invite_exists = await conn.fetchval("SELECT EXISTS (SELECT 1 FROM test_invites WHERE id = $1)", invite_uuid)
+    if not invite_exists:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    invite_key = str(invite_uuid)
+    await signaling_hub.join(invite_key, websocket, role)
+    try:
+        while True:
+            message = await websocket.receive_json()
+            signal_type = message.get('type') if isinstance(message, dict) else None
+            if signal_type == 'heartbeat':
+                heartbeat_buffer.touch(invite_uuid)
+                continue
+            if signal_type not in ('offer', 'answer', 'ice_candidate'):
+                await websocket.send_json({"type": "error", "detail": "Unsupported message type"})
+                continue
+            # Same data shape the REST endpoints store
+            data = {**message, "invite_id": invite_key, "from": role}
+            await store_webrtc_signals(invite_uuid, [make_signal(uuid.uuid4(), signal_type, data, role)], websocket)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Signaling socket error for invite {invite_key}: {e}")
+    finally:
+        await signaling_hub.leave(invite_key, websocket)
+
 # Include the router in the main app
 app.include_router(api_router)
 
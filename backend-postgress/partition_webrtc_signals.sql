@@ -0,0 +1,146 @@
+-- Migration script to partition webrtc_signals by day
+-- Signals get a real invite_id column, live in daily range partitions on created_at,
+-- and old days are removed by dropping whole partitions instead of DELETEs.
+-- Safe to run more than once; the conversion is skipped if the table is already partitioned.
+-- Only signals inside the retention window are carried over (webrtc.signal_retention_days,
+-- set by run_webrtc_partition_migration.py from WEBRTC_SIGNAL_RETENTION_DAYS; 1 day if unset),
+-- so no partitions are created for days the backend would drop right away.
+
+-- Create the daily partitions (UTC days) from from_day (default today) through days_ahead days out.
+-- With unlogged = true they skip the WAL (contents are lost on a crash); a non-null setting
+-- also switches the current and upcoming days over when it changes.
+DROP FUNCTION IF EXISTS create_webrtc_signal_partitions(INTEGER, DATE);
+CREATE OR REPLACE FUNCTION create_webrtc_signal_partitions(days_ahead INTEGER DEFAULT 3, from_day DATE DEFAULT NULL,
+                                                           unlogged BOOLEAN DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_day DATE := COALESCE(from_day, (NOW() AT TIME ZONE 'UTC')::date);
+    last_day DATE := (NOW() AT TIME ZONE 'UTC')::date + days_ahead;
+    partition_name TEXT;
+    lower_bound TIMESTAMPTZ;
+    upper_bound TIMESTAMPTZ;
+    created INTEGER := 0;
+BEGIN
+    -- Every backend worker runs this; only one at a time
+    PERFORM pg_advisory_xact_lock(hashtext('webrtc_signals_partitions'));
+
+    WHILE partition_day <= last_day LOOP
+        partition_name := 'webrtc_signals_p' || to_char(partition_day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            lower_bound := partition_day::timestamp AT TIME ZONE 'UTC';
+            upper_bound := (partition_day + 1)::timestamp AT TIME ZONE 'UTC';
+            EXECUTE format('CREATE %s TABLE %I (LIKE webrtc_signals INCLUDING DEFAULTS)',
+                           CASE WHEN unlogged IS TRUE THEN 'UNLOGGED' ELSE '' END, partition_name);
+            -- Rows that fell into the default partition before this day existed move over
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM webrtc_signals_default WHERE created_at >= $1 AND created_at < $2 RETURNING *)
+                 INSERT INTO %I SELECT * FROM moved', partition_name)
+                USING lower_bound, upper_bound;
+            EXECUTE format('ALTER TABLE webrtc_signals ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, lower_bound, upper_bound);
+            created := created + 1;
+        ELSIF unlogged IS NOT NULL
+              AND (SELECT relpersistence = 'u' FROM pg_class WHERE oid = to_regclass(partition_name)) <> unlogged THEN
+            EXECUTE format('ALTER TABLE %I SET %s', partition_name, CASE WHEN unlogged THEN 'UNLOGGED' ELSE 'LOGGED' END);
+        END IF;
+        partition_day := partition_day + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the daily partitions that ended more than `retention` ago
+CREATE OR REPLACE FUNCTION drop_old_webrtc_signal_partitions(retention INTERVAL DEFAULT INTERVAL '1 day')
+RETURNS INTEGER AS $$
+DECLARE
+    partition_name TEXT;
+    dropped INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('webrtc_signals_partitions'));
+
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'webrtc_signals'::regclass
+        AND child.relname ~ '^webrtc_signals_p[0-9]{8}$'
+        AND (to_date(right(child.relname, 8), 'YYYYMMDD') + 1)::timestamp AT TIME ZONE 'UTC' <= NOW() - retention
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+
+    DELETE FROM webrtc_signals_default WHERE created_at < NOW() - retention;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention entry point (kept under its old name)
+CREATE OR REPLACE FUNCTION cleanup_old_webrtc_signals()
+RETURNS void AS $$
+BEGIN
+    PERFORM create_webrtc_signal_partitions();
+    PERFORM drop_old_webrtc_signal_partitions();
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    retention INTERVAL := COALESCE(NULLIF(current_setting('webrtc.signal_retention_days', true), '')::numeric, 1)
+                          * INTERVAL '1 day';
+    cutoff TIMESTAMPTZ := NOW() - retention;
+    first_day DATE;
+    expired BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'webrtc_signals'::regclass) THEN
+        RAISE NOTICE 'webrtc_signals is already partitioned';
+        RETURN;
+    END IF;
+
+    -- A foreign key to a partitioned table must include the partition key, so the
+    -- session rows keep the signal ids without enforcing them
+    ALTER TABLE active_webrtc_sessions DROP CONSTRAINT IF EXISTS active_webrtc_sessions_admin_offer_id_fkey;
+    ALTER TABLE active_webrtc_sessions DROP CONSTRAINT IF EXISTS active_webrtc_sessions_applicant_answer_id_fkey;
+
+    ALTER TABLE webrtc_signals RENAME TO webrtc_signals_legacy;
+    ALTER INDEX webrtc_signals_pkey RENAME TO webrtc_signals_legacy_pkey;
+
+    CREATE TABLE webrtc_signals (
+        id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        invite_id UUID,
+        type VARCHAR(50) NOT NULL,
+        data JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    -- Catches rows whose day has no partition yet
+    CREATE TABLE webrtc_signals_default PARTITION OF webrtc_signals DEFAULT;
+
+    -- Partitions only for the retained days: older signals are not carried over
+    SELECT COUNT(*) INTO expired FROM webrtc_signals_legacy WHERE created_at < cutoff;
+    SELECT MIN(created_at AT TIME ZONE 'UTC')::date INTO first_day
+    FROM webrtc_signals_legacy WHERE created_at >= cutoff;
+    PERFORM create_webrtc_signal_partitions(3, first_day);
+
+    -- Backfill invite_id from the JSON payload
+    INSERT INTO webrtc_signals (id, invite_id, type, data, created_at)
+    SELECT id,
+           CASE WHEN data->>'invite_id' ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+                THEN (data->>'invite_id')::uuid END,
+           type, data, COALESCE(created_at, NOW())
+    FROM webrtc_signals_legacy
+    WHERE created_at >= cutoff OR created_at IS NULL;
+
+    RAISE NOTICE 'Dropped % signals older than the % retention', expired, retention;
+    DROP TABLE webrtc_signals_legacy;
+END $$;
+
+-- Add indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_webrtc_invite_id ON webrtc_signals(invite_id, created_at);
+
+-- Make sure the coming days have partitions
+SELECT create_webrtc_signal_partitions();
+
+-- Verify table was converted
+SELECT 'webrtc_signals partitioned successfully' as status;
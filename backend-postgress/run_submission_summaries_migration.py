@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Simple script to run the submission summaries migration.
+Run this script on an existing database to create and backfill the submission_summaries
+read model and its triggers (needs PostgreSQL 11 or later).
+"""
+
+import asyncio
+import asyncpg
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def run_migration():
+    try:
+        # Connect to the database
+        conn = await asyncpg.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '5432'),
+            user=os.getenv('DB_USER', 'postgres'),
+            password=os.getenv('DB_PASSWORD', 'password'),
+            database=os.getenv('DB_NAME', 'interview_platform')
+        )
+        
+        print("Connected to database successfully!")
+        
+        # Read and execute the migration SQL
+        migration_file = Path(__file__).parent / 'add_submission_summaries.sql'
+        with open(migration_file, 'r') as f:
+            migration_sql = f.read()
+        
+        await conn.execute(migration_sql)
+        print("submission summaries migration executed successfully!")
+        
+        await conn.close()
+        print("Database connection closed.")
+        
+    except Exception as e:
+        print(f"Error running migration: {e}")
+        print("Please make sure:")
+        print("1. PostgreSQL is running")
+        print("2. Database credentials are correct")
+        print("3. The base schema (postgres_schema.sql) has been applied")
+
+if __name__ == "__main__":
+    print("Running submission summaries migration...")
+    asyncio.run(run_migration())
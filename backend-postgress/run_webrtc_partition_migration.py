@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Simple script to run the webrtc_signals partitioning migration.
+Run this script before starting a backend version that writes signals with an invite_id column.
+Signals older than WEBRTC_SIGNAL_RETENTION_DAYS are dropped instead of converted.
+"""
+
+import asyncio
+import asyncpg
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def run_migration():
+    try:
+        # Connect to the database
+        conn = await asyncpg.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '5432'),
+            user=os.getenv('DB_USER', 'postgres'),
+            password=os.getenv('DB_PASSWORD', 'password'),
+            database=os.getenv('DB_NAME', 'interview_platform')
+        )
+        
+        print("Connected to database successfully!")
+        
+        # Read and execute the partitioning migration SQL
+        migration_file = Path(__file__).parent / 'partition_webrtc_signals.sql'
+        with open(migration_file, 'r') as f:
+            migration_sql = f.read()
+        
+        # Signals older than the backend's retention are not carried over
+        retention_days = os.getenv('WEBRTC_SIGNAL_RETENTION_DAYS', '1')
+        await conn.execute("SELECT set_config('webrtc.signal_retention_days', $1, false)", retention_days)
+        await conn.execute(migration_sql)
+        print("webrtc_signals partitioning migration executed successfully!")
+        
+        await conn.close()
+        print("Database connection closed.")
+        
+    except Exception as e:
+        print(f"Error running migration: {e}")
+        print("Please make sure:")
+        print("1. PostgreSQL is running")
+        print("2. Database credentials are correct")
+        print("3. The base schema (postgres_schema.sql) has been applied")
+
+if __name__ == "__main__":
+    print("Running webrtc_signals partitioning migration...")
+    asyncio.run(run_migration())
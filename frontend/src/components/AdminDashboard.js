@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../App';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
@@ -66,6 +66,8 @@ const AdminDashboard = () => {
   const [startDate, setStartDate] = useState('');
   const [endDate, setEndDate] = useState('');
   const [selectedTestFilter, setSelectedTestFilter] = useState('all');
+  // Cursors of the results page on screen; stepping one page uses them instead of an offset
+  const resultsCursorRef = useRef(null);
 
   // Filtering state for Invites
   const [inviteDateFilter, setInviteDateFilter] = useState(new Date().toISOString().split('T')[0]); // Today's date
@@ -77,6 +79,8 @@ const AdminDashboard = () => {
   const [resultDetails, setResultDetails] = useState(null);
   const [detailsLoading, setDetailsLoading] = useState(false);
   const [detailsDialogOpen, setDetailsDialogOpen] = useState(false);
+  // Details of the results page on screen, loaded together on the first open
+  const resultDetailsRef = useRef({});
   
   // Test creation state
   const [showCreateTest, setShowCreateTest] = useState(false);
@@ -253,10 +257,29 @@ const AdminDashboard = () => {
       if (startDate) params.append('start_date', startDate);
       if (endDate) params.append('end_date', endDate);
       if (selectedTestFilter && selectedTestFilter !== 'all') params.append('test_id', selectedTestFilter);
+
+      const filterKey = params.toString().replace(/^page=\d+&?/, '');
+      const loaded = resultsCursorRef.current;
+      if (loaded && loaded.filterKey === filterKey) {
+        if (page === loaded.page + 1 && loaded.next) {
+          params.append('cursor', loaded.next);
+        } else if (page === loaded.page - 1 && loaded.prev) {
+          params.append('cursor', loaded.prev);
+          params.append('direction', 'prev');
+        }
+      }
       
       const resultsRes = await axios.get(`${API}/results?${params}`);
+      const { pagination } = resultsRes.data;
+      resultsCursorRef.current = {
+        filterKey,
+        page: pagination.page,
+        next: pagination.next_cursor,
+        prev: pagination.prev_cursor
+      };
       
       setResults(resultsRes.data.results);
+      resultDetailsRef.current = {};
       setCurrentPage(resultsRes.data.pagination.page);
       setTotalPages(resultsRes.data.pagination.total_pages);
       setTotalResults(resultsRes.data.pagination.total);
@@ -559,6 +582,7 @@ const AdminDashboard = () => {
     try {
       await axios.post(`${API}/admin/scoring/${submissionId}/answer/${answerId}`, scoreData);
       toast.success('Answer scored successfully');
+      delete resultDetailsRef.current[submissionId];
       
       // Refresh submission details and scoring queue
       await fetchSubmissionDetails(submissionId);
@@ -585,6 +609,7 @@ const AdminDashboard = () => {
       
       if (response.data.success) {
         toast.success('Auto-review completed successfully!');
+        delete resultDetailsRef.current[submissionId];
         // Refresh submission details and scoring queue
         await fetchSubmissionDetails(submissionId);
         await fetchScoringQueue();
@@ -614,8 +639,8 @@ const AdminDashboard = () => {
   };
 
   const handlePageChange = (page) => {
+    // The results effect fetches the new page
     setCurrentPage(page);
-    fetchResults(page);
   };
 
   const handlePageSizeChange = (newSize) => {
@@ -931,6 +956,8 @@ const AdminDashboard = () => {
           message = `Invite sent successfully! Test scheduled for ${newInvite.scheduled_date.toLocaleDateString()} at ${newInvite.scheduled_time}`;
         }
         toast.success(message);
+      } else if (invite.email_queued) {
+        toast.success('Invite created! The invitation email is being sent.');
       } else {
         toast.warning('Invite created but email failed to send. You can contact the applicant directly or retry sending the email.');
       }
@@ -949,6 +976,8 @@ const AdminDashboard = () => {
       
       if (response.data.email_sent) {
         toast.success('Email sent successfully!');
+      } else if (response.data.email_queued) {
+        toast.success('Email queued for delivery.');
       } else {
         toast.error('Failed to send email. Please check your email settings.');
       }
@@ -1163,12 +1192,31 @@ const AdminDashboard = () => {
 
   const handleViewResultDetails = async (result) => {
     setSelectedResult(result);
-    setDetailsLoading(true);
     setDetailsDialogOpen(true);
 
+    const loaded = resultDetailsRef.current[result.submission_id];
+    if (loaded) {
+      setResultDetails(loaded);
+      return;
+    }
+
+    setDetailsLoading(true);
     try {
-      const response = await axios.get(`${API}/results/${result.submission_id}`);
-      setResultDetails(response.data);
+      // Fetch the rest of the page with it so the next submissions open without a request
+      const submissionIds = [
+        result.submission_id,
+        ...results
+          .map((row) => row.submission_id)
+          .filter((id) => id !== result.submission_id && !resultDetailsRef.current[id])
+      ];
+      const response = await axios.post(`${API}/results/batch`, { submission_ids: submissionIds });
+      response.data.results.forEach((details) => {
+        resultDetailsRef.current[details.submission_id] = details;
+      });
+      if (!resultDetailsRef.current[result.submission_id]) {
+        throw new Error('Submission not found');
+      }
+      setResultDetails(resultDetailsRef.current[result.submission_id]);
     } catch (error) {
       console.error('Failed to fetch result details:', error);
       toast.error('Failed to load result details');
@@ -1860,6 +1908,11 @@ const AdminDashboard = () => {
                               <Mail className="h-3 w-3 mr-1" />
                               Email Sent
                             </Badge>
+                          ) : invite.email_queued ? (
+                            <Badge variant="outline" className="text-blue-600 border-blue-600">
+                              <Mail className="h-3 w-3 mr-1" />
+                              Email Sending
+                            </Badge>
                           ) : (
                             <div className="flex items-center space-x-2">
                               <Badge variant="outline" className="text-red-600 border-red-600">
@@ -3442,6 +3495,20 @@ const AdminDashboard = () => {
                             </p>
                           </div>
                         )}
+
+                        {answer.question_type !== 'multiple_choice' && answer.manual_score_status && (
+                          <div className="mt-2">
+                            <p className="font-medium text-gray-900 mb-1">Review:</p>
+                            <p className="text-sm text-gray-700">
+                              {answer.manual_score_status === 'pending'
+                                ? 'Pending review'
+                                : `${answer.manual_score || 0} / ${answer.points} (${answer.manual_score_status})`}
+                            </p>
+                            {answer.review_comments && (
+                              <p className="text-sm text-gray-600 mt-1 whitespace-pre-wrap">{answer.review_comments}</p>
+                            )}
+                          </div>
+                        )}
                       </div>
                     ))}
                   </div>
@@ -6,6 +6,8 @@ import { toast } from 'sonner';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Video, Users, Clock, AlertCircle, LogOut, ArrowLeft } from 'lucide-react';
+import { openSignalingChannel } from '../lib/signaling';
+import { openMonitoringStream } from '../lib/monitoringStream';
 
 // WebRTC Configuration
 const RTC_CONFIGURATION = {
@@ -35,8 +37,8 @@ const TestMonitoring = () => {
   const [webrtcConnected, setWebrtcConnected] = useState(false);
   const [connectionStatus, setConnectionStatus] = useState('disconnected');
   
-  // Add ref to track polling timeout
-  const pollingTimeoutRef = useRef(null);
+  // Signaling channel (WebSocket, REST polling as fallback)
+  const signalingRef = useRef(null);
   
   // Add refs to track current values for cleanup
   const peerConnectionRef = useRef(null);
@@ -44,18 +46,29 @@ const TestMonitoring = () => {
   const selectedTestRef = useRef(null);
 
   useEffect(() => {
-    fetchActiveTests();
-    // Poll for updates every 5 seconds
-    const interval = setInterval(fetchActiveTests, 5000);
-    return () => clearInterval(interval);
+    // Snapshot of the in-progress tests, then pushed changes
+    const stream = openMonitoringStream({
+      api: API,
+      token: localStorage.getItem('token'),
+      onSnapshot: (invites) => setActiveTests(invites.map(toActiveTest)),
+      onUpsert: (invite) => setActiveTests(tests => {
+        const updated = toActiveTest(invite);
+        return tests.some(test => test.id === updated.id)
+          ? tests.map(test => (test.id === updated.id ? updated : test))
+          : [...tests, updated];
+      }),
+      onRemove: (inviteId) => setActiveTests(tests => tests.filter(test => test.id !== inviteId)),
+      onError: (error) => console.error('Monitoring stream interrupted, reconnecting:', error)
+    });
+    return () => stream.close();
   }, []);
 
   // Cleanup WebRTC connections when component unmounts
   useEffect(() => {
     return () => {
-      // Clear any pending polling timeout
-      if (pollingTimeoutRef.current) {
-        clearTimeout(pollingTimeoutRef.current);
+      // Close the signaling channel
+      if (signalingRef.current) {
+        signalingRef.current.close();
       }
       
       // Close peer connection
@@ -125,35 +138,11 @@ const TestMonitoring = () => {
     }
   }, [activeTests]);
 
-  const fetchActiveTests = async () => {
-    try {
-      // Get all invitations (admin can see all)
-      const token = localStorage.getItem('token');
-      const response = await axios.get(`${API}/invites`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-
-      // Filter for tests that are in progress and could be monitored
-      const monitorableTests = response.data.filter(invite =>
-        invite.status === 'in_progress' ||
-        (invite.status === 'sent' && invite.scheduled_date)
-      );
-
-      console.log('Monitorable tests found:', monitorableTests);
-
-      // Enhance test data with additional info if needed
-      const enhancedTests = monitorableTests.map(invite => ({
-        ...invite,
-        test_title: invite.test_title || invite.test?.title || 'Test in Progress',
-        can_monitor: invite.status === 'in_progress'
-      }));
-
-      setActiveTests(enhancedTests);
-    } catch (error) {
-      console.error('Failed to fetch active tests:', error);
-      toast.error('Failed to fetch active tests: ' + (error.response?.data?.detail || error.message));
-    }
-  };
+  const toActiveTest = (invite) => ({
+    ...invite,
+    test_title: invite.test_title || 'Test in Progress',
+    can_monitor: invite.status === 'in_progress'
+  });
 
   const handleGoBack = () => {
     // Clear any preselected data when going back
@@ -202,12 +191,9 @@ const TestMonitoring = () => {
 
       // Handle ICE candidates from applicant
       pc.onicecandidate = async (event) => {
-        if (event.candidate) {
+        if (event.candidate && signalingRef.current) {
           try {
-            await axios.post(`${API}/webrtc/ice-candidate`, {
-              candidate: event.candidate,
-              invite_id: inviteId
-            });
+            await signalingRef.current.send('ice_candidate', { candidate: event.candidate });
           } catch (error) {
             console.error('Failed to send ICE candidate:', error);
           }
@@ -222,6 +208,9 @@ const TestMonitoring = () => {
             console.log('TestMonitoring - WebRTC connected successfully');
             setConnectionStatus('connected');
             setWebrtcConnected(true);
+            if (signalingRef.current) {
+              signalingRef.current.stopPolling();
+            }
             toast.success('Connected to applicant video feed');
             break;
           case 'connecting':
@@ -241,8 +230,19 @@ const TestMonitoring = () => {
         }
       };
 
-      // Poll for offer from applicant
-      pollForWebRTCOffer(pc, inviteId);
+      // Receive the applicant's offer and ICE candidates, in order
+      const pendingCandidates = [];
+      let signalQueue = Promise.resolve();
+      signalingRef.current = openSignalingChannel({
+        api: API,
+        inviteId,
+        role: 'admin',
+        onSignal: (signal) => {
+          signalQueue = signalQueue
+            .then(() => handleSignal(pc, signal, pendingCandidates))
+            .catch(error => console.error('TestMonitoring - Error handling signal:', error));
+        }
+      });
 
       setPeerConnection(pc);
     } catch (error) {
@@ -252,81 +252,39 @@ const TestMonitoring = () => {
     }
   };
 
-  const pollForWebRTCOffer = async (pc, inviteId) => {
-    try {
-      const response = await axios.get(`${API}/webrtc/signals/${inviteId}`);
-      const signals = response.data.signals;
-
-      // Find the latest offer
-      const offerSignal = signals
-        .filter(signal => signal.type === 'offer')
-        .pop();
-
-      if (offerSignal && !webrtcConnected) {
-        console.log('TestMonitoring - Found offer signal:', offerSignal);
-        console.log('TestMonitoring - Offer SDP length:', offerSignal.data.sdp.length);
-        const offer = {
-          type: 'offer',
-          sdp: offerSignal.data.sdp
-        };
-
-        try {
-          await pc.setRemoteDescription(offer);
-          console.log('TestMonitoring - WebRTC offer received and set');
-
-          // Create and send answer
-          const answer = await pc.createAnswer();
-          await pc.setLocalDescription(answer);
-          console.log('TestMonitoring - Created answer with SDP length:', answer.sdp.length);
-
-          console.log('TestMonitoring - Sending answer to backend');
-          const response = await axios.post(`${API}/webrtc/answer`, {
-            type: 'answer',
-            sdp: answer.sdp,
-            invite_id: inviteId
-          });
-          console.log('TestMonitoring - WebRTC answer sent successfully:', response.status);
-        } catch (error) {
-          console.error('TestMonitoring - Error processing offer:', error);
-          throw error;
-        }
-      } else if (!offerSignal) {
-        console.log('TestMonitoring - No offer signal found yet, signals count:', signals.length);
+  const handleSignal = async (pc, signal, pendingCandidates) => {
+    if (signal.type === 'offer') {
+      console.log('TestMonitoring - Offer SDP length:', signal.data.sdp.length);
+      await pc.setRemoteDescription({ type: 'offer', sdp: signal.data.sdp });
+      console.log('TestMonitoring - WebRTC offer received and set');
+
+      // Create and send answer
+      const answer = await pc.createAnswer();
+      await pc.setLocalDescription(answer);
+      console.log('TestMonitoring - Sending answer, SDP length:', answer.sdp.length);
+      await signalingRef.current.send('answer', { sdp: answer.sdp });
+
+      // Candidates that arrived before the offer can be applied now
+      while (pendingCandidates.length > 0) {
+        await pc.addIceCandidate(pendingCandidates.shift()).catch(error => console.error('Failed to add ICE candidate:', error));
       }
-
-      // Find ICE candidates and add them
-      const iceCandidates = signals.filter(signal => signal.type === 'ice_candidate');
-      for (const candidateSignal of iceCandidates) {
-        if (candidateSignal.data.candidate && pc.remoteDescription) {
-          try {
-            await pc.addIceCandidate(candidateSignal.data.candidate);
-          } catch (error) {
-            console.error('Failed to add ICE candidate:', error);
-          }
-        }
-      }
-
-      // Continue polling if not connected
-      if (!webrtcConnected) {
-        console.log('TestMonitoring - Continuing to poll for WebRTC offer...');
-        pollingTimeoutRef.current = setTimeout(() => pollForWebRTCOffer(pc, inviteId), 2000);
+    } else if (signal.type === 'ice_candidate' && signal.data.candidate) {
+      if (pc.remoteDescription) {
+        await pc.addIceCandidate(signal.data.candidate).catch(error => console.error('Failed to add ICE candidate:', error));
       } else {
-        console.log('TestMonitoring - WebRTC connected, stopping polling');
-      }
-    } catch (error) {
-      console.error('Failed to poll for WebRTC offer:', error);
-      // Continue polling on error
-      if (!webrtcConnected) {
-        pollingTimeoutRef.current = setTimeout(() => pollForWebRTCOffer(pc, inviteId), 2000);
+        pendingCandidates.push(signal.data.candidate);
       }
+    } else if (signal.type === 'session_ended') {
+      console.log('TestMonitoring - Session ended by the other side');
+      setConnectionStatus('disconnected');
     }
   };
 
   const handleStopMonitoring = async () => {
-    // Clear any pending polling timeout
-    if (pollingTimeoutRef.current) {
-      clearTimeout(pollingTimeoutRef.current);
-      pollingTimeoutRef.current = null;
+    // Close the signaling channel
+    if (signalingRef.current) {
+      signalingRef.current.close();
+      signalingRef.current = null;
     }
 
     // End WebRTC session in backend
@@ -450,7 +408,7 @@ const TestMonitoring = () => {
                           </div>
                         </div>
                         <div className="mt-2 text-xs text-gray-500">
-                          Started: {new Date(invite.created_at).toLocaleTimeString()}
+                          Started: {new Date(invite.started_at || invite.created_at).toLocaleTimeString()}
                         </div>
                       </div>
                     ))}
@@ -560,7 +518,7 @@ const TestMonitoring = () => {
                         <h4 className="font-semibold text-gray-900 mb-2">Test Status</h4>
                         <p className="text-sm text-gray-600">Status: In Progress</p>
                         <p className="text-sm text-gray-600">
-                          Started: {new Date(selectedTest.created_at).toLocaleString()}
+                          Started: {new Date(selectedTest.started_at || selectedTest.created_at).toLocaleString()}
                         </p>
                       </div>
                       <div className="bg-gray-50 p-4 rounded-lg">
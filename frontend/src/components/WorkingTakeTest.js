@@ -4,6 +4,7 @@ import axios from 'axios';
 import { toast } from 'sonner';
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle } from '../components/ui/alert-dialog';
 import BrandIcon from '../components/ui/BrandIcon';
+import { openSignalingChannel } from '../lib/signaling';
 
 // WebRTC Configuration
 const RTC_CONFIGURATION = {
@@ -23,6 +24,7 @@ const WorkingTakeTest = () => {
   const { token } = useParams();
   const navigate = useNavigate();
   const videoRef = useRef(null);
+  const signalingRef = useRef(null);
   
   const [invite, setInvite] = useState(null);
   const [test, setTest] = useState(null);
@@ -67,6 +69,9 @@ const WorkingTakeTest = () => {
       if (peerConnection) {
         peerConnection.close();
       }
+      if (signalingRef.current) {
+        signalingRef.current.close();
+      }
       // End WebRTC session
       if (inviteId) {
         axios.post(`${API}/webrtc/end-session/${inviteId}`).catch(console.error);
@@ -175,16 +180,39 @@ const WorkingTakeTest = () => {
         pc.addTrack(track, stream);
       });
 
-      // Handle ICE candidates
+      // Open the signaling channel before ICE gathering starts
+      if (inviteId) {
+        const pendingCandidates = [];
+        let signalQueue = Promise.resolve();
+        signalingRef.current = openSignalingChannel({
+          api: API,
+          inviteId,
+          role: 'applicant',
+          onSignal: (signal) => {
+            signalQueue = signalQueue
+              .then(() => handleSignal(pc, signal, pendingCandidates))
+              .catch(error => console.error('WorkingTakeTest - Error handling signal:', error));
+          }
+        });
+      }
+
+      // Handle ICE candidates; the server starts a fresh negotiation on every
+      // offer, so candidates gathered before the offer is sent are held back
+      let offerSent = false;
+      const heldCandidates = [];
+      const sendCandidate = async (candidate) => {
+        try {
+          await signalingRef.current.send('ice_candidate', { candidate });
+        } catch (error) {
+          console.error('Failed to send ICE candidate:', error);
+        }
+      };
       pc.onicecandidate = async (event) => {
-        if (event.candidate && inviteId) {
-          try {
-            await axios.post(`${API}/webrtc/ice-candidate`, {
-              candidate: event.candidate,
-              invite_id: inviteId
-            });
-          } catch (error) {
-            console.error('Failed to send ICE candidate:', error);
+        if (event.candidate && signalingRef.current) {
+          if (offerSent) {
+            await sendCandidate(event.candidate);
+          } else {
+            heldCandidates.push(event.candidate);
           }
         }
       };
@@ -196,6 +224,9 @@ const WorkingTakeTest = () => {
           case 'connected':
             console.log('WorkingTakeTest - WebRTC connected successfully');
             setWebrtcConnected(true);
+            if (signalingRef.current) {
+              signalingRef.current.stopPolling();
+            }
             toast.success('Video monitoring connected');
             break;
           case 'connecting':
@@ -217,24 +248,20 @@ const WorkingTakeTest = () => {
       await pc.setLocalDescription(offer);
       console.log('WorkingTakeTest - Created and set local offer');
 
-      // Send offer to admin via backend
-      if (inviteId) {
+      // Send offer to admin through the signaling channel; the server keeps it
+      // until the admin opens the monitoring view
+      if (signalingRef.current) {
+        await signalingRef.current.ready;
         try {
-          const response = await axios.post(`${API}/webrtc/offer`, {
-            type: 'offer',
-            sdp: offer.sdp,
-            invite_id: inviteId
-          });
-          console.log('WorkingTakeTest - Offer sent successfully:', response.status);
+          await signalingRef.current.send('offer', { sdp: offer.sdp });
+          console.log('WorkingTakeTest - Offer sent successfully');
         } catch (error) {
           console.error('WorkingTakeTest - Failed to send offer:', error.response?.data || error.message);
         }
-
-        // Wait a bit for admin to initialize session, then poll for answer
-        setTimeout(() => {
-          console.log('WorkingTakeTest - Starting to poll for WebRTC answer');
-          pollForWebRTCAnswer(pc);
-        }, 1000);
+        offerSent = true;
+        while (heldCandidates.length > 0) {
+          await sendCandidate(heldCandidates.shift());
+        }
       }
 
       setPeerConnection(pc);
@@ -255,52 +282,20 @@ const WorkingTakeTest = () => {
     }
   };
 
-  const pollForWebRTCAnswer = async (pc) => {
-    if (!inviteId) return;
-
-    try {
-      const response = await axios.get(`${API}/webrtc/signals/${inviteId}`);
-      const signals = response.data.signals;
-
-      // Find the latest answer
-      const answerSignal = signals
-        .filter(signal => signal.type === 'answer')
-        .pop();
-
-      if (answerSignal && !webrtcConnected) {
-        const answer = {
-          type: 'answer',
-          sdp: answerSignal.data.sdp
-        };
-
-        await pc.setRemoteDescription(answer);
-        console.log('WorkingTakeTest - WebRTC answer received and set');
-      }
+  const handleSignal = async (pc, signal, pendingCandidates) => {
+    if (signal.type === 'answer') {
+      await pc.setRemoteDescription({ type: 'answer', sdp: signal.data.sdp });
+      console.log('WorkingTakeTest - WebRTC answer received and set');
 
-      // Find ICE candidates and add them
-      const iceCandidates = signals.filter(signal => signal.type === 'ice_candidate');
-      for (const candidateSignal of iceCandidates) {
-        if (candidateSignal.data.candidate) {
-          try {
-            await pc.addIceCandidate(candidateSignal.data.candidate);
-          } catch (error) {
-            console.error('Failed to add ICE candidate:', error);
-          }
-        }
+      // Candidates that arrived before the answer can be applied now
+      while (pendingCandidates.length > 0) {
+        await pc.addIceCandidate(pendingCandidates.shift()).catch(error => console.error('Failed to add ICE candidate:', error));
       }
-
-      // Continue polling if not connected
-      if (!webrtcConnected) {
-        console.log('WorkingTakeTest - Continuing to poll for WebRTC answer...');
-        setTimeout(() => pollForWebRTCAnswer(pc), 2000);
+    } else if (signal.type === 'ice_candidate' && signal.data.candidate) {
+      if (pc.remoteDescription) {
+        await pc.addIceCandidate(signal.data.candidate).catch(error => console.error('Failed to add ICE candidate:', error));
       } else {
-        console.log('WorkingTakeTest - WebRTC connected, stopping polling');
-      }
-    } catch (error) {
-      console.error('Failed to poll for WebRTC answer:', error);
-      // Continue polling on error
-      if (!webrtcConnected) {
-        setTimeout(() => pollForWebRTCAnswer(pc), 2000);
+        pendingCandidates.push(signal.data.candidate);
       }
     }
   };
@@ -397,6 +392,10 @@ const WorkingTakeTest = () => {
         videoStream.getTracks().forEach(track => track.stop());
         setVideoStream(null);
       }
+      if (signalingRef.current) {
+        signalingRef.current.close();
+        signalingRef.current = null;
+      }
       if (peerConnection) {
         peerConnection.close();
         setPeerConnection(null);
@@ -0,0 +1,83 @@
+// Subscribes to /monitoring/stream. EventSource cannot send the bearer
+// token, so the server-sent events are read from a fetch() body instead.
+// The server starts every connection with a full snapshot, so reconnecting
+// after an error needs no extra bookkeeping here.
+const RECONNECT_DELAY_MS = 3000;
+
+const parseEvent = (block) => {
+  let event = 'message';
+  const data = [];
+  block.split('\n').forEach((line) => {
+    if (line.startsWith(':')) return;
+    const separator = line.indexOf(':');
+    const field = separator === -1 ? line : line.slice(0, separator);
+    const value = separator === -1 ? '' : line.slice(separator + 1).replace(/^ /, '');
+    if (field === 'event') {
+      event = value;
+    } else if (field === 'data') {
+      data.push(value);
+    }
+  });
+  return data.length ? { event, data: JSON.parse(data.join('\n')) } : null;
+};
+
+export function openMonitoringStream({ api, token, onSnapshot, onUpsert, onRemove, onError }) {
+  let controller = null;
+  let retryTimer = null;
+  let closed = false;
+
+  const dispatch = ({ event, data }) => {
+    if (event === 'snapshot') {
+      onSnapshot(data.invites);
+    } else if (event === 'upsert') {
+      onUpsert(data);
+    } else if (event === 'remove') {
+      onRemove(data.id);
+    }
+  };
+
+  const connect = async () => {
+    controller = new AbortController();
+    try {
+      const response = await fetch(`${api}/monitoring/stream`, {
+        headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        throw new Error(`Monitoring stream failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (!closed) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, '\n');
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const parsed = parseEvent(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+          if (parsed) dispatch(parsed);
+          boundary = buffer.indexOf('\n\n');
+        }
+      }
+    } catch (error) {
+      if (closed) return;
+      if (onError) onError(error);
+    }
+    if (!closed) {
+      retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+    }
+  };
+
+  connect();
+
+  return {
+    close: () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (controller) controller.abort();
+    }
+  };
+}
@@ -0,0 +1,174 @@
+import axios from 'axios';
+
+const REST_PATHS = {
+  offer: 'offer',
+  answer: 'answer'
+};
+
+// Trickle ICE produces a burst of candidates; over REST they are posted
+// together once this window passes without the batch filling up
+const ICE_BATCH_WINDOW_MS = 50;
+const ICE_BATCH_MAX = 50;
+
+// The server ends sessions that go quiet for a minute (WEBRTC_HEARTBEAT_TIMEOUT_SECONDS)
+const HEARTBEAT_INTERVAL_MS = 15000;
+
+// Opens the per-invite signaling channel. Messages arrive over a WebSocket;
+// if the socket cannot be opened (proxy, old browser) the channel falls back
+// to the REST endpoints and long-polls /webrtc/signals with a cursor.
+export function openSignalingChannel({ api, inviteId, role, onSignal }) {
+  const seen = new Set();
+  let socket = null;
+  let pollTimer = null;
+  let polling = false;
+  let closed = false;
+  let resolveReady;
+  const ready = new Promise((resolve) => { resolveReady = resolve; });
+
+  const deliver = (signal) => {
+    if (!signal || (signal.id && seen.has(signal.id)) || signal.from === role) {
+      return;
+    }
+    if (signal.id) {
+      seen.add(signal.id);
+    }
+    onSignal(signal);
+  };
+
+  // Long-poll: each request waits up to 25 s for signals newer than the cursor
+  // (the first one for any signal at all)
+  let cursor = null;
+  const poll = async () => {
+    if (closed || !polling) return;
+    let delay = 0;
+    try {
+      const params = cursor ? { since: cursor, wait: 25 } : { wait: 25 };
+      const response = await axios.get(`${api}/webrtc/signals/${inviteId}`, { params, timeout: 35000 });
+      const signals = response.data.signals;
+      if (cursor) {
+        signals.forEach(deliver);
+      } else {
+        // Only the current negotiation matters: everything from the latest offer on
+        const lastOffer = signals.map(signal => signal.type).lastIndexOf('offer');
+        signals.slice(Math.max(lastOffer, 0)).forEach(deliver);
+      }
+      cursor = response.data.cursor || cursor;
+      if (response.data.session_status === 'ended') {
+        // The server answers at once for an ended session; don't spin on it
+        delay = 2000;
+      } else if (!signals.length) {
+        // An empty answer normally means the wait ran out; never re-poll in a tight loop
+        delay = 1000;
+      }
+    } catch (error) {
+      console.error('Signaling poll failed:', error);
+      if (error.response && error.response.status === 400) {
+        // A cursor the server no longer understands: start over, already seen signals are skipped
+        cursor = null;
+      }
+      delay = 2000;
+    }
+    if (!closed && polling) {
+      pollTimer = setTimeout(poll, delay);
+    }
+  };
+
+  const startPolling = () => {
+    if (polling || closed) return;
+    console.log('Signaling - WebSocket unavailable, polling over REST');
+    polling = true;
+    resolveReady();
+    poll();
+  };
+
+  try {
+    const socketUrl = `${api.replace(/^http/, 'ws')}/webrtc/ws/${inviteId}?role=${role}`;
+    socket = new WebSocket(socketUrl);
+    socket.onopen = () => resolveReady();
+    socket.onmessage = (event) => deliver(JSON.parse(event.data));
+    socket.onerror = () => startPolling();
+    socket.onclose = () => {
+      if (!closed) startPolling();
+    };
+  } catch (error) {
+    startPolling();
+  }
+
+  // Keeps the session alive on the server for as long as the channel is open
+  const heartbeat = () => {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: 'heartbeat' }));
+    } else {
+      axios.post(`${api}/webrtc/heartbeat/${inviteId}`)
+        .catch(error => console.error('Signaling heartbeat failed:', error));
+    }
+  };
+  const heartbeatTimer = setInterval(heartbeat, HEARTBEAT_INTERVAL_MS);
+
+  // Batches are posted one after another, so the server stores them in order
+  let iceBatch = null;
+  let lastIceBatch = Promise.resolve();
+  const flushIceBatch = () => {
+    const batch = iceBatch;
+    iceBatch = null;
+    clearTimeout(batch.timer);
+    lastIceBatch = lastIceBatch
+      .catch(() => {})
+      .then(() => axios.post(`${api}/webrtc/ice-candidates`, {
+        invite_id: inviteId,
+        from: role,
+        candidates: batch.candidates
+      }));
+    lastIceBatch.then(batch.resolve, batch.reject);
+  };
+
+  const queueIceCandidate = (candidate) => {
+    if (!iceBatch) {
+      iceBatch = { candidates: [] };
+      iceBatch.sent = new Promise((resolve, reject) => {
+        iceBatch.resolve = resolve;
+        iceBatch.reject = reject;
+      });
+      iceBatch.timer = setTimeout(flushIceBatch, ICE_BATCH_WINDOW_MS);
+    }
+    const { sent } = iceBatch;
+    iceBatch.candidates.push(candidate);
+    if (iceBatch.candidates.length >= ICE_BATCH_MAX) {
+      flushIceBatch();
+    }
+    return sent;
+  };
+
+  const send = async (type, payload) => {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type, ...payload }));
+      return;
+    }
+    if (type === 'ice_candidate') {
+      await queueIceCandidate(payload.candidate);
+      return;
+    }
+    const body = { ...payload, type, invite_id: inviteId, from: role };
+    await axios.post(`${api}/webrtc/${REST_PATHS[type]}`, body);
+  };
+
+  // Polling is only needed until the peer connection is up
+  const stopPolling = () => {
+    polling = false;
+    clearTimeout(pollTimer);
+  };
+
+  const close = () => {
+    closed = true;
+    stopPolling();
+    clearInterval(heartbeatTimer);
+    if (iceBatch) {
+      flushIceBatch();
+    }
+    if (socket) {
+      socket.close();
+    }
+  };
+
+  return { ready, send, stopPolling, close };
+}